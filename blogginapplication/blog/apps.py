@@ -6,4 +6,7 @@ class BlogConfig(AppConfig):
     name = 'blog'
 
     def ready(self):
-        from . import signals
\ No newline at end of file
+        from . import checks, signals
+        from .utility import metrics
+
+        metrics.install()
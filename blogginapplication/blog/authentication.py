@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.authentication import SessionScheme
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .utility.auth_cache import load_user
+
+
+def _jwt_only(request) -> bool:
+    return request.path.startswith(tuple(getattr(settings, "BLOG_JWT_ONLY_PATHS", ())))
+
+
+def _session_user(request):
+    """
+    What ``django.contrib.auth.get_user`` returns, with the user read through
+    the auth cache. Anything short of a clean hit (unknown backend, stale
+    session hash, inactive user) goes to get_user() and its own handling.
+    None for requests that never went through SessionMiddleware.
+    """
+    session = getattr(request, "session", None)
+    if session is None or SESSION_KEY not in session:
+        return None
+    if session.get(BACKEND_SESSION_KEY) in settings.AUTHENTICATION_BACKENDS:
+        user = load_user(session[SESSION_KEY])
+        session_hash = session.get(HASH_SESSION_KEY)
+        if (
+            user is not None
+            and user.is_active
+            and session_hash
+            and constant_time_compare(session_hash, user.get_session_auth_hash())
+        ):
+            return user
+    return get_user(request)
+
+
+class CachedSessionAuthentication(SessionAuthentication):
+    """
+    SessionAuthentication with the user and profile from the auth cache
+    (blog.utility.auth_cache). Paths under BLOG_JWT_ONLY_PATHS never touch
+    the session.
+    """
+
+    def authenticate(self, request):
+        if _jwt_only(request._request):
+            return None
+        user = _session_user(request._request)
+        if not user or not user.is_active:
+            return None
+        self.enforce_csrf(request)
+        return (user, None)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication with the user and profile from the auth cache; the
+    token itself is still verified on every request.
+    """
+
+    def get_user(self, validated_token):
+        if jwt_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        if jwt_settings.USER_ID_FIELD != self.user_model._meta.pk.name:
+            return super().get_user(validated_token)
+
+        user = load_user(validated_token[jwt_settings.USER_ID_CLAIM])
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if jwt_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                jwt_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+
+# the same securitySchemes the DRF/SimpleJWT classes get in the OpenAPI schema
+class CachedSessionScheme(SessionScheme):
+    target_class = CachedSessionAuthentication
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    target_class = CachedJWTAuthentication
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+# caches whose entries are dropped on writes, so every worker has to see the drop
+SHARED_CACHES = (("BLOG_AUTH_CACHE", "users"), ("BLOG_RESPONSE_CACHE", "responses"))
+
+
+@register(Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    """
+    LocMem is per process: a write handled by one worker can't invalidate
+    another worker's entries, which then serve stale users (still active,
+    old profile) or responses until they expire. Refuse it for these caches
+    when BLOG_WORKER_PROCESSES says there is more than one worker.
+    """
+    if getattr(settings, "BLOG_WORKER_PROCESSES", 1) <= 1:
+        return []
+    errors = []
+    for setting, holds in SHARED_CACHES:
+        alias = getattr(settings, setting, "default")
+        if isinstance(caches[alias], LocMemCache):
+            errors.append(
+                Error(
+                    f"{setting} ({alias!r}) holds {holds} in a per-process LocMemCache, "
+                    f"but BLOG_WORKER_PROCESSES is {settings.BLOG_WORKER_PROCESSES}.",
+                    hint="Point it at a cache shared by the workers (database, file-based, "
+                    "Memcached, Redis), or run a single worker process.",
+                    id="blog.E001",
+                )
+            )
+    return errors
@@ -1,6 +1,9 @@
 
 import django_filters as df
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
 from .models import Post
+from .utility.search import get_search_backend
 
 class PostFilter(df.FilterSet):
     status = df.CharFilter(field_name="status")
@@ -17,3 +20,32 @@ class PostFilter(df.FilterSet):
     class Meta:
         model = Post
         fields = ["status", "category", "author", "tags", "published_from", "published_to"]
+
+
+class PostSearchFilter(BaseFilterBackend):
+    """
+    ``?search=`` over the posts full-text index. Results are ordered by
+    relevance unless the client asked for an explicit ``?ordering=``.
+    """
+
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        if not query:
+            return queryset
+        queryset = get_search_backend().search(queryset, query)
+        if api_settings.ORDERING_PARAM not in request.query_params:
+            queryset = queryset.order_by("search_rank", "-published_at", "-id")
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Full-text search over title and body, ranked by relevance.",
+                "schema": {"type": "string"},
+            }
+        ]
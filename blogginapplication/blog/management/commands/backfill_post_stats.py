@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Fill excerpt, word_count and reading_time for existing posts in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        chunk = options["chunk_size"]
+        done, last_id = 0, 0
+        while True:
+            posts = list(
+                Post.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .only("pk", "body")[:chunk]
+            )
+            if not posts:
+                break
+            last_id = posts[-1].pk
+            for post in posts:
+                post.refresh_text_stats()
+            with transaction.atomic():
+                Post.objects.bulk_update(posts, Post.TEXT_STATS_FIELDS)
+            done += len(posts)
+            self.stdout.write(f"{done} post(s) updated...")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled text stats for {done} post(s)."))
@@ -0,0 +1,267 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken
+
+from blog.models import Category, Comment, Post, PostStatus, Tag
+from blog.utility.cache import response_cache
+
+# extra runs under tracemalloc, kept apart from the timed ones
+ALLOC_ITERATIONS = 3
+
+
+class Scenario:
+    """A named sequence of requests; one iteration sends all of them."""
+
+    def __init__(self, name, requests, auth=False):
+        self.name = name
+        self.requests = requests  # iteration -> [(method, path, data)]
+        self.auth = auth
+
+
+def _get(path):
+    return lambda i: [("get", path, None)]
+
+
+def _toggle(path):
+    return lambda i: [("post", path, None), ("delete", path, None)]
+
+
+def _register(i):
+    username = f"bench{i:06d}"
+    data = {
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": "Bench-pass-1234",
+        "confirm_password": "Bench-pass-1234",
+    }
+    return [("post", "/api/register/", data)]
+
+
+@contextmanager
+def _unthrottled():
+    # rate limits would start rejecting requests a few hundred iterations in
+    saved = APIView.throttle_classes
+    APIView.throttle_classes = ()
+    try:
+        yield
+    finally:
+        APIView.throttle_classes = saved
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the API in-process against the current (seeded) database: "
+        "p50/p95 latency, queries and peak allocations per scenario. Writes are "
+        "rolled back. --compare fails when a scenario regresses past --threshold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--only", nargs="*", default=[], help="Scenario name substrings.")
+        parser.add_argument(
+            "--warm-cache",
+            action="store_true",
+            help="Keep the response cache between iterations (measures cache hits).",
+        )
+        parser.add_argument("--output", help="Write results as JSON to this file.")
+        parser.add_argument("--compare", help="Baseline JSON from an earlier --output.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Allowed relative growth of p50/p95 and allocations (0.2 = 20%%). "
+            "Queries per request may not grow at all.",
+        )
+
+    def handle(self, *args, **options):
+        scenarios = self._scenarios()
+        if options["only"]:
+            scenarios = [s for s in scenarios if any(part in s.name for part in options["only"])]
+        if not scenarios:
+            raise CommandError("No scenario matches --only.")
+
+        results = {}
+        hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+        with override_settings(ALLOWED_HOSTS=hosts), _unthrottled():
+            for scenario in scenarios:
+                results[scenario.name] = self._run(scenario, options)
+                self._print_row(scenario.name, results[scenario.name])
+
+        report = {
+            "created": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "iterations": options["iterations"],
+            "warm_cache": options["warm_cache"],
+            "scenarios": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+        if options["compare"]:
+            self._compare(options["compare"], results, options["threshold"])
+
+    def _scenarios(self):
+        post = (
+            Post.objects.filter(status=PostStatus.PUBLISHED)
+            .select_related("author")
+            .order_by("-comment_count", "pk")
+            .first()
+        )
+        user = get_user_model().objects.filter(is_active=True).order_by("pk").first()
+        if post is None or user is None:
+            raise CommandError("Nothing to benchmark; run `manage.py seed_blog` first.")
+        self.token = str(AccessToken.for_user(user))
+
+        author = (
+            Post.objects.values("author__username")
+            .annotate(n=Count("pk"))
+            .order_by("-n")
+            .values_list("author__username", flat=True)
+            .first()
+        )
+        category = Category.objects.order_by("-post_count", "pk").first()
+        tag = Tag.objects.order_by("-post_count", "pk").first()
+        comment = Comment.objects.filter(post=post).order_by("pk").first()
+        since = (timezone.now() - timedelta(days=30)).date().isoformat()
+
+        lists = [
+            ("", ""),
+            ("status", "?status=PUBLISHED"),
+            ("author", f"?author={author}"),
+            ("published_from", f"?published_from={since}"),
+            ("search", f"?search={post.title.split()[0]}"),
+            ("ordering:-like_count", "?ordering=-like_count"),
+            ("ordering:-comment_count", "?ordering=-comment_count"),
+            ("ordering:published_at", "?ordering=published_at"),
+            ("ordering:-hot_score", "?ordering=-hot_score"),
+            ("page:20", "?page=20"),
+            ("cursor", "?pagination=cursor"),
+        ]
+        if category is not None:
+            lists.append(("category", f"?category={category.slug}"))
+        if tag is not None:
+            lists.append(("tags", f"?tags={tag.slug}"))
+
+        scenarios = []
+        for auth in (False, True):
+            who = "auth" if auth else "anon"
+            for label, query in lists:
+                name = f"post-list{':' + label if label else ''}:{who}"
+                scenarios.append(Scenario(name, _get(f"/api/posts/{query}"), auth))
+            scenarios += [
+                Scenario(f"post-detail:{who}", _get(f"/api/posts/{post.pk}/"), auth),
+                Scenario(f"comment-list:{who}", _get("/api/comments/"), auth),
+                Scenario(f"comment-list:post:{who}", _get(f"/api/comments/?post={post.pk}"), auth),
+            ]
+        scenarios += [
+            Scenario("post-like:toggle", _toggle(f"/api/posts/{post.pk}/like/"), True),
+            Scenario("post-bookmark:toggle", _toggle(f"/api/posts/{post.pk}/bookmark/"), True),
+            Scenario("register", _register),
+        ]
+        if comment is not None:
+            scenarios.append(
+                Scenario("comment-like:toggle", _toggle(f"/api/comments/{comment.pk}/like/"), True)
+            )
+        return scenarios
+
+    def _client(self, scenario):
+        client = APIClient()
+        if scenario.auth:
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        return client
+
+    def _iterate(self, client, scenario, i):
+        statuses = []
+        for method, path, data in scenario.requests(i):
+            response = getattr(client, method)(path, data, format="json")
+            statuses.append(response.status_code)
+        return statuses
+
+    def _run(self, scenario, options):
+        iterations, warmup, warm = options["iterations"], options["warmup"], options["warm_cache"]
+        client = self._client(scenario)
+        timings, queries, statuses = [], [], set()
+        with transaction.atomic():
+            for i in range(warmup + iterations):
+                if not warm:
+                    response_cache().clear()
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    statuses.update(self._iterate(client, scenario, i))
+                    elapsed = time.perf_counter() - started
+                if i >= warmup:
+                    timings.append(elapsed)
+                    queries.append(len(ctx))
+
+            peaks = []
+            tracemalloc.start()
+            try:
+                for i in range(warmup + iterations, warmup + iterations + ALLOC_ITERATIONS):
+                    if not warm:
+                        response_cache().clear()
+                    base = tracemalloc.get_traced_memory()[0]
+                    tracemalloc.reset_peak()
+                    self._iterate(client, scenario, i)
+                    peaks.append(tracemalloc.get_traced_memory()[1] - base)
+            finally:
+                tracemalloc.stop()
+            transaction.set_rollback(True)
+
+        p50, p95 = np.percentile(timings, [50, 95]) * 1000
+        return {
+            "status": sorted(statuses),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "mean_ms": round(float(np.mean(timings)) * 1000, 3),
+            "queries": int(np.median(queries)),
+            "peak_kib": round(float(np.median(peaks)) / 1024, 1),
+        }
+
+    def _print_row(self, name, result):
+        self.stdout.write(
+            f"{name:<40} {','.join(map(str, result['status'])):<8} "
+            f"p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+            f"{result['queries']:>3} queries  {result['peak_kib']:>8.1f} KiB"
+        )
+
+    def _compare(self, path, results, threshold):
+        with open(path) as fh:
+            baseline = json.load(fh)["scenarios"]
+
+        regressions = []
+        for name, now in results.items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            for key in ("p50_ms", "p95_ms", "peak_kib"):
+                if now[key] > before[key] * (1 + threshold):
+                    regressions.append(f"{name}: {key} {before[key]} -> {now[key]}")
+            if now["queries"] > before["queries"]:
+                regressions.append(f"{name}: queries {before['queries']} -> {now['queries']}")
+            if now["status"] != before["status"]:
+                regressions.append(f"{name}: status {before['status']} -> {now['status']}")
+
+        missing = len(set(baseline) - set(results))
+        if missing:
+            self.stdout.write(f"{missing} baseline scenario(s) not run this time.")
+        if regressions:
+            for line in regressions:
+                self.stderr.write(line)
+            raise CommandError(f"{len(regressions)} regression(s) against {path}.")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {path}."))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog.models import JobWatermark, Post
+from blog.utility.cache import GLOBAL_VERSION, bump_versions
+from blog.utility.trending import WATERMARK, hot_scores, touched_posts
+
+
+class Command(BaseCommand):
+    help = "Recompute Post.hot_score for posts with activity since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--full", action="store_true", help="Rescore every post.")
+
+    def handle(self, *args, **options):
+        batch = options["batch_size"]
+        # taken before reading, so activity during the run is seen next time
+        started = timezone.now()
+        mark = JobWatermark.objects.filter(name=WATERMARK).first()
+        if options["full"] or mark is None:
+            post_ids = list(Post.objects.order_by("pk").values_list("pk", flat=True))
+        else:
+            post_ids = touched_posts(mark.value)
+
+        for i in range(0, len(post_ids), batch):
+            chunk = post_ids[i : i + batch]
+            posts = [Post(pk=pk, hot_score=score) for pk, score in hot_scores(chunk).items()]
+            with transaction.atomic():
+                Post.objects.bulk_update(posts, ["hot_score"])
+            self.stdout.write(f"{i + len(chunk)}/{len(post_ids)} post(s) scored...")
+
+        JobWatermark.objects.update_or_create(name=WATERMARK, defaults={"value": started})
+        if post_ids:
+            bump_versions(GLOBAL_VERSION)
+        self.stdout.write(self.style.SUCCESS(f"Rescored {len(post_ids)} post(s)."))
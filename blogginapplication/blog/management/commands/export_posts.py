@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.filter import PostFilter
+from blog.models import Post
+from blog.utility.export import DEFAULT_CHUNK_SIZE, EXPORTS, OUTPUTS, export_lines
+
+
+class Command(BaseCommand):
+    help = "Stream posts (or their comments) as NDJSON or CSV, in id order."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", choices=list(OUTPUTS), default="ndjson")
+        parser.add_argument("--kind", choices=list(EXPORTS), default="posts")
+        parser.add_argument("--file", help="Write here instead of stdout.")
+        parser.add_argument("--after-id", type=int, default=0, help="Resume after this id.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        # same filters as /api/posts/
+        for name in PostFilter.Meta.fields:
+            parser.add_argument(f"--{name.replace('_', '-')}", dest=name)
+
+    def handle(self, *args, **options):
+        data = {name: options[name] for name in PostFilter.Meta.fields if options[name]}
+        filterset = PostFilter(data, queryset=Post.objects.all())
+        if not filterset.is_valid():
+            raise CommandError(filterset.errors.as_text())
+
+        lines = export_lines(
+            options["kind"],
+            options["output"],
+            filterset.qs,
+            after_id=options["after_id"],
+            chunk_size=options["chunk_size"],
+        )
+        if not options["file"]:
+            self.stdout.writelines(lines)
+            return
+        with open(options["file"], "w", encoding="utf-8", newline="") as out:
+            out.writelines(lines)
@@ -0,0 +1,37 @@
+import json
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.utility.importer import DEFAULT_BATCH_SIZE, import_posts
+
+
+class Command(BaseCommand):
+    help = "Import posts from an NDJSON file (one post object per line)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="NDJSON file, or - for stdin.")
+        parser.add_argument("--author", required=True, help="Username to own the posts.")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            author = User.objects.get(username=options["author"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named '{options['author']}'.")
+
+        if options["path"] == "-":
+            report = import_posts(sys.stdin, author, options["batch_size"])
+        else:
+            with open(options["path"], encoding="utf-8") as fh:
+                report = import_posts(fh, author, options["batch_size"])
+
+        for error in report["errors"]:
+            self.stderr.write(json.dumps(error))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['created']} post(s), {len(report['errors'])} row(s) rejected."
+            )
+        )
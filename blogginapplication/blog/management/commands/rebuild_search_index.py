@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.utility.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the posts full-text search index from scratch."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} post(s)."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Comment, Post
+from blog.utility.counters import comment_count_expressions, post_count_expressions, recount
+
+
+class Command(BaseCommand):
+    help = "Recount denormalized like/comment/bookmark counters in chunks and fix drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk = options["chunk_size"]
+        fixed_posts = recount(Post, post_count_expressions(), chunk)
+        fixed_comments = recount(Comment, comment_count_expressions(), chunk)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reconciled {fixed_posts} post(s) and {fixed_comments} comment(s)."
+            )
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Category, Tag
+from blog.utility.taxonomy import refresh_taxonomy_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute post_count and last_published_at for every category and tag."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        chunk = options["chunk_size"]
+        for model, key in ((Category, "category_ids"), (Tag, "tag_ids")):
+            ids = list(model.objects.order_by("pk").values_list("pk", flat=True))
+            for i in range(0, len(ids), chunk):
+                refresh_taxonomy_stats(**{key: ids[i : i + chunk]})
+            self.stdout.write(f"{model.__name__}: {len(ids)} row(s) refreshed.")
+        self.stdout.write(self.style.SUCCESS("Taxonomy stats are up to date."))
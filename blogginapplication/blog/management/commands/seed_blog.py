@@ -0,0 +1,359 @@
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from blog.models import (
+    AuthorFollow,
+    Bookmark,
+    Category,
+    Comment,
+    CommentStatus,
+    Post,
+    PostLike,
+    PostStatus,
+    Profile,
+    Tag,
+    TagFollow,
+)
+from blog.utility.cache import GLOBAL_VERSION, REFS_VERSION, bump_versions
+from blog.utility.counters import (
+    comment_count_expressions,
+    post_count_expressions,
+    profile_count_expressions,
+    recount,
+    tag_count_expressions,
+)
+from blog.utility.timeline import fan_out
+
+USERNAME = "seed{:07d}"
+PASSWORD = "password"
+
+WORDS = (
+    "api cache query index latency python django model view serializer request "
+    "response thread async queue worker database table column row join filter "
+    "order limit offset cursor page token session user post comment tag category "
+    "like bookmark feed search score rank trend metric trace log error retry "
+    "deploy build test bench profile memory cpu disk network socket stream batch "
+    "schema migration lock transaction commit replica shard partition vacuum "
+    "the a of and to in is for on with that this it as at by from or be are was"
+).split()
+
+POST_STATUSES = ([PostStatus.PUBLISHED, PostStatus.DRAFT, PostStatus.ARCHIVED], [0.85, 0.12, 0.03])
+COMMENT_STATUSES = (
+    [CommentStatus.VISIBLE, CommentStatus.HIDDEN, CommentStatus.PENDING],
+    [0.93, 0.04, 0.03],
+)
+NO_CATEGORY_SHARE = 0.1
+MAX_TAGS_PER_POST = 5
+REPLY_SHARE = 0.4
+
+
+@contextmanager
+def _explicit_timestamps(*models):
+    """Let bulk_create keep the created_at/updated_at we generate."""
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with a synthetic blog for load testing: users, posts "
+        "with Zipf-skewed authors/categories/tags, likes, bookmarks, two-level "
+        "comments, author/tag follows and the timelines they fill. The same "
+        "--seed gives the same data; timestamps are relative to the start of the run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--posts", type=int, default=10000)
+        parser.add_argument("--categories", type=int, default=20)
+        parser.add_argument("--tags", type=int, default=300)
+        parser.add_argument(
+            "--likes", type=int, default=100000, help="Attempted; duplicate pairs are skipped."
+        )
+        parser.add_argument(
+            "--bookmarks", type=int, default=20000, help="Attempted; duplicate pairs are skipped."
+        )
+        parser.add_argument("--comments", type=int, default=50000)
+        parser.add_argument(
+            "--author-follows", type=int, default=20000,
+            help="Attempted; duplicate pairs and self-follows are skipped.",
+        )
+        parser.add_argument(
+            "--tag-follows", type=int, default=5000,
+            help="Attempted; duplicate pairs are skipped.",
+        )
+        parser.add_argument("--days", type=int, default=365, help="Spread of publish dates.")
+        parser.add_argument(
+            "--skew", type=float, default=1.1, help="Zipf exponent for popularity."
+        )
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        if User.objects.filter(username=USERNAME.format(0)).exists():
+            raise CommandError("This database has already been seeded.")
+        if min(options["users"], options["posts"], options["categories"], options["tags"]) < 1:
+            raise CommandError("--users, --posts, --categories and --tags must be at least 1.")
+
+        self.rng = np.random.default_rng(options["seed"])
+        self.batch = options["batch_size"]
+        self.skew = options["skew"]
+        self.now = timezone.now().replace(minute=0, second=0, microsecond=0)
+        self.span = options["days"] * 86400
+        started = time.monotonic()
+
+        timestamped = (
+            Profile, Category, Tag, Post, PostLike, Bookmark, Comment, AuthorFollow, TagFollow
+        )
+        with _explicit_timestamps(*timestamped):
+            users = self._users(options["users"])
+            categories = self._taxonomy(Category, options["categories"])
+            tags = self._taxonomy(Tag, options["tags"])
+            posts, ages = self._posts(options["posts"], users, categories, tags)
+            if len(posts):
+                self._reactions(PostLike, options["likes"], users, posts, ages)
+                self._reactions(Bookmark, options["bookmarks"], users, posts, ages)
+                self._comments(options["comments"], users, posts, ages)
+            self._follows(AuthorFollow, "author_id", options["author_follows"], users, users)
+            self._follows(TagFollow, "tag_id", options["tag_follows"], users, tags)
+
+        self.stdout.write("Counting likes, bookmarks, comments and followers...")
+        self._refresh_counters()
+        self._timelines(posts)
+        call_command("refresh_taxonomy_stats", stdout=self.stdout)
+        call_command("compute_hot_scores", "--full", stdout=self.stdout)
+        call_command("rebuild_search_index", stdout=self.stdout)
+        bump_versions(GLOBAL_VERSION, REFS_VERSION)
+        self.stdout.write(
+            self.style.SUCCESS(f"Seeded in {time.monotonic() - started:.1f}s.")
+        )
+
+    # sampling
+
+    def _skewed(self, n):
+        """Sampler of indices in [0, n): a Zipf-like few are drawn most often."""
+        weights = 1.0 / np.arange(1, n + 1) ** self.skew
+        cdf = np.cumsum(weights)
+        cdf /= cdf[-1]
+        popular = self.rng.permutation(n)
+        return lambda size: popular[np.searchsorted(cdf, self.rng.random(size), side="right")]
+
+    def _words(self, lengths):
+        tokens = np.array(WORDS)[self.rng.integers(0, len(WORDS), int(lengths.sum()))].tolist()
+        out, at = [], 0
+        for length in lengths.tolist():
+            out.append(" ".join(tokens[at : at + length]))
+            at += length
+        return out
+
+    def _at(self, seconds_ago):
+        return [self.now - timedelta(seconds=s) for s in seconds_ago.tolist()]
+
+    def _after(self, ages, size):
+        """Seconds ago of events following items published ``ages`` ago, mostly soon after."""
+        return ages - ages * self.rng.random(size) ** 3
+
+    def _batches(self, label, count):
+        for start in range(0, count, self.batch):
+            stop = min(start + self.batch, count)
+            yield start, stop
+            self.stdout.write(f"{label}: {stop}/{count}")
+
+    # tables
+
+    def _users(self, count):
+        User = get_user_model()
+        password = make_password(PASSWORD)  # one hash shared by every seeded account
+        ids = []
+        for start, stop in self._batches("users", count):
+            joined = self._at(self.rng.uniform(self.span, 2 * self.span, stop - start))
+            with transaction.atomic():
+                users = User.objects.bulk_create(
+                    [
+                        User(
+                            username=USERNAME.format(i),
+                            email=f"{USERNAME.format(i)}@example.com",
+                            password=password,
+                            date_joined=at,
+                        )
+                        for i, at in zip(range(start, stop), joined)
+                    ]
+                )
+                # bulk_create fires no post_save, so create_profile doesn't run
+                Profile.objects.bulk_create(
+                    [
+                        Profile(user=user, display_name=user.username,
+                                created_at=user.date_joined, updated_at=user.date_joined)
+                        for user in users
+                    ]
+                )
+            ids.extend(user.pk for user in users)
+        return np.array(ids, dtype=np.int64)
+
+    def _taxonomy(self, model, count):
+        at = self.now - timedelta(seconds=2 * self.span)
+        rows = []
+        for i in range(count):
+            name = f"{WORDS[i % len(WORDS)].title()} {i}"
+            rows.append(model(name=name, slug=slugify(name), created_at=at, updated_at=at))
+        with transaction.atomic():
+            rows = model.objects.bulk_create(rows)
+        self.stdout.write(f"{model.__name__}: {count} row(s) created.")
+        return np.array([row.pk for row in rows], dtype=np.int64)
+
+    def _posts(self, count, users, categories, tags):
+        """Create posts; returns (ids, seconds since publishing) of the published ones."""
+        author_of = self._skewed(len(users))
+        category_of = self._skewed(len(categories))
+        tag_of = self._skewed(len(tags))
+        Through = Post.tags.through
+        published_ids, published_ages = [], []
+
+        for start, stop in self._batches("posts", count):
+            n = stop - start
+            authors = users[author_of(n)]
+            category_ids = categories[category_of(n)]
+            no_category = self.rng.random(n) < NO_CATEGORY_SHARE
+            statuses = self.rng.choice(POST_STATUSES[0], n, p=POST_STATUSES[1])
+            ages = self.rng.uniform(0, self.span, n)
+            titles = self._words(self.rng.integers(3, 9, n))
+            bodies = self._words(np.clip(self.rng.lognormal(5.5, 0.7, n), 20, 5000).astype(int))
+            tag_counts = self.rng.integers(0, MAX_TAGS_PER_POST + 1, n)
+
+            posts = []
+            for i, at in enumerate(self._at(ages)):
+                published = statuses[i] == PostStatus.PUBLISHED
+                post = Post(
+                    author_id=int(authors[i]),
+                    title=titles[i].capitalize(),
+                    slug=f"{slugify(titles[i])}-s{start + i}",
+                    body=bodies[i],
+                    status=str(statuses[i]),
+                    category_id=None if no_category[i] else int(category_ids[i]),
+                    published_at=at if published else None,
+                    created_at=at,
+                    updated_at=at,
+                )
+                post.refresh_text_stats()
+                posts.append(post)
+
+            with transaction.atomic():
+                Post.objects.bulk_create(posts)
+                Through.objects.bulk_create(
+                    [
+                        Through(post_id=post.pk, tag_id=int(tag_id))
+                        for post, k in zip(posts, tag_counts.tolist())
+                        for tag_id in dict.fromkeys(tags[tag_of(k)].tolist())
+                    ]
+                )
+            for post, age in zip(posts, ages.tolist()):
+                if post.published_at is not None:
+                    published_ids.append(post.pk)
+                    published_ages.append(age)
+        return np.array(published_ids, dtype=np.int64), np.array(published_ages)
+
+    def _reactions(self, model, count, users, posts, ages):
+        post_of = self._skewed(len(posts))
+        for start, stop in self._batches(model.__name__, count):
+            n = stop - start
+            picked = post_of(n)
+            user_ids = users[self.rng.integers(0, len(users), n)]
+            times = self._at(self._after(ages[picked], n))
+            with transaction.atomic():
+                model.objects.bulk_create(
+                    [
+                        model(post_id=int(post_id), user_id=int(user_id), created_at=at, updated_at=at)
+                        for post_id, user_id, at in zip(posts[picked], user_ids, times)
+                    ],
+                    ignore_conflicts=True,
+                )
+
+    def _comments(self, count, users, posts, ages):
+        """Top-level comments on skewed posts, plus replies to comments of the same batch."""
+        post_of = self._skewed(len(posts))
+        for start, stop in self._batches("comments", count):
+            n = stop - start
+            n_replies = int(n * REPLY_SHARE)
+            n_roots = n - n_replies
+            picked = post_of(n_roots)
+            root_ages = self._after(ages[picked], n_roots)
+            authors = users[self.rng.integers(0, len(users), n)]
+            statuses = self.rng.choice(COMMENT_STATUSES[0], n, p=COMMENT_STATUSES[1]).tolist()
+            bodies = self._words(self.rng.integers(5, 60, n))
+
+            roots = [
+                Comment(post_id=int(post_id), author_id=int(authors[i]), body=bodies[i],
+                        status=statuses[i], created_at=at, updated_at=at)
+                for i, (post_id, at) in enumerate(zip(posts[picked], self._at(root_ages)))
+            ]
+            parents = self.rng.integers(0, n_roots, n_replies)
+            reply_times = self._at(self._after(root_ages[parents], n_replies))
+            with transaction.atomic():
+                Comment.objects.bulk_create(roots)
+                Comment.objects.bulk_create(
+                    [
+                        Comment(post_id=roots[p].post_id, parent_id=roots[p].pk,
+                                author_id=int(authors[n_roots + i]), body=bodies[n_roots + i],
+                                status=statuses[n_roots + i], created_at=at, updated_at=at)
+                        for i, (p, at) in enumerate(zip(parents.tolist(), reply_times))
+                    ]
+                )
+
+    def _follows(self, model, field, count, users, targets):
+        """Follows of Zipf-skewed ``targets`` (users or tags) by uniformly picked users."""
+        target_of = self._skewed(len(targets))
+        for start, stop in self._batches(model.__name__, count):
+            n = stop - start
+            target_ids = targets[target_of(n)]
+            user_ids = users[self.rng.integers(0, len(users), n)]
+            times = self._at(self.rng.uniform(0, self.span, n))
+            with transaction.atomic():
+                model.objects.bulk_create(
+                    [
+                        model(user_id=int(user_id), **{field: int(target_id)},
+                              created_at=at, updated_at=at)
+                        for user_id, target_id, at in zip(user_ids, target_ids, times)
+                        if model is not AuthorFollow or user_id != target_id
+                    ],
+                    ignore_conflicts=True,
+                )
+
+    def _refresh_counters(self):
+        """Set every counter column from the rows it counts, via blog.utility.counters."""
+        for model, expressions in (
+            (Post, post_count_expressions()),
+            (Comment, comment_count_expressions()),
+            (Profile, profile_count_expressions()),
+            (Tag, tag_count_expressions()),
+        ):
+            recount(model, expressions, self.batch)
+
+    def _timelines(self, posts):
+        """Fan every published post out, as if each follow predated it."""
+        for start, stop in self._batches("timelines", len(posts)):
+            with transaction.atomic():
+                for post_id in posts[start:stop].tolist():
+                    fan_out(post_id)
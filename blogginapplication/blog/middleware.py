@@ -0,0 +1,93 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from rest_framework.permissions import SAFE_METHODS
+
+from .utility.metrics import finish_sample, start_sample
+from .utility.replicas import finish_routing, pin_to_primary, start_routing
+
+
+class MetricsMiddleware:
+    """
+    Per-route request metrics (see blog.utility.metrics): latency, SQL
+    count and time, serializer time and response size, labelled with the
+    URL name so the series stay bounded. Works under WSGI and ASGI without
+    an extra thread hop; put it first so the latency covers everything.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        sample, token = start_sample()
+        response = self.get_response(request)
+        self._finish(request, response, sample, token)
+        return response
+
+    async def __acall__(self, request):
+        sample, token = start_sample()
+        response = await self.get_response(request)
+        self._finish(request, response, sample, token)
+        return response
+
+    def _finish(self, request, response, sample, token):
+        match = getattr(request, "resolver_match", None)
+        route = match.view_name if match else "unmatched"
+        size = None if response.streaming else len(response.content)
+        finish_sample(token, sample, route, request.method, response.status_code, size)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Per-request state for blog.utility.replicas: viewsets opt their safe
+    reads into a replica with use_replica(), and a user whose unsafe request
+    succeeded is pinned to the primary for BLOG_REPLICA_PIN_SECONDS, so they
+    read their own writes. Place it after AuthenticationMiddleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        _, token = start_routing()
+        try:
+            response = self.get_response(request)
+        finally:
+            finish_routing(token)
+        self._pin(request, response)
+        return response
+
+    async def __acall__(self, request):
+        _, token = start_routing()
+        try:
+            response = await self.get_response(request)
+        finally:
+            finish_routing(token)
+        if self._wrote(request, response):
+            await sync_to_async(self._pin)(request, response)
+        return response
+
+    def _wrote(self, request, response):
+        return request.method not in SAFE_METHODS and response.status_code < 400
+
+    def _pin(self, request, response):
+        if not self._wrote(request, response):
+            return
+        # DRF copies the user it authenticated (JWT included) onto the HttpRequest
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            pin_to_primary(user.pk)
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:47
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count(qs, fk):
+    sub = qs.filter(**{fk: OuterRef("pk")}).values(fk).annotate(n=Count("pk")).values("n")
+    return Coalesce(Subquery(sub, output_field=IntegerField()), 0)
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    Comment = apps.get_model("blog", "Comment")
+    PostLike = apps.get_model("blog", "PostLike")
+    Bookmark = apps.get_model("blog", "Bookmark")
+    CommentLike = apps.get_model("blog", "CommentLike")
+
+    Post.objects.update(
+        like_count=_count(PostLike.objects.all(), "post"),
+        bookmark_count=_count(Bookmark.objects.all(), "post"),
+        comment_count=_count(Comment.objects.filter(status="VISIBLE"), "post"),
+    )
+    Comment.objects.update(like_count=_count(CommentLike.objects.all(), "comment"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_bookmark'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='like_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='bookmark_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['like_count'], name='blog_post_like_co_8865ba_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['comment_count'], name='blog_post_comment_2b4f99_idx'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
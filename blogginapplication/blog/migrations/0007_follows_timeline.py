@@ -0,0 +1,70 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_hot_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='follower_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='follower_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='AuthorFollow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='author_followers', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='following_authors', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'blog_author_follow',
+                'indexes': [models.Index(fields=['author'], name='blog_author_author__d4cc0b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'author'), name='unique_author_follow')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TagFollow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='followers', to='blog.tag')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='following_tags', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'blog_tag_follow',
+                'indexes': [models.Index(fields=['tag'], name='blog_tag_fo_tag_id_86251b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'tag'), name='unique_tag_follow')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('published_at', models.DateTimeField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='blog.post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'blog_timeline_entry',
+                'indexes': [models.Index(fields=['user', '-published_at', '-post'], name='blog_timeli_user_id_09cf17_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'post'), name='unique_timeline_entry')],
+            },
+        ),
+    ]
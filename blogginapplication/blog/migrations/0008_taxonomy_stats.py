@@ -0,0 +1,68 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:00
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _stats(qs, fk, published_at):
+    grouped = qs.filter(**{fk: OuterRef("pk")}).values(fk)
+    return {
+        "post_count": Coalesce(
+            Subquery(grouped.annotate(n=Count("pk")).values("n"), output_field=IntegerField()), 0
+        ),
+        "last_published_at": Subquery(grouped.annotate(last=Max(published_at)).values("last")),
+    }
+
+
+def backfill_stats(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    Category = apps.get_model("blog", "Category")
+    Tag = apps.get_model("blog", "Tag")
+    PostTags = Post.tags.through
+
+    Category.objects.update(
+        **_stats(Post.objects.filter(status="PUBLISHED"), "category", "published_at")
+    )
+    Tag.objects.update(
+        **_stats(PostTags.objects.filter(post__status="PUBLISHED"), "tag", "post__published_at")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_follows_timeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='last_published_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='post_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='last_published_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='post_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['-post_count', 'name'], name='blog_catego_post_co_ff7d15_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['-post_count', 'name'], name='blog_tag_post_co_98a14a_idx'),
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_taxonomy_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='avatar_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='avatar_ready',
+            field=models.BooleanField(default=False),
+        ),
+    ]
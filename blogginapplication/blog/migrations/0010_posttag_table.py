@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:47
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('blog', '0009_profile_avatar_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AlterModelTable(
+            name='posttag',
+            table='blog_post_tag',
+        ),
+        migrations.RenameIndex(
+            model_name='posttag',
+            new_name='blog_post_t_tag_id_654274_idx',
+            old_name='blog_postta_tag_id_706589_idx',
+        ),
+        migrations.RenameIndex(
+            model_name='posttag',
+            new_name='blog_post_t_post_id_75de7d_idx',
+            old_name='blog_postta_post_id_52d786_idx',
+        ),
+    ]
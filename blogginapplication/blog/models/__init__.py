@@ -8,6 +8,8 @@ from .profile import Profile
 from .tag import Tag
 from .common import TimestampedModel
 from .bookmark import Bookmark
+from .watermark import JobWatermark
+from .follow import AuthorFollow, TagFollow, TimelineEntry
 
 __all__ = [
   'Comment',
@@ -20,6 +22,10 @@ __all__ = [
   'Tag',
   'TimestampedModel',
   'Bookmark',
+  'JobWatermark',
+  'AuthorFollow',
+  'TagFollow',
+  'TimelineEntry',
   'CommentStatus',
   'PostStatus',
 ]
@@ -1,20 +1,25 @@
 from django.db import models
 from .common import TimestampedModel
-from django.utils.text import slugify
+from functools import partial
+from ..utility.utils import save_with_unique_slug
 
 
 class Category(TimestampedModel):
     name = models.CharField(max_length=80, unique=True)
     slug = models.CharField(max_length=90, unique=True)
 
+    # published posts only, kept current by blog.utility.taxonomy
+    post_count = models.IntegerField(default=0)
+    last_published_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         db_table = "blog_category"
-        indexes = [models.Index(fields=["slug"])]
+        indexes = [models.Index(fields=["slug"]), models.Index(fields=["-post_count", "name"])]
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)[:90]
-        super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+        return save_with_unique_slug(self, self.name, partial(super().save, *args, **kwargs))
 
     def __str__(self):
         return self.name
@@ -25,6 +25,7 @@ class Comment(TimestampedModel):
         default=CommentStatus.VISIBLE,
         db_index=True,
     )
+    like_count = models.IntegerField(default=0)
 
     class Meta:
         db_table = 'blog_comment'
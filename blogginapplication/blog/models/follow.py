@@ -0,0 +1,56 @@
+from django.db import models
+from django.conf import settings
+from .common import TimestampedModel
+from .post import Post
+from .tag import Tag
+
+
+class AuthorFollow(TimestampedModel):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="following_authors"
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="author_followers"
+    )
+
+    class Meta:
+        db_table = "blog_author_follow"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "author"], name="unique_author_follow")
+        ]
+        indexes = [models.Index(fields=["author"])]
+
+
+class TagFollow(TimestampedModel):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="following_tags"
+    )
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name="followers")
+
+    class Meta:
+        db_table = "blog_tag_follow"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "tag"], name="unique_tag_follow")
+        ]
+        indexes = [models.Index(fields=["tag"])]
+
+
+class TimelineEntry(models.Model):
+    """
+    A published post in a follower's home feed, written at publish time.
+    ``published_at`` is copied from the post so a feed page is a range scan
+    over (user, published_at) without touching blog_post.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="timeline"
+    )
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="timeline_entries")
+    published_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "blog_timeline_entry"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "post"], name="unique_timeline_entry")
+        ]
+        indexes = [models.Index(fields=["user", "-published_at", "-post"])]
@@ -1,9 +1,10 @@
 from django.db import models
 from .common import TimestampedModel
 from django.conf import settings
-from django.utils.text import slugify
+from functools import partial
 from django.utils import timezone
 from .tag import Tag
+from ..utility.utils import save_with_unique_slug, text_stats
 
 
 class PostStatus(models.TextChoices):
@@ -44,21 +45,67 @@ class Post(TimestampedModel):
     published_at = models.DateTimeField(null=True, blank=True, db_index=True)
     tags = models.ManyToManyField(Tag, related_name="posts", blank=True)
 
+    # derived from body on save, so list queries can defer("body")
+    excerpt = models.CharField(max_length=200, blank=True, default="")
+    word_count = models.PositiveIntegerField(default=0)
+    reading_time = models.PositiveIntegerField(default=0, help_text="Minutes")
+
+    # denormalized counters, kept in sync by blog.utility.counters
+    like_count = models.IntegerField(default=0)
+    comment_count = models.IntegerField(default=0)
+    bookmark_count = models.IntegerField(default=0)
+
+    # log-space time-decayed activity, recomputed by `manage.py compute_hot_scores`
+    hot_score = models.FloatField(default=0.0)
+
     class Meta:
         db_table = "blog_post"
         indexes = [
             models.Index(fields=["status", "published_at"]),
             models.Index(fields=["author", "created_at"]),
+            models.Index(fields=["like_count"]),
+            models.Index(fields=["comment_count"]),
+            models.Index(fields=["status", "-hot_score"]),
         ]
         ordering = ["-published_at", "-created_at"]
 
+    TEXT_STATS_FIELDS = ("excerpt", "word_count", "reading_time")
+    # what category/tag post counts depend on
+    TAXONOMY_FIELDS = ("category_id", "status", "published_at")
+
+    @staticmethod
+    def visible_to(user) -> models.Q:
+        """Filter for the posts ``user`` may read: published ones, plus their own."""
+        visible = models.Q(status=PostStatus.PUBLISHED)
+        if user is not None and user.is_authenticated:
+            visible |= models.Q(author=user)
+        return visible
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_taxonomy = instance.taxonomy_state()
+        return instance
+
+    def taxonomy_state(self):
+        # read __dict__ so deferred fields aren't loaded just to compare them
+        return tuple(self.__dict__.get(name) for name in self.TAXONOMY_FIELDS)
+
+    def refresh_text_stats(self):
+        for field, value in text_stats(self.body).items():
+            setattr(self, field, value)
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base = slugify(self.title)[:80]
-            self.slug = base
+        if "body" not in self.get_deferred_fields():
+            self.refresh_text_stats()
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "body" in update_fields:
+                kwargs["update_fields"] = {*update_fields, *self.TEXT_STATS_FIELDS}
         if self.status == PostStatus.PUBLISHED and not self.published_at:
             self.published_at = timezone.now()
-        return super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+        return save_with_unique_slug(self, self.title, partial(super().save, *args, **kwargs))
 
     def __str__(self):
         return f"{self.title} ({self.status})"
@@ -10,6 +10,10 @@ class Profile(TimestampedModel):
     display_name = models.CharField(max_length=50, blank=True)
     bio = models.TextField(max_length=500, blank=True)
     avatar = models.ImageField(upload_to="avatars/", blank=True)
+    follower_count = models.IntegerField(default=0)
+    # sha256 of the uploaded avatar; thumbnails live under this name
+    avatar_hash = models.CharField(max_length=64, blank=True)
+    avatar_ready = models.BooleanField(default=False)
 
     class Meta:
         db_table = "blog_profile"
@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class JobWatermark(models.Model):
+    """How far an incremental background job has processed, by job name."""
+
+    name = models.CharField(max_length=50, unique=True)
+    value = models.DateTimeField()
+
+    class Meta:
+        db_table = "blog_job_watermark"
+
+    def __str__(self):
+        return f"{self.name} @ {self.value}"
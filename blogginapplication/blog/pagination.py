@@ -1,7 +1,235 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over the view's ``keyset_ordering``, e.g.
+    ``("-published_at", "-created_at", "-id")``. The cursor is an opaque token
+    holding the sort key of the last row served, so every page is a
+    ``WHERE key < cursor ORDER BY key LIMIT n`` whatever its depth. NULLs sort
+    last in both directions. The client's ``?ordering=`` is ignored in this mode.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(view.keyset_ordering)
+        self.fields, self.annotated = [], set()
+        for name in self.ordering:
+            field_name = name.lstrip("-")
+            annotation = queryset.query.annotations.get(field_name)
+            if annotation is not None:
+                # a column of a joined table, e.g. a timeline entry's
+                field = annotation.output_field
+                self.annotated.add(field_name)
+            else:
+                field = queryset.model._meta.get_field(field_name)
+            self.fields.append((field_name, name.startswith("-"), field))
+
+        queryset = queryset.order_by(
+            *[
+                F(name).desc(nulls_last=True) if desc else F(name).asc(nulls_last=True)
+                for name, desc, _ in self.fields
+            ]
+        )
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(self._after(self.decode_cursor(encoded)))
+
+        rows = list(queryset[: self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def _after(self, values):
+        """Rows strictly after ``values`` in the keyset order."""
+        condition = None
+        for (name, desc, field), value in reversed(list(zip(self.fields, values))):
+            if value is None:
+                # NULLs come last: nothing is after them, equal means IS NULL
+                beyond, equal = Q(pk__in=[]), Q(**{f"{name}__isnull": True})
+            else:
+                beyond = Q(**{f"{name}__{'lt' if desc else 'gt'}": value})
+                if field.null:
+                    beyond |= Q(**{f"{name}__isnull": True})
+                equal = Q(**{name: value})
+            condition = beyond if condition is None else beyond | (equal & condition)
+        return condition
+
+    def encode_cursor(self, obj):
+        values = []
+        for name, _, field in self.fields:
+            value = getattr(obj, name if name in self.annotated else field.attname)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        raw = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, encoded):
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError
+            return [
+                None if value is None else field.to_python(value)
+                for (_, _, field), value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, DjangoValidationError):
+            raise ValidationError({self.cursor_query_param: self.invalid_cursor_message})
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        cursor = self.encode_cursor(self.page[-1])
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([("next", self.get_next_link()), ("results", data)]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
 
 
 class StandardResultsSetPagination(PageNumberPagination):
+    """
+    Page-number pagination with two opt-ins:
+
+    * ``?cursor=...`` or ``?pagination=cursor`` switches views that declare
+      ``keyset_ordering`` to KeysetPagination.
+    * ``?count=none`` skips the COUNT(*) (``count`` is null and ``next`` is
+      found by reading one extra row); ``?count=estimate`` counts at most
+      ``estimate_cap`` rows and flags the result as estimated when capped.
+    """
+
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
+
+    count_query_param = "count"
+    estimate_cap = 10000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        params = request.query_params
+        if getattr(view, "keyset_ordering", None) and (
+            KeysetPagination.cursor_query_param in params
+            or params.get("pagination") == "cursor"
+        ):
+            self.keyset = KeysetPagination()
+            self.keyset.page_size = self.page_size
+            self.keyset.max_page_size = self.max_page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        self.count_mode = params.get(self.count_query_param, "exact")
+        if self.count_mode not in ("none", "estimate"):
+            self.count_mode = "exact"
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        try:
+            self.number = int(params.get(self.page_query_param, 1))
+            if self.number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+
+        self.request = request
+        offset = (self.number - 1) * page_size
+        rows = list(queryset[offset : offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.estimated = False
+        self.count = None
+        if self.count_mode == "estimate":
+            self.count = queryset[: self.estimate_cap].count()
+            self.estimated = self.count >= self.estimate_cap
+        return rows[:page_size]
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Exact-count page-number pagination for the async read views: the
+        COUNT and the page are awaited, and the Django page is built around
+        them so get_paginated_response() is the same as on the sync path.
+        """
+        self.keyset = None
+        self.count_mode = "exact"
+        self.request = request
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        return list(self.page)
+
+    def get_next_link(self):
+        if self.count_mode == "exact":
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.number + 1)
+
+    def get_previous_link(self):
+        if self.count_mode == "exact":
+            return super().get_previous_link()
+        if self.number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.number - 1)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        if self.count_mode == "exact":
+            return super().get_paginated_response(data)
+
+        payload = OrderedDict(
+            [
+                ("count", self.count),
+                ("next", self.get_next_link()),
+                ("previous", self.get_previous_link()),
+                ("results", data),
+            ]
+        )
+        if self.count_mode == "estimate":
+            payload["count_estimated"] = self.estimated
+        return Response(payload)
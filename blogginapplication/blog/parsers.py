@@ -0,0 +1,13 @@
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Newline-delimited JSON. Hands the view the raw line iterator; decoding
+    and validation happen per row so one bad line doesn't fail the request.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return stream
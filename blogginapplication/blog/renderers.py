@@ -0,0 +1,15 @@
+from rest_framework.renderers import BaseRenderer
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Plain-text Prometheus exposition; the view hands over the finished text."""
+
+    media_type = "text/plain"
+    format = "txt"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        # errors (403 etc.) arrive as dicts
+        return "\n".join(f"{key}: {value}" for key, value in data.items()).encode(self.charset)
@@ -1,12 +1,25 @@
 from .common import (
     UserMiniSerializer,
     CategorySerializer,
+    CategoryStatsSerializer,
     TagSerializer,
+    TagStatsSerializer,
     ProfileSerializer,
 )
-from .post import PostListSerializer, PostWriteSerializer, PostDetailsSerializer
+from .post import (
+    PostListSerializer,
+    PostWriteSerializer,
+    PostDetailsSerializer,
+    PostImportRowSerializer,
+)
 from .comment import CommentReadSerializer, CommentWriteSerializer
-from .reactions import PostLikeSerializer, CommentLikeSerializer, BookmarkSerializer
+from .reactions import (
+    PostLikeSerializer,
+    CommentLikeSerializer,
+    BookmarkSerializer,
+    BulkReactionSerializer,
+    ReactionResultSerializer,
+)
 from .auth import (
     RegisterSerializer,
     UserMeSerializer,
@@ -19,14 +32,19 @@ __all__ = [
     "UserMiniSerializer",
     "CategorySerializer",
     "TagSerializer",
+    "CategoryStatsSerializer",
+    "TagStatsSerializer",
     "PostListSerializer",
     "PostWriteSerializer",
     "PostDetailsSerializer",
+    "PostImportRowSerializer",
     "CommentReadSerializer",
     "CommentWriteSerializer",
     "PostLikeSerializer",
     "CommentLikeSerializer",
     "BookmarkSerializer",
+    "BulkReactionSerializer",
+    "ReactionResultSerializer",
     "ProfileSerializer",
     "RegisterSerializer",
     "UserMeSerializer",
@@ -1,19 +1,39 @@
-from django.db.models import Count
+from django.db import models, transaction
 from rest_framework import serializers
-from ..models import Comment, CommentStatus
-from .common import UserMiniSerializer
-from ..utility.utils import auth_user, is_liked_by_user
+from ..models import Comment, CommentStatus, Post
+from .common import UserMiniSerializer, SparseFieldsMixin, ViewerStateListSerializer
+from ..utility.utils import auth_user
+from ..utility.comment_tree import attach_replies
+from ..utility.counters import bump
+from ..utility.viewer_state import viewer_state
 from drf_spectacular.utils import extend_schema_field, OpenApiTypes
 
 
+class CommentTreeListSerializer(ViewerStateListSerializer):
+    """
+    Loads the replies of the whole page in one query (unless the caller
+    already built the tree) and primes viewer state for replies as well.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        if "replies" in self.child.fields:
+            attach_replies(items)
+            replies = [r.id for c in items for r in c.loaded_replies]
+            viewer_state(self.context).prime("comment_like", replies)
+        return super().to_representation(items)
+
 
 class CommentReplySerializer(serializers.ModelSerializer):
     author = UserMiniSerializer(read_only=True)
     like_count = serializers.IntegerField(read_only=True)
     is_liked_by_me = serializers.SerializerMethodField()
 
+    viewer_relations = {"comment_like": "is_liked_by_me"}
+
     class Meta:
         model = Comment
+        list_serializer_class = ViewerStateListSerializer
         fields = (
             "id", "post", "author", "parent", "body", "status",
             "created_at", "updated_at", "like_count", "is_liked_by_me"
@@ -22,17 +42,19 @@ class CommentReplySerializer(serializers.ModelSerializer):
 
     @extend_schema_field(OpenApiTypes.BOOL)
     def get_is_liked_by_me(self, obj):
-        req = self.context.get("request")
-        return is_liked_by_user(getattr(req, "user", None), comment_id=obj.id)
+        return viewer_state(self.context).has("comment_like", obj.id)
 
-class CommentReadSerializer(serializers.ModelSerializer):
+class CommentReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = UserMiniSerializer(read_only=True)
     like_count = serializers.IntegerField(read_only=True)
     is_liked_by_me = serializers.SerializerMethodField()
     replies = serializers.SerializerMethodField()
 
+    viewer_relations = {"comment_like": "is_liked_by_me"}
+
     class Meta:
         model = Comment
+        list_serializer_class = CommentTreeListSerializer
         fields = (
             "id",
             "post",
@@ -50,23 +72,27 @@ class CommentReadSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(OpenApiTypes.BOOL)
     def get_is_liked_by_me(self, obj):
-        req = self.context.get("request")
-        return is_liked_by_user(getattr(req, "user", None), comment_id=obj.id)
+        return viewer_state(self.context).has("comment_like", obj.id)
 
     @extend_schema_field(CommentReplySerializer(many=True))
     def get_replies(self, obj):
-        qs = (
-            obj.replies.filter(status=CommentStatus.VISIBLE)
-            .select_related("author")
-            .annotate(like_count=Count("likes"))
-        )
-        return CommentReplySerializer(qs, many=True, context=self.context).data
+        attach_replies([obj])
+        return CommentReplySerializer(
+            obj.loaded_replies, many=True, context=self.context
+        ).data
     
 class CommentWriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ("post", "parent", "body")
 
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is not None:
+            # a comment stays on its post; comment_count is kept per post
+            fields["post"].read_only = True
+        return fields
+
     def validate(self, attrs):
         parent = attrs.get("patent")
         post = attrs.get("post")
@@ -78,6 +104,10 @@ class CommentWriteSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("Only one reply level is allowed.")
         return attrs
     
+    @transaction.atomic
     def create(self, validated):
         user = auth_user(self.context.get("request"))
-        return Comment.objects.create(author=user, **validated)
+        comment = Comment.objects.create(author=user, **validated)
+        if comment.status == CommentStatus.VISIBLE:
+            bump(Post, comment.post_id, comment_count=1)
+        return comment
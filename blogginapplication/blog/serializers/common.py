@@ -1,10 +1,55 @@
 from django.contrib.auth import get_user_model
+from django.db import models
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from ..models import Profile, Category, Tag
+from ..utility.avatars import InvalidImage, inspect_image, store_avatar, thumbnail_urls
+from ..utility.viewer_state import viewer_state
 
 
 User = get_user_model()
 
+
+class ViewerStateListSerializer(serializers.ListSerializer):
+    """
+    Resolves the child's ``viewer_relations`` (relation -> field, e.g. likes
+    -> ``is_liked_by_me``) for the whole page up front, so per-row fields are
+    set lookups. Relations whose field was dropped are not queried at all.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        state = viewer_state(self.context)
+        ids = [obj.pk for obj in items]
+        for relation, field in getattr(self.child, "viewer_relations", {}).items():
+            if field in self.child.fields:
+                state.prime(relation, ids)
+        return super().to_representation(items)
+
+
+class SparseFieldsMixin:
+    """
+    Serializer side of sparse fieldsets: ``fields`` keeps only the named
+    fields, ``omit`` drops the named ones and ``slim`` swaps in the compact
+    variants from ``slim_fields``. ``field_presets`` maps ``?view=`` names
+    to field lists. See blog.views.mixins.SparseFieldsetMixin.
+    """
+
+    field_presets = {}
+    slim_fields = {}
+
+    def __init__(self, *args, fields=None, omit=None, slim=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+        if slim:
+            for name, factory in self.slim_fields.items():
+                if name in self.fields:
+                    self.fields[name] = factory()
+
 class UserMiniSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -13,12 +58,32 @@ class UserMiniSerializer(serializers.ModelSerializer):
 
 class ProfileSerializer(serializers.ModelSerializer):
     user = UserMiniSerializer(read_only=True)
+    avatar_thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Profile
-        fields = ("user", "display_name", "bio", "avatar", "created_at", "updated_at")
+        fields = (
+            "user",
+            "display_name",
+            "bio",
+            "avatar",
+            "avatar_thumbnails",
+            "follower_count",
+            "created_at",
+            "updated_at",
+        )
         read_only_fields = fields
 
+    @extend_schema_field(
+        {
+            "type": "object",
+            "nullable": True,
+            "additionalProperties": {"type": "object", "additionalProperties": {"type": "string"}},
+        }
+    )
+    def get_avatar_thumbnails(self, obj):
+        return thumbnail_urls(obj)
+
 
 class ProfileUpdateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -31,13 +96,19 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
         max_mb = 5
         if file.size > max_mb * 1024 * 1024:
             raise serializers.ValidationError(f"Max file size {max_mb}MB allowed.")
-        # type check
-        allowed = {"image/jpeg", "image/png", "image/webp"}
-        content_type = getattr(file, "content_type", None)
-        if content_type and content_type not in allowed:
-            raise serializers.ValidationError("Only JPEG/PNG/WEBP allowed.")
+        # type check from the decoded header, not the client's content type
+        try:
+            self._avatar_format = inspect_image(file)
+        except InvalidImage as exc:
+            raise serializers.ValidationError(str(exc))
         return file
 
+    def update(self, instance, validated):
+        avatar = validated.pop("avatar", None)
+        instance = super().update(instance, validated)
+        if avatar is not None:
+            store_avatar(instance, avatar, self._avatar_format)
+        return instance
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -46,7 +117,33 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ("id", "name", "slug", "created_at", "updated_at")
 
 
+class CategoryStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ("id", "name", "slug", "post_count", "last_published_at")
+        read_only_fields = fields
+
+
+class CategoryMiniSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ("id", "name", "slug")
+
+
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = ("id", "name", "slug", "created_at", "updated_at")
+
+
+class TagStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ("id", "name", "slug", "post_count", "last_published_at")
+        read_only_fields = fields
+
+
+class TagMiniSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ("id", "name", "slug")
@@ -1,23 +1,26 @@
 from rest_framework import serializers
 from django.db import transaction
-from django.db.models import Count
 from rest_framework.validators import UniqueValidator
 
-from ..models import Category, Post, Tag, PostStatus, CommentStatus
+from ..models import Category, Post, Tag, PostStatus
 
-from .common import UserMiniSerializer, CategorySerializer, TagSerializer
-from .comment import CommentReadSerializer
-from ..utility.utils import (
-    auth_user,
-    unique_slugify,
-    is_liked_by_user,
-    is_bookmarked_by_user,
-    make_excerpt,
+from .common import (
+    UserMiniSerializer,
+    CategorySerializer,
+    CategoryMiniSerializer,
+    TagSerializer,
+    TagMiniSerializer,
+    SparseFieldsMixin,
+    ViewerStateListSerializer,
 )
+from .comment import CommentReadSerializer
+from ..utility.utils import auth_user
+from ..utility.comment_tree import load_comment_tree
+from ..utility.viewer_state import viewer_state
 
 from drf_spectacular.utils import extend_schema_field, OpenApiTypes
 
-class PostListSerializer(serializers.ModelSerializer):
+class PostListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = UserMiniSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
@@ -27,16 +30,45 @@ class PostListSerializer(serializers.ModelSerializer):
 
     is_liked_by_me = serializers.SerializerMethodField()
     is_bookmarked_by_me = serializers.SerializerMethodField()
-    excerpt = serializers.SerializerMethodField()
+    # only present on ?search= results
+    search_snippet = serializers.CharField(read_only=True)
+
+    viewer_relations = {"post_like": "is_liked_by_me", "bookmark": "is_bookmarked_by_me"}
+    field_presets = {
+        # feed cards: no body, compact category/tags
+        "card": (
+            "id",
+            "title",
+            "slug",
+            "excerpt",
+            "reading_time",
+            "author",
+            "category",
+            "tags",
+            "published_at",
+            "like_count",
+            "comment_count",
+            "is_liked_by_me",
+            "is_bookmarked_by_me",
+            "search_snippet",
+        ),
+    }
+    slim_fields = {
+        "category": lambda: CategoryMiniSerializer(read_only=True),
+        "tags": lambda: TagMiniSerializer(many=True, read_only=True),
+    }
 
     class Meta:
         model = Post
+        list_serializer_class = ViewerStateListSerializer
         fields = (
             "id",
             "body",
             "is_liked_by_me",
             "is_bookmarked_by_me",
             "excerpt",
+            "word_count",
+            "reading_time",
             "author",
             "title",
             "category",
@@ -48,20 +80,16 @@ class PostListSerializer(serializers.ModelSerializer):
             "status",
             "published_at",
             "slug",
+            "search_snippet",
         )
 
     @extend_schema_field(OpenApiTypes.BOOL)
     def get_is_liked_by_me(self, obj):
-        req = self.context.get("request")
-        return is_liked_by_user(getattr(req, "user", None), post_id=obj.id)
+        return viewer_state(self.context).has("post_like", obj.id)
 
     @extend_schema_field(OpenApiTypes.BOOL)
     def get_is_bookmarked_by_me(self, obj):
-        req = self.context.get("request")
-        return is_bookmarked_by_user(getattr(req, "user", None), post_id=obj.id)
-
-    def get_excerpt(self, obj):
-        return make_excerpt(obj.body)
+        return viewer_state(self.context).has("bookmark", obj.id)
 
 
 class PostDetailsSerializer(PostListSerializer):
@@ -73,12 +101,11 @@ class PostDetailsSerializer(PostListSerializer):
 
     @extend_schema_field(CommentReadSerializer(many=True))
     def get_comments(self, obj):
-        qs = (
-            obj.comments.filter(parent__isnull=True, status=CommentStatus.VISIBLE)
-            .select_related("author")
-            .annotate(like_count=Count("likes"))
-        )
-        return CommentReadSerializer(qs, many=True, context=self.context).data
+        # the async detail view loads the tree ahead of serialization
+        tree = getattr(obj, "comment_tree", None)
+        if tree is None:
+            tree = load_comment_tree(obj.id)
+        return CommentReadSerializer(tree, many=True, context=self.context).data
 
 
 class PostWriteSerializer(serializers.ModelSerializer):
@@ -126,8 +153,7 @@ class PostWriteSerializer(serializers.ModelSerializer):
     def create(self, validated):
         user = auth_user(self.context.get("request"))
         tags = validated.pop("tags", [])
-        if not validated.get("slug"):
-            validated["slug"] = unique_slugify(Post, validated.get("title"))
+        # an empty slug is allocated by Post.save, which retries on a race
         post  = Post.objects.create(author=user, **validated)
         if tags:
             post.tags.set(tags)
@@ -136,8 +162,6 @@ class PostWriteSerializer(serializers.ModelSerializer):
     @transaction.atomic
     def update(self, instance, validated):
         tags = validated.pop("tags", [])
-        if "slug" in validated and validated["slug"] == "":
-            validated["slug"] = unique_slugify(Post, validated.get("title", instance.title))
 
         for k, v in validated.items():
             setattr(instance, k, v)
@@ -146,3 +170,23 @@ class PostWriteSerializer(serializers.ModelSerializer):
         if tags:
             instance.tags.set(tags)
         return instance
+
+
+class PostImportRowSerializer(serializers.Serializer):
+    """
+    One NDJSON import row. Category and tags are plain slugs here: they are
+    resolved for the whole batch at once by blog.utility.importer.
+    """
+
+    title = serializers.CharField(max_length=200)
+    body = serializers.CharField(allow_blank=True, required=False, default="")
+    status = serializers.ChoiceField(choices=PostStatus.choices, default=PostStatus.DRAFT)
+    slug = serializers.SlugField(max_length=210, required=False, allow_blank=True)
+    category = serializers.SlugField(required=False, allow_null=True, allow_blank=True)
+    tags = serializers.ListField(child=serializers.SlugField(), required=False, default=list)
+    published_at = serializers.DateTimeField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if attrs["status"] == PostStatus.PUBLISHED and not attrs["body"].strip():
+            raise serializers.ValidationError("Published post must have body.")
+        return attrs
@@ -1,5 +1,7 @@
+from django.db import transaction
 from rest_framework import serializers
-from ..models import PostLike, CommentLike, Bookmark
+from ..models import Comment, Post, PostLike, CommentLike, Bookmark
+from ..utility.counters import bump
 from ..utility.utils import auth_user
 
 class PostLikeSerializer(serializers.ModelSerializer):
@@ -7,9 +9,11 @@ class PostLikeSerializer(serializers.ModelSerializer):
         model = PostLike
         fields = ("post",)
 
+    @transaction.atomic
     def create(self, validated):
         user = auth_user(self.context["request"])
-        like, _ = PostLike.objects.get_or_create(user=user, post=validated["post"])
+        like, created = PostLike.objects.get_or_create(user=user, post=validated["post"])
+        bump(Post, like.post_id, like_count=int(created))
         return like
 
 class CommentLikeSerializer(serializers.ModelSerializer):
@@ -17,9 +21,11 @@ class CommentLikeSerializer(serializers.ModelSerializer):
         model = CommentLike
         fields = ("comment",)
 
+    @transaction.atomic
     def create(self, validated):
         user = auth_user(self.context["request"])
-        like, _ = CommentLike.objects.get_or_create(user=user, comment=validated["comment"])
+        like, created = CommentLike.objects.get_or_create(user=user, comment=validated["comment"])
+        bump(Comment, like.comment_id, like_count=int(created))
         return like
 
 class BookmarkSerializer(serializers.ModelSerializer):
@@ -27,7 +33,38 @@ class BookmarkSerializer(serializers.ModelSerializer):
         model = Bookmark
         fields = ("post",)
 
+    @transaction.atomic
     def create(self, validated):
         user = auth_user(self.context["request"])
-        bm, _ = Bookmark.objects.get_or_create(user=user, post=validated["post"])
+        bm, created = Bookmark.objects.get_or_create(user=user, post=validated["post"])
+        bump(Post, bm.post_id, bookmark_count=int(created))
         return bm
+
+MAX_BULK_REACTIONS = 500
+
+class ReactionOpSerializer(serializers.Serializer):
+    OPS = ("like", "unlike", "bookmark", "unbookmark")
+
+    op = serializers.ChoiceField(choices=OPS)
+    post = serializers.IntegerField(required=False, min_value=1)
+    comment = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs):
+        targets = [name for name in ("post", "comment") if name in attrs]
+        if len(targets) != 1:
+            raise serializers.ValidationError("Give exactly one of 'post' or 'comment'.")
+        if "comment" in attrs and attrs["op"] in ("bookmark", "unbookmark"):
+            raise serializers.ValidationError("Only posts can be bookmarked.")
+        return attrs
+
+class BulkReactionSerializer(serializers.Serializer):
+    ops = serializers.ListField(
+        child=ReactionOpSerializer(), allow_empty=False, max_length=MAX_BULK_REACTIONS
+    )
+
+class ReactionResultSerializer(serializers.Serializer):
+    op = serializers.CharField()
+    post = serializers.IntegerField(required=False)
+    comment = serializers.IntegerField(required=False)
+    changed = serializers.BooleanField()
+    error = serializers.CharField(required=False)
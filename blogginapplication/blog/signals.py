@@ -1,7 +1,21 @@
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from .models import Profile
+from .models import (
+    Bookmark,
+    Category,
+    Comment,
+    CommentLike,
+    Post,
+    PostLike,
+    PostStatus,
+    Profile,
+    Tag,
+)
+from .utility.auth_cache import invalidate_user
+from .utility.cache import GLOBAL_VERSION, REFS_VERSION, bump_versions, invalidate_post
+from .utility.search import get_search_backend
+from .utility.taxonomy import refresh_taxonomy_stats
 import logging
 
 
@@ -12,3 +26,121 @@ def create_profile(sender, instance, created, **kwargs):
     logger.info(f"create_profile signal fired for {instance.username}")
     if created:
         Profile.objects.create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or {"title", "body"} & set(update_fields):
+        get_search_backend().index([instance])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=PostLike)
+@receiver(post_delete, sender=PostLike)
+@receiver(post_save, sender=Bookmark)
+@receiver(post_delete, sender=Bookmark)
+def invalidate_post_responses(sender, instance, **kwargs):
+    invalidate_post(instance.pk if sender is Post else instance.post_id)
+
+
+@receiver(post_save, sender=CommentLike)
+@receiver(post_delete, sender=CommentLike)
+def invalidate_comment_like_responses(sender, instance, **kwargs):
+    post_id = (
+        Comment.objects.filter(pk=instance.comment_id)
+        .values_list("post_id", flat=True)
+        .first()
+    )
+    if post_id is not None:
+        invalidate_post(post_id)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_tags(sender, instance, action, **kwargs):
+    if action.startswith("post_"):
+        if isinstance(instance, Post):
+            invalidate_post(instance.pk)
+        else:
+            bump_versions(GLOBAL_VERSION, REFS_VERSION)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_referenced(sender, instance, **kwargs):
+    bump_versions(GLOBAL_VERSION, REFS_VERSION)
+
+
+# what posts and comments embed of their author (UserMiniSerializer)
+AUTHOR_FIELDS = {"username", "first_name", "last_name"}
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_author_references(sender, instance, created, update_fields=None, **kwargs):
+    # a new user isn't anyone's author yet, and logins only save last_login
+    if created or (update_fields is not None and not AUTHOR_FIELDS & set(update_fields)):
+        return
+    bump_versions(GLOBAL_VERSION, REFS_VERSION)
+
+
+@receiver(post_save, sender=Post)
+def refresh_post_taxonomy(sender, instance, created, **kwargs):
+    before = getattr(instance, "_loaded_taxonomy", None)
+    after = instance.taxonomy_state()
+    instance._loaded_taxonomy = after
+    if before == after or (created and instance.status != PostStatus.PUBLISHED):
+        return
+    old_category = before[0] if before else None
+    # a new post has no tags yet; they arrive through m2m_changed
+    tag_ids = [] if created else instance.tags.values_list("pk", flat=True)
+    refresh_taxonomy_stats([old_category, instance.category_id], tag_ids)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_post_tags(sender, instance, **kwargs):
+    # the through rows are gone by post_delete
+    instance._deleted_tag_ids = list(instance.tags.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def refresh_deleted_post_taxonomy(sender, instance, **kwargs):
+    if instance.status == PostStatus.PUBLISHED:
+        refresh_taxonomy_stats([instance.category_id], getattr(instance, "_deleted_tag_ids", ()))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def refresh_tag_stats(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action.startswith("post_"):
+            refresh_taxonomy_stats(tag_ids=[instance.pk])
+        return
+    if instance.status != PostStatus.PUBLISHED:
+        return
+    if action == "pre_clear":
+        instance._cleared_tag_ids = list(instance.tags.values_list("pk", flat=True))
+    elif action == "post_clear":
+        refresh_taxonomy_stats(tag_ids=getattr(instance, "_cleared_tag_ids", ()))
+    elif action in ("post_add", "post_remove"):
+        refresh_taxonomy_stats(tag_ids=pk_set or ())
+
+
+# password changes, deactivation and profile edits; queryset .update()s call it themselves
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
@@ -1,3 +1,1954 @@
-from django.test import TestCase
+import csv
+import io
+import os
+import unittest
+import json
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .checks import check_shared_caches
+from .pagination import StandardResultsSetPagination
+from .throttling import LOCK_RETRY, AnonRateThrottle, ScopedRateThrottle
+from .utility.auth_cache import auth_cache, user_key
+from .utility.avatars import render_thumbnails, thumbnail_path
+from .utility.cache import GLOBAL_VERSION, bump_versions, response_cache
+from .utility.comment_tree import load_comment_tree
+from .utility.importer import import_posts
+from .utility.metrics import METRICS, Counter, Histogram
+from .utility.replicas import is_pinned
+from .utility.timeline import feed_queryset, follow_author, follow_tag
+from .utility.trending import EPOCH, WATERMARK, hot_scores
+from .utility.utils import unique_slugify, unique_slugify_many
+from .utility.viewer_state import ViewerState
+from .urls import router
+from .views.async_reads import ASYNC_READS, AsyncReadView
+from .models import (
+    AuthorFollow,
+    Bookmark,
+    Category,
+    Comment,
+    CommentLike,
+    CommentStatus,
+    JobWatermark,
+    Post,
+    PostLike,
+    PostStatus,
+    Profile,
+    Tag,
+    TagFollow,
+    TimelineEntry,
+)
+
+SMALL, LARGE = 10, 200
+PASSWORD = "Viewer-pass-1234"
+
+
+class Route:
+    """One request against a route in blog.urls and the most queries it may take."""
+
+    def __init__(self, name, budget, method="get", kwargs=None, data=None, fmt="json",
+                 content_type=None, auth=True, label=None):
+        self.name = name
+        self.budget = budget
+        self.method = method
+        self.kwargs = kwargs or (lambda t: {})
+        self.data = data or (lambda t: None)
+        self.fmt = fmt
+        self.content_type = content_type
+        self.auth = auth
+        self.label = label or f"{method.upper()} {name}"
+
+
+def _post(t):
+    return {"pk": t.post.pk}
+
+
+def _draft(t):
+    return {"pk": t.draft.pk}
+
+
+def _comment(t):
+    return {"pk": t.comment.pk}
+
+
+def _tag(t):
+    return {"slug": t.tags[0].slug}
+
+
+ROUTES = [
+    Route("api-root", 0),
+    Route("post-list", 3, auth=False, label="GET post-list (anonymous)"),
+    Route("post-list", 5),
+    Route("post-list", 5, label="GET post-list?ordering=-like_count"),
+    Route("post-list", 18, method="post", data=lambda t: {
+        "title": "New", "body": "text", "status": PostStatus.PUBLISHED,
+        "category": t.category.slug, "tags": [tag.slug for tag in t.tags],
+    }),
+    Route("post-detail", 3, kwargs=_post, auth=False, label="GET post-detail (anonymous)"),
+    Route("post-detail", 7, kwargs=_post),
+    Route("post-detail", 8, method="patch", kwargs=_post, data=lambda t: {"title": "Renamed"}),
+    Route("post-detail", 11, method="delete", kwargs=_draft),
+    Route("post-publish", 4, method="post", kwargs=_draft),
+    Route("post-unpublished", 7, method="post", kwargs=_post),
+    Route("post-like", 4, method="post", kwargs=_draft),
+    Route("post-like", 4, method="delete", kwargs=_post),
+    Route("post-bookmark", 4, method="post", kwargs=_draft),
+    Route("post-trending", 5),
+    Route("post-feed", 7),
+    Route("post-export", 2),
+    Route(
+        "post-bulk-import", 10, method="post", fmt=None, content_type="application/x-ndjson",
+        data=lambda t: "\n".join(
+            json.dumps({"title": f"Imported {i}", "body": "x", "tags": [t.tags[0].slug]})
+            for i in range(3)
+        ),
+    ),
+    Route("comment-list", 5),
+    Route("comment-list", 5, label="GET comment-list?post="),
+    Route("comment-list", 5, method="post", data=lambda t: {"post": t.post.pk, "body": "hi"}),
+    Route("comment-detail", 4, kwargs=_comment),
+    Route("comment-detail", 10, method="delete", kwargs=_comment),
+    Route("comment-like", 5, method="post", kwargs=lambda t: {"pk": t.reply.pk}),
+    Route("category-list", 2),
+    Route("category-detail", 1, kwargs=lambda t: {"slug": t.category.slug}),
+    Route("category-stats", 2),
+    Route("tag-list", 2),
+    Route("tag-detail", 1, kwargs=_tag),
+    Route("tag-stats", 2),
+    Route("tag-follow", 8, method="post", kwargs=lambda t: {"slug": t.tags[1].slug}),
+    Route("author-follow", 8, method="post", kwargs=lambda t: {"username": "author1"}),
+    Route("reactions-bulk", 9, method="post", data=lambda t: {"ops": [
+        {"op": "like", "post": t.draft.pk},
+        {"op": "bookmark", "post": t.draft.pk},
+        {"op": "like", "comment": t.reply.pk},
+    ]}),
+    Route("me-profile", 1),
+    Route("me-profile", 2, method="patch", fmt="multipart", data=lambda t: {"bio": "Hello"}),
+    Route("me", 0),
+    Route("register", 4, method="post", auth=False, data=lambda t: {
+        "username": "newcomer", "email": "newcomer@example.com",
+        "password": PASSWORD, "confirm_password": PASSWORD,
+    }),
+    Route("change-password", 1, method="post", data=lambda t: {
+        "old_password": PASSWORD, "new_password": "Changed-pass-5678",
+    }),
+    Route("metrics", 0),
+]
+
+# query strings for labels that share a route
+QUERIES = {
+    "GET post-list?ordering=-like_count": lambda t: "?ordering=-like_count",
+    "GET comment-list?post=": lambda t: f"?post={t.post.pk}",
+}
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every route in blog.urls is requested against SMALL and LARGE fixtures
+    (posts, comments on the post under test, likes, bookmarks, timeline
+    entries) and must issue the same number of queries both times, within
+    its budget. A count that differs between the sizes is an N+1.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.viewer = User.objects.create_user("viewer", password=PASSWORD, is_staff=True)
+        cls.authors = [User.objects.create_user(f"author{i}") for i in range(3)]
+        cls.category = Category.objects.create(name="Python")
+        cls.tags = [Tag.objects.create(name=f"Tag {i}") for i in range(3)]
+
+        cls.post = Post.objects.create(
+            author=cls.viewer, title="Under test", body="body", category=cls.category,
+            status=PostStatus.PUBLISHED,
+        )
+        cls.post.tags.set(cls.tags)
+        cls.draft = Post.objects.create(author=cls.viewer, title="Draft", body="body")
+        cls.comment = Comment.objects.create(post=cls.post, author=cls.viewer, body="first")
+        cls.reply = Comment.objects.create(
+            post=cls.post, author=cls.authors[0], body="reply", parent=cls.comment
+        )
+        AuthorFollow.objects.create(user=cls.viewer, author=cls.authors[0])
+        TagFollow.objects.create(user=cls.viewer, tag=cls.tags[0])
+        cls.grow(SMALL)
+
+    @classmethod
+    def grow(cls, size):
+        """Add rows until there are ``size`` posts and ``size`` comments on the post under test."""
+        now = timezone.now()
+        start = Post.objects.count()
+        posts = Post.objects.bulk_create(
+            Post(
+                author=cls.authors[i % len(cls.authors)],
+                title=f"Post {i}",
+                slug=f"post-{i}",
+                body="words " * 40,
+                status=PostStatus.PUBLISHED,
+                category=cls.category,
+                published_at=now - timedelta(minutes=i),
+            )
+            for i in range(start, size)
+        )
+        Post.tags.through.objects.bulk_create(
+            Post.tags.through(post_id=post.pk, tag_id=tag.pk) for post in posts for tag in cls.tags
+        )
+        PostLike.objects.bulk_create(PostLike(post=post, user=cls.viewer) for post in posts[::2])
+        PostLike.objects.bulk_create(PostLike(post=post, user=cls.authors[1]) for post in posts)
+        Bookmark.objects.bulk_create(Bookmark(post=post, user=cls.viewer) for post in posts[::3])
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(user=cls.viewer, post=post, published_at=post.published_at)
+            for post in posts
+        )
+
+        missing = size - Comment.objects.filter(post=cls.post, parent=None).count()
+        roots = Comment.objects.bulk_create(
+            Comment(post=posts[i % len(posts)] if i % 2 else cls.post, author=cls.authors[i % 3],
+                    body=f"comment {i}")
+            for i in range(2 * max(missing, 0))
+        )
+        replies = Comment.objects.bulk_create(
+            Comment(post_id=root.post_id, author=cls.viewer, body="reply", parent=root)
+            for root in roots
+        )
+        CommentLike.objects.bulk_create(
+            CommentLike(comment=comment, user=cls.viewer) for comment in replies[::2]
+        )
+        # threads first in the newest-first comment pages, whatever the size
+        Comment.objects.filter(pk__in=[root.pk for root in roots]).update(
+            created_at=now + timedelta(minutes=1)
+        )
+
+    def path(self, route):
+        path = reverse(route.name, kwargs=route.kwargs(self))
+        return path + QUERIES.get(route.label, lambda t: "")(self)
+
+    def count_queries(self, route):
+        for cache in caches.all():
+            cache.clear()
+        client = APIClient()
+        if route.auth:
+            # a fresh instance: force_authenticate hands the view this very object
+            client.force_authenticate(get_user_model().objects.get(pk=self.viewer.pk))
+
+        kwargs = {"format": route.fmt} if route.fmt else {"content_type": route.content_type}
+        # each request is rolled back so routes don't see each other's writes
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as ctx:
+                response = getattr(client, route.method)(
+                    self.path(route), route.data(self), **kwargs
+                )
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            transaction.set_rollback(True)
+        if response.status_code >= 400:
+            self.fail(f"{route.label}: {response.status_code} {response.content[:300]}")
+        return len(ctx)
+
+    def test_every_route_has_a_budget(self):
+        names = {key for key in get_resolver("blog.urls").reverse_dict if isinstance(key, str)}
+        self.assertEqual(names - {route.name for route in ROUTES}, set())
+
+    def test_query_counts_do_not_grow_with_data(self):
+        small = {}
+        for route in ROUTES:
+            small[route.label] = self.count_queries(route)
+
+        self.grow(LARGE)
+        for route in ROUTES:
+            with self.subTest(route.label):
+                large = self.count_queries(route)
+                self.assertEqual(
+                    large, small[route.label],
+                    f"{small[route.label]} queries at {SMALL} rows, {large} at {LARGE}",
+                )
+                self.assertLessEqual(large, route.budget)
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Reads against the "replica" alias, a second SQLite file: rows are
+    created on one database or the other so responses show where they came
+    from. TransactionTestCase, because reads inside a transaction stay on
+    the primary.
+    """
+
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.editor = get_user_model().objects.create_user("editor", is_staff=True)
+        Category.objects.create(name="On primary")
+        Category.objects.using("replica").create(name="On replica")
+        self.client = APIClient()
+
+    def names(self):
+        response = self.client.get(reverse("category-list"))
+        self.assertEqual(response.status_code, 200)
+        return [row["name"] for row in response.data["results"]]
+
+    def test_authenticated_reads_use_the_replica(self):
+        self.client.force_authenticate(self.editor)
+        self.assertEqual(self.names(), ["On replica"])
+
+    def test_anonymous_responses_are_cached_from_the_primary(self):
+        """The replica lags behind the primary; its rows must not fill the response cache."""
+        self.assertEqual(self.names(), ["On primary"])
+
+        editor = APIClient()
+        editor.force_authenticate(self.editor)
+        response = editor.post(
+            reverse("category-list"), {"name": "Fresh", "slug": "fresh"}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(Category.objects.using("replica").filter(name="Fresh").exists())
+
+        self.assertEqual(self.names(), ["Fresh", "On primary"])
+        with self.assertNumQueries(0), self.assertNumQueries(0, using="replica"):
+            self.assertEqual(self.names(), ["Fresh", "On primary"])
+
+    def test_writes_go_to_the_primary_and_pin_the_writer(self):
+        self.client.force_authenticate(self.editor)
+        self.assertEqual(self.names(), ["On replica"])
+
+        response = self.client.post(
+            reverse("category-list"), {"name": "Fresh", "slug": "fresh"}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(Category.objects.using("replica").filter(name="Fresh").exists())
+        self.assertTrue(is_pinned(self.editor.pk))
+        self.assertEqual(self.names(), ["Fresh", "On primary"])
+
+        # pin expired: back to the replica
+        caches["default"].clear()
+        self.assertEqual(self.names(), ["On replica"])
+
+    def test_failed_writes_do_not_pin(self):
+        self.client.force_authenticate(self.editor)
+        response = self.client.post(reverse("category-list"), {}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(is_pinned(self.editor.pk))
+
+    def test_other_routes_read_the_primary(self):
+        self.client.force_authenticate(self.editor)
+        response = self.client.get(reverse("me-profile"))
+        self.assertEqual(response.status_code, 200)
+
+
+class LimitedThrottle(AnonRateThrottle):
+    rate = "3/min"
+
+
+class ThrottleTests(SimpleTestCase):
+    """GCRA throttles on a process-local cache and on a shared-cache stand-in."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.backends = {
+            "locmem": LocMemCache("throttle-tests", {}),
+            "filebased": FileBasedCache(tmp.name, {}),
+        }
+        for cache in self.backends.values():
+            cache.clear()
+        self.request = RequestFactory().get("/")
+        self.request.user = AnonymousUser()
+        self.clock = 1000.0
+
+    def throttle(self, cls=LimitedThrottle, cache=None):
+        throttle = cls()
+        throttle.cache = cache or self.backends["locmem"]
+        throttle.timer = lambda: self.clock
+        return throttle
+
+    def test_bursts_up_to_the_rate_then_spaces_requests(self):
+        for name, cache in self.backends.items():
+            with self.subTest(name):
+                self.clock = 1000.0
+                allowed = [
+                    self.throttle(cache=cache).allow_request(self.request, None) for _ in range(4)
+                ]
+                self.assertEqual(allowed, [True, True, True, False])
+
+                throttle = self.throttle(cache=cache)
+                self.assertFalse(throttle.allow_request(self.request, None))
+                self.assertAlmostEqual(throttle.wait(), 20.0)
+
+                self.clock += 20
+                self.assertTrue(self.throttle(cache=cache).allow_request(self.request, None))
+                self.assertFalse(self.throttle(cache=cache).allow_request(self.request, None))
+
+    def test_stores_one_value_per_key(self):
+        throttle = self.throttle()
+        for _ in range(3):
+            throttle.allow_request(self.request, None)
+        self.assertEqual(throttle.cache.get(throttle.key), self.clock + 60)
+
+    def test_busy_lock_denies_instead_of_racing(self):
+        cache = self.backends["filebased"]
+        throttle = self.throttle(cache=cache)
+        key = throttle.get_cache_key(self.request, None)
+        cache.add(f"{key}:lock", 1)
+        self.assertFalse(throttle.allow_request(self.request, None))
+        self.assertEqual(throttle.wait(), LOCK_RETRY)
+        self.assertIsNone(cache.get(key))
+
+        cache.delete(f"{key}:lock")
+        self.assertTrue(self.throttle(cache=cache).allow_request(self.request, None))
+
+    def test_concurrent_requests_never_exceed_the_rate(self):
+        allowed = []
+
+        def hit():
+            for _ in range(5):
+                allowed.append(self.throttle().allow_request(self.request, None))
+
+        threads = [threading.Thread(target=hit) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(allowed.count(True), 3)
+
+    def test_scoped_throttle_uses_the_view_scope(self):
+        write_view = type("View", (), {"throttle_scope": "write"})()
+        allowed = [
+            self.throttle(ScopedRateThrottle).allow_request(self.request, write_view)
+            for _ in range(31)
+        ]
+        self.assertEqual(allowed.count(True), 30)
+        self.assertFalse(allowed[-1])
+
+        unscoped_view = type("View", (), {"throttle_scope": None})()
+        throttle = self.throttle(ScopedRateThrottle)
+        self.assertTrue(throttle.allow_request(self.request, unscoped_view))
+
+
+class AuthCacheTests(TestCase):
+    """JWT and session users read through the auth cache, and dropped from it on writes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("cached", password=PASSWORD)
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.jwt = APIClient()
+        self.jwt.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def queries(self, client, name="me"):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(reverse(name))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def test_jwt_user_and_profile_are_cached(self):
+        self.assertEqual(self.queries(self.jwt, "me-profile"), 1)
+        self.assertEqual(self.queries(self.jwt, "me-profile"), 0)
+
+    def test_session_user_is_cached(self):
+        client = APIClient()
+        client.login(username="cached", password=PASSWORD)
+        self.queries(client)
+        self.assertEqual(self.queries(client), 0)
+
+    def test_password_change_drops_the_entry(self):
+        self.queries(self.jwt)
+        response = self.jwt.post(
+            reverse("change-password"),
+            {"old_password": PASSWORD, "new_password": "Changed-pass-5678"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(auth_cache().get(user_key(self.user.pk)))
+
+    def test_profile_update_is_seen(self):
+        self.queries(self.jwt, "me-profile")
+        response = self.jwt.patch(reverse("me-profile"), {"bio": "Updated"}, format="multipart")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.jwt.get(reverse("me-profile")).data["bio"], "Updated")
+
+    def test_deactivated_user_is_rejected(self):
+        self.queries(self.jwt)
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        # 403 rather than 401: session authentication comes first and sends no challenge
+        self.assertEqual(self.jwt.get(reverse("me")).status_code, 403)
+
+    def test_local_memory_cache_fails_the_check_with_several_workers(self):
+        self.assertEqual(check_shared_caches(None), [])
+        with override_settings(BLOG_WORKER_PROCESSES=2):
+            errors = check_shared_caches(None)
+        self.assertEqual([e.id for e in errors], ["blog.E001", "blog.E001"])
+        self.assertIn("BLOG_AUTH_CACHE", errors[0].msg)
+
+        with tempfile.TemporaryDirectory() as location:
+            shared = {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                      "LOCATION": location}
+            local = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+            configured = {"default": shared, "auth": shared, "responses": local}
+            with override_settings(BLOG_WORKER_PROCESSES=2, CACHES=configured):
+                errors = check_shared_caches(None)
+        self.assertEqual([e.msg.split()[0] for e in errors], ["BLOG_RESPONSE_CACHE"])
+
+    def test_jwt_only_paths_skip_the_session(self):
+        client = APIClient()
+        client.login(username="cached", password=PASSWORD)
+        with override_settings(BLOG_JWT_ONLY_PATHS=["/api/"]):
+            self.assertEqual(client.get(reverse("me")).status_code, 403)
+            self.assertEqual(self.jwt.get(reverse("me")).status_code, 200)
+
+
+class SchemaTests(TestCase):
+    def test_schema_keeps_auth_schemes_and_typed_ids(self):
+        with tempfile.NamedTemporaryFile(suffix=".json") as out:
+            call_command(
+                "spectacular", "--format", "openapi-json", "--file", out.name, stderr=io.StringIO()
+            )
+            with open(out.name) as f:
+                schema = json.load(f)
+
+        self.assertEqual(set(schema["components"]["securitySchemes"]), {"cookieAuth", "jwtAuth"})
+        detail = schema["paths"]["/api/posts/{id}/"]["get"]
+        self.assertEqual(
+            {scheme for entry in detail["security"] for scheme in entry},
+            {"cookieAuth", "jwtAuth"},
+        )
+        (id_param,) = [p for p in detail["parameters"] if p["name"] == "id"]
+        self.assertEqual(id_param["schema"]["type"], "integer")
+
+
+class ReconcileCountersTests(TestCase):
+    def test_drifted_counters_are_recounted(self):
+        User = get_user_model()
+        users = [User.objects.create_user(f"counter{i}") for i in range(3)]
+        post = Post.objects.create(author=users[0], title="Counted", body="body")
+        comment = Comment.objects.create(post=post, author=users[0], body="first")
+        for user in users:
+            PostLike.objects.create(post=post, user=user)
+        Bookmark.objects.create(post=post, user=users[1])
+        CommentLike.objects.create(comment=comment, user=users[2])
+        Post.objects.filter(pk=post.pk).update(like_count=7, comment_count=0, bookmark_count=5)
+        Comment.objects.filter(pk=comment.pk).update(like_count=0)
+
+        out = io.StringIO()
+        call_command("reconcile_counters", chunk_size=1, stdout=out)
+        self.assertIn("Reconciled 1 post(s) and 1 comment(s).", out.getvalue())
+
+        post.refresh_from_db()
+        comment.refresh_from_db()
+        self.assertEqual((post.like_count, post.comment_count, post.bookmark_count), (3, 1, 1))
+        self.assertEqual(comment.like_count, 1)
+
+
+class CommentUpdateTests(TestCase):
+    def test_post_cannot_be_changed(self):
+        user = get_user_model().objects.create_user("commenter")
+        first = Post.objects.create(author=user, title="First", body="body")
+        second = Post.objects.create(author=user, title="Second", body="body")
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(
+            reverse("comment-list"), {"post": first.pk, "body": "hi"}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        comment = Comment.objects.get(post=first)
+
+        response = client.patch(
+            reverse("comment-detail", kwargs={"pk": comment.pk}),
+            {"post": second.pk, "body": "edited"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        comment.refresh_from_db()
+        self.assertEqual((comment.post_id, comment.body), (first.pk, "edited"))
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.comment_count, second.comment_count), (1, 0))
+
+
+class PostVisibilityTests(TestCase):
+    """Drafts and archived posts reach their author only, never the anonymous cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.author = User.objects.create_user("writer")
+        cls.other = User.objects.create_user("reader")
+        cls.published = Post.objects.create(
+            author=cls.author, title="Out", body="body", status=PostStatus.PUBLISHED
+        )
+        cls.hidden = [
+            Post.objects.create(author=cls.author, title=status.label, body="body", status=status)
+            for status in (PostStatus.DRAFT, PostStatus.ARCHIVED)
+        ]
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def titles(self, client, query=""):
+        response = client.get(reverse("post-list") + query)
+        self.assertEqual(response.status_code, 200)
+        return {row["title"] for row in response.data["results"]}
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_anonymous_and_other_users_see_published_posts_only(self):
+        for client in (APIClient(), self.client_for(self.other)):
+            self.assertEqual(self.titles(client), {"Out"})
+            self.assertEqual(self.titles(client, "?status=DRAFT"), set())
+            self.assertEqual(self.titles(client, "?status=ARCHIVED"), set())
+            for post in self.hidden:
+                url = reverse("post-detail", kwargs={"pk": post.pk})
+                self.assertEqual(client.get(url).status_code, 404)
+
+    def test_author_sees_their_own_drafts(self):
+        client = self.client_for(self.author)
+        every = {post.title for post in [self.published, *self.hidden]}
+        self.assertEqual(self.titles(client), every)
+        url = reverse("post-detail", kwargs={"pk": self.hidden[0].pk})
+        self.assertEqual(client.get(url).status_code, 200)
+
+    def test_other_users_cannot_react_to_drafts(self):
+        client = self.client_for(self.other)
+        for post in self.hidden:
+            for name in ("post-like", "post-bookmark"):
+                url = reverse(name, kwargs={"pk": post.pk})
+                self.assertEqual(client.post(url).status_code, 404)
+                self.assertEqual(client.delete(url).status_code, 404)
+        ops = [{"op": op, "post": post.pk} for op in ("like", "bookmark") for post in self.hidden]
+        response = client.post(reverse("reactions-bulk"), {"ops": ops}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({row["error"] for row in response.data}, {"not found"})
+        self.assertFalse(PostLike.objects.exists() or Bookmark.objects.exists())
+
+        url = reverse("post-like", kwargs={"pk": self.published.pk})
+        self.assertEqual(client.post(url).status_code, 201)
+
+    def test_author_can_react_to_their_drafts(self):
+        url = reverse("post-like", kwargs={"pk": self.hidden[0].pk})
+        self.assertEqual(self.client_for(self.author).post(url).status_code, 201)
+
+
+class ResponseCacheFreshnessTests(TestCase):
+    """An anonymous GET after a write never gets the cached pre-write response."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = get_user_model().objects.create_user("writer")
+        cls.post = Post.objects.create(
+            author=cls.author, title="Cached", body="body", status=PostStatus.PUBLISHED
+        )
+        cls.draft = Post.objects.create(author=cls.author, title="Soon", body="body")
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.anonymous = APIClient()
+        self.writer = APIClient()
+        self.writer.force_authenticate(self.author)
+        self.detail = reverse("post-detail", kwargs={"pk": self.post.pk})
+
+    def cached_get(self, url):
+        """GET ``url`` twice, the second time from the response cache."""
+        first = self.anonymous.get(url)
+        with self.assertNumQueries(0):
+            second = self.anonymous.get(url)
+        self.assertEqual(first.data, second.data)
+        return first.data
+
+    def test_like_is_seen(self):
+        self.assertEqual(self.cached_get(self.detail)["like_count"], 0)
+        self.writer.post(reverse("post-like", kwargs={"pk": self.post.pk}))
+        self.assertEqual(self.anonymous.get(self.detail).data["like_count"], 1)
+
+    def test_comment_is_seen(self):
+        self.assertEqual(self.cached_get(self.detail)["comment_count"], 0)
+        response = self.writer.post(
+            reverse("comment-list"), {"post": self.post.pk, "body": "hi"}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        data = self.anonymous.get(self.detail).data
+        self.assertEqual(data["comment_count"], 1)
+        self.assertEqual([c["body"] for c in data["comments"]], ["hi"])
+
+    def test_publish_is_seen(self):
+        titles = {row["title"] for row in self.cached_get(reverse("post-list"))["results"]}
+        self.assertEqual(titles, {"Cached"})
+        self.writer.post(reverse("post-publish", kwargs={"pk": self.draft.pk}))
+        results = self.anonymous.get(reverse("post-list")).data["results"]
+        self.assertEqual({row["title"] for row in results}, {"Cached", "Soon"})
+
+    def test_bumps_are_blind_writes_that_never_repeat(self):
+        cache, versions = response_cache(), set()
+        with mock.patch("blog.utility.cache.time.time_ns", return_value=10**18):
+            for _ in range(3):
+                # a read-modify-write could interleave with another worker's bump
+                with mock.patch.object(cache, "get", side_effect=AssertionError("read")):
+                    bump_versions(GLOBAL_VERSION)
+                versions.add(cache.get(GLOBAL_VERSION))
+        self.assertEqual(len(versions), 3)
+
+    def test_logins_and_signups_keep_the_cache(self):
+        self.cached_get(self.detail)
+        get_user_model().objects.create_user("newcomer", password=PASSWORD)
+        self.assertTrue(APIClient().login(username="newcomer", password=PASSWORD))
+        with self.assertNumQueries(0):
+            self.anonymous.get(self.detail)
+
+    def test_author_rename_is_seen(self):
+        self.assertEqual(self.cached_get(self.detail)["author"]["first_name"], "")
+        self.author.first_name = "Renamed"
+        self.author.save(update_fields=["first_name"])
+        self.assertEqual(self.anonymous.get(self.detail).data["author"]["first_name"], "Renamed")
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.reader = User.objects.create_user("follower")
+        cls.author = User.objects.create_user("followed")
+        cls.tag = Tag.objects.create(name="Followed tag")
+        follow_author(cls.reader, cls.author.pk)
+        follow_tag(cls.reader, cls.tag.pk)
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.reader_client = APIClient()
+        self.reader_client.force_authenticate(self.reader)
+        self.author_client = APIClient()
+        self.author_client.force_authenticate(self.author)
+
+    def feed(self, query=""):
+        response = self.reader_client.get(reverse("post-feed") + query)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_pages_follow_the_timeline_order(self):
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                data = {"title": f"Post {i}", "body": "text", "status": PostStatus.PUBLISHED}
+                self.author_client.post(reverse("post-list"), data, format="json")
+        for i, post in enumerate(Post.objects.order_by("title")):
+            TimelineEntry.objects.filter(post=post).update(published_at=now - timedelta(hours=i))
+
+        first = self.feed("?pagination=cursor&page_size=3")
+        second = self.reader_client.get(first["next"]).data
+        titles = [row["title"] for row in first["results"] + second["results"]]
+        self.assertEqual(titles, [f"Post {i}" for i in range(5)])
+
+    @unittest.skipUnless(connection.vendor == "sqlite", "SQLite query plan")
+    def test_timeline_pages_are_an_index_range_scan(self):
+        queryset, ordering = feed_queryset(self.reader, Post.objects.all())
+        sql, params = queryset.order_by(*ordering)[:10].query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("blog_timeline_entry USING COVERING INDEX", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_imported_posts_are_fanned_out(self):
+        lines = "\n".join(
+            json.dumps({"title": title, "body": "x", "status": status})
+            for title, status in (("Imported", PostStatus.PUBLISHED), ("Kept", PostStatus.DRAFT))
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.author_client.post(
+                reverse("post-bulk-import"), lines, content_type="application/x-ndjson"
+            )
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual([row["title"] for row in self.feed()["results"]], ["Imported"])
+
+    def test_adding_a_tag_reaches_its_followers(self):
+        other = get_user_model().objects.create_user("stranger")
+        post = Post.objects.create(
+            author=other, title="Tagged later", body="text", status=PostStatus.PUBLISHED
+        )
+        self.assertEqual(self.feed()["results"], [])
+
+        client = APIClient()
+        client.force_authenticate(other)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.patch(
+                reverse("post-detail", kwargs={"pk": post.pk}),
+                {"tags": [self.tag.slug]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["title"] for row in self.feed()["results"]], ["Tagged later"])
+
+
+class SlugTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = get_user_model().objects.create_user("slugger")
+
+    def slug(self, title):
+        return Post.objects.create(author=self.author, title=title, body="body").slug
+
+    def test_numbers_in_titles_are_not_suffixes(self):
+        self.assertEqual(self.slug("weekly update 2024"), "weekly-update-2024")
+        self.assertEqual(self.slug("weekly update 2024"), "weekly-update-2024-2")
+        self.assertEqual(self.slug("weekly update"), "weekly-update")
+        self.assertEqual(self.slug("weekly update"), "weekly-update-2")
+        self.assertEqual(
+            unique_slugify_many(Post, ["weekly update", "weekly update 2024", "weekly update"]),
+            ["weekly-update-3", "weekly-update-2024-3", "weekly-update-4"],
+        )
+
+    def test_suffixes_fill_gaps_and_respect_max_length(self):
+        for slug in ("gaps", "gaps-2", "gaps-4", "gaps-draft"):
+            Post.objects.create(author=self.author, title="x", body="body", slug=slug)
+        self.assertEqual(self.slug("Gaps"), "gaps-3")
+        self.assertEqual(self.slug("Gaps"), "gaps-5")
+
+        long_slug = self.slug("y" * 300)
+        self.assertEqual(long_slug, "y" * 210)
+        self.assertEqual(self.slug("y" * 300), "y" * 208 + "-2")
+        self.assertEqual(Tag.objects.create(name="Python").slug, "python")
+        self.assertEqual(Tag.objects.create(name="python!").slug, "python-2")
+
+    def test_slug_claimed_between_allocation_and_insert_is_retried(self):
+        def racing_allocation(model, base_text, **kwargs):
+            slug = unique_slugify(model, base_text, **kwargs)
+            if allocate.call_count == 1:
+                # another writer inserts the same slug first
+                Post.objects.create(author=self.author, title="x", body="body", slug=slug)
+            return slug
+
+        with mock.patch(
+            "blog.utility.utils.unique_slugify", side_effect=racing_allocation
+        ) as allocate:
+            self.assertEqual(self.slug("Race"), "race-2")
+        self.assertEqual(allocate.call_count, 2)
+
+    def test_integrity_errors_unrelated_to_the_slug_are_not_retried(self):
+        with mock.patch(
+            "blog.utility.utils.unique_slugify", wraps=unique_slugify
+        ) as allocate, self.assertRaises(IntegrityError):
+            Post.objects.create(author_id=None, title="Orphan", body="body")
+        self.assertEqual(allocate.call_count, 1)
+
+
+class HotScoreTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = get_user_model().objects.create_user("trender")
+
+    def post(self, title, published_at=None):
+        status = PostStatus.PUBLISHED if published_at else PostStatus.DRAFT
+        return Post.objects.create(
+            author=self.author, title=title, body="body", status=status, published_at=published_at
+        )
+
+    def test_activity_before_the_epoch_still_beats_none(self):
+        before = datetime.fromtimestamp(EPOCH, dt_timezone.utc) - timedelta(days=400)
+        imported = self.post("Imported", before)
+        like = PostLike.objects.create(post=imported, user=self.author)
+        PostLike.objects.filter(pk=like.pk).update(created_at=before)
+        quiet = self.post("Quiet")
+        scores = hot_scores([imported.pk, quiet.pk])
+        self.assertEqual(scores[quiet.pk], 0.0)
+        self.assertGreater(scores[imported.pk], 0.0)
+
+    def test_trending_orders_by_weighted_recent_activity(self):
+        now = timezone.now()
+        week_old = self.post("Week old", now - timedelta(days=7))
+        for i in range(5):
+            user = get_user_model().objects.create_user(f"fan{i}")
+            PostLike.objects.create(post=week_old, user=user)
+        PostLike.objects.filter(post=week_old).update(created_at=now - timedelta(days=7))
+        bookmarked = self.post("Bookmarked", now)
+        Bookmark.objects.create(post=bookmarked, user=self.author)
+        liked = self.post("Liked", now)
+        PostLike.objects.create(post=liked, user=self.author)
+        self.post("Draft")
+        call_command("compute_hot_scores", stdout=io.StringIO())
+
+        for alias in caches:
+            caches[alias].clear()
+        response = self.client.get(reverse("post-trending"))
+        self.assertEqual(
+            [row["title"] for row in response.data["results"]], ["Bookmarked", "Liked", "Week old"]
+        )
+
+    def test_watermark_limits_reruns_to_touched_posts(self):
+        liked = self.post("Liked", timezone.now())
+        self.post("Quiet", timezone.now())
+
+        def run(*args):
+            out = io.StringIO()
+            call_command("compute_hot_scores", *args, stdout=out)
+            return out.getvalue()
+
+        self.assertIn("Rescored 2 post(s).", run())
+        mark = JobWatermark.objects.get(name=WATERMARK).value
+        self.assertIn("Rescored 0 post(s).", run())
+        self.assertGreater(JobWatermark.objects.get(name=WATERMARK).value, mark)
+
+        PostLike.objects.create(post=liked, user=self.author)
+        self.assertIn("Rescored 1 post(s).", run())
+        liked.refresh_from_db()
+        self.assertEqual(liked.hot_score, hot_scores([liked.pk])[liked.pk])
+        self.assertIn("Rescored 2 post(s).", run("--full"))
+
+
+class ViewerStateTests(TestCase):
+    """is_liked_by_me / is_bookmarked_by_me come from one batched lookup per relation."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.viewer = User.objects.create_user("liker")
+        author = User.objects.create_user("poster")
+        cls.posts = [
+            Post.objects.create(
+                author=author, title=f"Post {i}", body="body", status=PostStatus.PUBLISHED
+            )
+            for i in range(4)
+        ]
+        PostLike.objects.create(post=cls.posts[0], user=cls.viewer)
+        PostLike.objects.create(post=cls.posts[1], user=author)
+        Bookmark.objects.create(post=cls.posts[2], user=cls.viewer)
+
+    def flags(self, client):
+        response = client.get(reverse("post-list"))
+        self.assertEqual(response.status_code, 200)
+        return {
+            row["title"]: (row["is_liked_by_me"], row["is_bookmarked_by_me"])
+            for row in response.data["results"]
+        }
+
+    def test_flags_are_per_viewer(self):
+        client = APIClient()
+        client.force_authenticate(self.viewer)
+        self.assertEqual(
+            self.flags(client),
+            {
+                "Post 0": (True, False),
+                "Post 1": (False, False),
+                "Post 2": (False, True),
+                "Post 3": (False, False),
+            },
+        )
+        self.assertEqual(set(self.flags(APIClient()).values()), {(False, False)})
+
+    def test_primed_ids_are_not_looked_up_again(self):
+        state = ViewerState(self.viewer)
+        ids = [post.pk for post in self.posts]
+        with self.assertNumQueries(1):
+            state.prime("post_like", ids)
+        with self.assertNumQueries(0):
+            self.assertEqual([state.has("post_like", pk) for pk in ids], [True, False, False, False])
+        self.assertFalse(ViewerState(AnonymousUser()).has("post_like", ids[0]))
+
+
+class CommentTreeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = get_user_model().objects.create_user("threader")
+        cls.post = Post.objects.create(
+            author=author, title="Thread", body="body", status=PostStatus.PUBLISHED
+        )
+
+        def comment(body, parent=None, status=CommentStatus.VISIBLE):
+            return Comment.objects.create(
+                post=cls.post, author=author, body=body, parent=parent, status=status
+            )
+
+        first = comment("first")
+        comment("first reply", first)
+        comment("hidden reply", first, CommentStatus.HIDDEN)
+        hidden = comment("hidden", status=CommentStatus.HIDDEN)
+        comment("orphan", hidden)
+        second = comment("second")
+        comment("second reply", second)
+
+    def test_detail_nests_visible_replies_under_visible_comments(self):
+        response = APIClient().get(reverse("post-detail", kwargs={"pk": self.post.pk}))
+        self.assertEqual(response.status_code, 200)
+        tree = [
+            (row["body"], [reply["body"] for reply in row["replies"]])
+            for row in response.data["comments"]
+        ]
+        self.assertEqual(tree, [("first", ["first reply"]), ("second", ["second reply"])])
+
+    def test_tree_is_one_query(self):
+        with self.assertNumQueries(1):
+            roots = load_comment_tree(self.post.pk)
+            [reply.author.username for root in roots for reply in root.loaded_replies]
+        self.assertEqual([root.body for root in roots], ["first", "second"])
+
+
+class CounterTests(TestCase):
+    """The stored like/bookmark/comment counters follow the API writes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("counted")
+        cls.post = Post.objects.create(
+            author=cls.user, title="Counted", body="body", status=PostStatus.PUBLISHED
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def counts(self):
+        self.post.refresh_from_db()
+        return self.post.like_count, self.post.bookmark_count, self.post.comment_count
+
+    def test_reactions_count_once(self):
+        like = reverse("post-like", kwargs={"pk": self.post.pk})
+        bookmark = reverse("post-bookmark", kwargs={"pk": self.post.pk})
+        for _ in range(2):
+            self.client.post(like)
+            self.client.post(bookmark)
+        self.assertEqual(self.counts(), (1, 1, 0))
+        for _ in range(2):
+            self.client.delete(like)
+        self.assertEqual(self.counts(), (0, 1, 0))
+
+    def test_comments_and_comment_likes(self):
+        def comment(**data):
+            response = self.client.post(
+                reverse("comment-list"), {"post": self.post.pk, "body": "hi", **data},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 201)
+            return Comment.objects.order_by("-pk").first()
+
+        root = comment()
+        comment(parent=root.pk)
+        self.assertEqual(self.counts(), (0, 0, 2))
+
+        self.client.post(reverse("comment-like", kwargs={"pk": root.pk}))
+        root.refresh_from_db()
+        self.assertEqual(root.like_count, 1)
+
+        # its reply goes with it
+        self.client.delete(reverse("comment-detail", kwargs={"pk": root.pk}))
+        self.assertEqual(self.counts(), (0, 0, 0))
+
+
+class PaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = get_user_model().objects.create_user("pager")
+        at = timezone.now()
+        for i in range(7):
+            Post.objects.create(
+                author=author, title=f"Post {i}", body="body", status=PostStatus.PUBLISHED,
+                published_at=at - timedelta(hours=i // 3),
+            )
+        # ties on both timestamps: only the id tells these rows apart
+        Post.objects.update(created_at=at)
+
+    def test_cursor_pages_cover_ties_exactly_once(self):
+        expected = list(
+            Post.objects.order_by("-published_at", "-created_at", "-id").values_list(
+                "title", flat=True
+            )
+        )
+        url, seen = reverse("post-list") + "?pagination=cursor&page_size=2", []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            seen += [row["title"] for row in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(seen, expected)
+
+    def test_bad_cursor_is_a_400(self):
+        for cursor in ("garbage", "WyJ4Il0", "W10"):
+            response = self.client.get(reverse("post-list"), {"cursor": cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+
+    def test_count_modes(self):
+        response = self.client.get(reverse("post-list"), {"count": "none", "page_size": 5})
+        self.assertIsNone(response.data["count"])
+        self.assertIsNotNone(response.data["next"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual((len(response.data["results"]), response.data["next"]), (2, None))
+
+        with mock.patch.object(StandardResultsSetPagination, "estimate_cap", 4):
+            response = self.client.get(reverse("post-list"), {"count": "estimate"})
+        self.assertEqual((response.data["count"], response.data["count_estimated"]), (4, True))
+        response = self.client.get(reverse("post-list"), {"count": "estimate", "page_size": 3})
+        self.assertEqual((response.data["count"], response.data["count_estimated"]), (7, False))
+
+
+class SearchTests(TestCase):
+    """?search= over the FTS5 index, kept current by the Post signals."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = get_user_model().objects.create_user("searcher")
+
+        def post(title, body):
+            return Post.objects.create(
+                author=cls.author, title=title, body=body, status=PostStatus.PUBLISHED
+            )
+
+        cls.in_body = post("Notes", "tuning the query planner for sqlite databases")
+        cls.in_title = post("Sqlite internals", "pages and btrees")
+        post("Unrelated", "nothing to see")
+
+    def search(self, query):
+        response = self.client.get(reverse("post-list"), {"search": query})
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"]
+
+    def test_title_matches_rank_first_with_snippets(self):
+        rows = self.search("sqlite")
+        self.assertEqual([row["title"] for row in rows], ["Sqlite internals", "Notes"])
+        self.assertIn("<mark>sqlite</mark>", rows[1]["search_snippet"])
+
+    def test_terms_are_prefixes_and_syntax_is_quoted(self):
+        self.assertEqual([row["title"] for row in self.search("plan")], ["Notes"])
+        self.assertEqual(self.search('sqlite" OR "nothing'), self.search("sqlite nothing"))
+        self.assertEqual(self.search("***"), [])
+
+    def test_edits_and_deletes_update_the_index(self):
+        self.in_body.body = "rewritten entirely"
+        self.in_body.save()
+        self.assertEqual([row["title"] for row in self.search("rewritten")], ["Notes"])
+        self.assertEqual([row["title"] for row in self.search("planner")], [])
+
+        self.in_title.delete()
+        self.assertEqual(self.search("btrees"), [])
+
+
+class SparseFieldsetTests(TestCase):
+    """?fields= / ?omit= / ?view= trim both the payload and the query."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = get_user_model().objects.create_user("sparse")
+        category = Category.objects.create(name="Databases", slug="databases")
+        cls.post = Post.objects.create(
+            author=author, title="Sparse", body="one two three", category=category,
+            status=PostStatus.PUBLISHED,
+        )
+        Comment.objects.create(post=cls.post, author=author, body="hi")
+
+    def setUp(self):
+        for alias in caches:
+            caches[alias].clear()
+
+    def get(self, name, **params):
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"][0]
+
+    def test_fields_keeps_only_the_named_fields(self):
+        row = self.get("post-list", fields="id,title,body")
+        self.assertEqual(set(row), {"id", "title", "body"})
+        self.assertEqual(row["body"], "one two three")
+        self.assertEqual(set(self.get("comment-list", fields="id,body")), {"id", "body"})
+
+    def test_omit_drops_fields_and_lists_skip_the_body(self):
+        row = self.get("post-list")
+        self.assertNotIn("body", row)
+        self.assertIn("excerpt", row)
+        row = self.get("post-list", omit="tags,author")
+        self.assertFalse({"tags", "author", "body"} & set(row))
+        self.assertNotIn("author", self.get("comment-list", omit="author"))
+
+    def test_card_view_uses_compact_nested_fields(self):
+        row = self.get("post-list", view="card")
+        self.assertNotIn("body", row)
+        self.assertNotIn("word_count", row)
+        self.assertEqual(
+            row["category"], {"id": self.post.category_id, "name": "Databases", "slug": "databases"}
+        )
+
+        response = self.client.get(reverse("post-list"), {"view": "nope"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unread_relations_are_not_loaded(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get("post-list", fields="id,title")
+        sql = " ".join(q["sql"] for q in queries.captured_queries)
+        self.assertNotIn("auth_user", sql)
+        self.assertNotIn("blog_tag", sql)
+
+
+class TextStatsTests(TestCase):
+    """excerpt/word_count/reading_time are stored on save so lists never read the body."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = get_user_model().objects.create_user("writer")
+
+    def setUp(self):
+        for alias in caches:
+            caches[alias].clear()
+
+    def create(self, body):
+        return Post.objects.create(
+            author=self.author, title="Stats", body=body, status=PostStatus.PUBLISHED
+        )
+
+    def test_save_stores_text_stats(self):
+        post = self.create("word " * 401)
+        post.refresh_from_db()
+        self.assertEqual((post.word_count, post.reading_time), (401, 3))
+        self.assertEqual(len(post.excerpt), 163)
+        self.assertTrue(post.excerpt.endswith("..."))
+
+        post.body = "short now"
+        post.save(update_fields=["body"])
+        post.refresh_from_db()
+        self.assertEqual((post.excerpt, post.word_count, post.reading_time), ("short now", 2, 1))
+
+    def test_saving_with_a_deferred_body_keeps_the_stats(self):
+        self.create("three little words")
+        post = Post.objects.defer("body").get()
+        post.title = "Renamed"
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual((post.excerpt, post.word_count), ("three little words", 3))
+
+    def test_backfill_command(self):
+        post = self.create("backfill me please")
+        Post.objects.update(excerpt="", word_count=0, reading_time=0)
+        out = io.StringIO()
+        call_command("backfill_post_stats", chunk_size=1, stdout=out)
+        post.refresh_from_db()
+        self.assertEqual(
+            (post.excerpt, post.word_count, post.reading_time), ("backfill me please", 3, 1)
+        )
+        self.assertIn("Backfilled text stats for 1 post(s).", out.getvalue())
+
+    def test_list_does_not_select_the_body(self):
+        self.create("a body nobody reads on the list")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("post-list"))
+        self.assertEqual(response.data["results"][0]["excerpt"], "a body nobody reads on the list")
+        post_selects = [
+            q["sql"] for q in queries.captured_queries if 'FROM "blog_post"' in q["sql"]
+        ]
+        self.assertTrue(post_selects)
+        self.assertFalse(any('"blog_post"."body"' in sql for sql in post_selects))
+
+
+class ImportTests(TestCase):
+    """NDJSON import: bad rows are reported by line and the rest still go in."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = get_user_model().objects.create_user("importer")
+        cls.category = Category.objects.create(name="Guides", slug="guides")
+        cls.tag = Tag.objects.create(name="Python", slug="python")
+        Post.objects.create(author=cls.author, title="Taken", body="body", slug="taken")
+
+    def ndjson(self, *rows):
+        return "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+
+    def post(self, body, user=None):
+        client = APIClient()
+        if user:
+            client.force_authenticate(user)
+        return client.post(
+            reverse("post-bulk-import"), body, content_type="application/x-ndjson"
+        )
+
+    def test_partial_success_with_an_error_report(self):
+        published = {
+            "title": "Hello world", "body": "first post here", "status": PostStatus.PUBLISHED,
+            "category": "guides", "tags": ["python"],
+        }
+        body = self.ndjson(
+            published,
+            "{not json",
+            "[1, 2]",
+            {"title": "Bad category", "category": "nope", "tags": ["python", "rust"]},
+            {"title": "Dupe", "slug": "taken"},
+            {"title": "Empty", "status": PostStatus.PUBLISHED},
+            {"title": "Hello world", "slug": "mine"},
+            {"title": "Twice", "slug": "mine"},
+            "",
+            {"title": "Hello world"},
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post(body, self.author)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["created"], 3)
+        errors = {error["line"]: error["errors"] for error in response.data["errors"]}
+        self.assertEqual(sorted(errors), [2, 3, 4, 5, 6, 8])
+        self.assertIn("Invalid JSON", errors[2]["non_field_errors"][0])
+        self.assertEqual(set(errors[4]), {"category", "tags"})
+        self.assertIn("rust", errors[4]["tags"][0])
+        self.assertIn("slug", errors[5])
+        self.assertIn("slug", errors[8])
+
+        self.assertEqual(
+            list(
+                Post.objects.filter(title="Hello world").order_by("pk").values_list("slug", flat=True)
+            ),
+            ["hello-world", "mine", "hello-world-2"],
+        )
+        post = Post.objects.get(slug="hello-world")
+        self.assertEqual((post.author, post.word_count), (self.author, 3))
+        self.assertIsNotNone(post.published_at)
+        self.assertEqual(list(post.tags.values_list("slug", flat=True)), ["python"])
+        self.category.refresh_from_db()
+        self.tag.refresh_from_db()
+        self.assertEqual((self.category.post_count, self.tag.post_count), (1, 1))
+
+        search = self.client.get(reverse("post-list"), {"search": "first"})
+        self.assertEqual([row["slug"] for row in search.data["results"]], ["hello-world"])
+
+    def test_a_bad_batch_does_not_stop_later_batches(self):
+        lines = [
+            json.dumps({"title": f"Row {i}", "slug": "taken" if i == 1 else ""}) for i in range(5)
+        ]
+        report = import_posts(lines, self.author, batch_size=2)
+        self.assertEqual(report["created"], 4)
+        self.assertEqual([error["line"] for error in report["errors"]], [2])
+
+    def test_requires_authentication(self):
+        self.assertIn(self.post(self.ndjson({"title": "x"})).status_code, (401, 403))
+
+    def test_import_posts_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson", delete=False) as fh:
+            fh.write(self.ndjson({"title": "From file"}, "oops"))
+        self.addCleanup(os.unlink, fh.name)
+        out, err = io.StringIO(), io.StringIO()
+        call_command("import_posts", fh.name, author="importer", stdout=out, stderr=err)
+        self.assertIn("Imported 1 post(s), 1 row(s) rejected.", out.getvalue())
+        self.assertEqual(json.loads(err.getvalue())["line"], 2)
+        self.assertTrue(Post.objects.filter(slug="from-file").exists())
+
+        with self.assertRaises(CommandError):
+            call_command("import_posts", fh.name, author="nobody", stdout=out)
+
+
+class BulkReactionTests(TestCase):
+    """POST /reactions/bulk/: op validation, per-op results and counters."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user("reactor")
+        other = User.objects.create_user("other")
+        cls.post = Post.objects.create(
+            author=other, title="Public", body="body", status=PostStatus.PUBLISHED
+        )
+        cls.draft = Post.objects.create(author=other, title="Draft", body="body")
+        cls.comment = Comment.objects.create(post=cls.post, author=other, body="hi")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def bulk(self, ops):
+        return self.client.post(reverse("reactions-bulk"), {"ops": ops}, format="json")
+
+    def test_ops_apply_in_order_and_report_per_op(self):
+        response = self.bulk([
+            {"op": "like", "post": self.post.pk},
+            {"op": "like", "post": self.post.pk},
+            {"op": "bookmark", "post": self.post.pk},
+            {"op": "like", "comment": self.comment.pk},
+            {"op": "like", "post": self.draft.pk},
+            {"op": "like", "post": 10**6},
+            {"op": "unbookmark", "post": self.post.pk},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["changed"], row.get("error")) for row in response.data],
+            [(True, None), (False, None), (True, None), (True, None),
+             (False, "not found"), (False, "not found"), (True, None)],
+        )
+        self.assertEqual(
+            response.data[3], {"op": "like", "comment": self.comment.pk, "changed": True}
+        )
+
+        self.post.refresh_from_db()
+        self.comment.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.comment.like_count), (1, 1))
+        self.assertFalse(Bookmark.objects.exists())
+        self.assertFalse(PostLike.objects.filter(post=self.draft).exists())
+
+    def test_op_limits(self):
+        like = {"op": "like", "post": self.post.pk}
+        for ops in (
+            [],
+            [like] * 501,
+            [{"op": "like"}],
+            [{"op": "like", "post": self.post.pk, "comment": self.comment.pk}],
+            [{"op": "bookmark", "comment": self.comment.pk}],
+            [{"op": "share", "post": self.post.pk}],
+        ):
+            self.assertEqual(self.bulk(ops).status_code, 400, ops[:1])
+        self.assertEqual(self.bulk([like] * 500).status_code, 200)
+        self.assertEqual(PostLike.objects.count(), 1)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.bulk([{"op": "like", "post": self.post.pk}])
+        self.assertIn(response.status_code, (401, 403))
+
+
+class TaxonomyStatsTests(TestCase):
+    """Category/tag post counts follow publish, unpublish, moves, tag edits and deletes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = get_user_model().objects.create_user("tagger")
+        cls.news = Category.objects.create(name="News", slug="news")
+        cls.guides = Category.objects.create(name="Guides", slug="guides")
+        cls.python = Tag.objects.create(name="Python", slug="python")
+        cls.rust = Tag.objects.create(name="Rust", slug="rust")
+
+    def setUp(self):
+        for alias in caches:
+            caches[alias].clear()
+
+    def counts(self, name):
+        # served from the response cache when nothing changed in between
+        response = self.client.get(reverse(name))
+        self.assertEqual(response.status_code, 200)
+        return {row["slug"]: row["post_count"] for row in response.data["results"]}
+
+    def test_counts_follow_the_post_lifecycle(self):
+        post = Post.objects.create(author=self.author, title="A", body="body", category=self.news)
+        post.tags.add(self.python, self.rust)
+        self.assertEqual(self.counts("category-stats"), {})
+
+        post.status = PostStatus.PUBLISHED
+        post.save()
+        self.assertEqual(self.counts("category-stats"), {"news": 1})
+        self.assertEqual(self.counts("tag-stats"), {"python": 1, "rust": 1})
+        self.news.refresh_from_db()
+        self.assertEqual(self.news.last_published_at, post.published_at)
+
+        post.category = self.guides
+        post.save()
+        post.tags.remove(self.rust)
+        self.assertEqual(self.counts("category-stats"), {"guides": 1})
+        self.assertEqual(self.counts("tag-stats"), {"python": 1})
+
+        self.rust.posts.add(post)
+        self.assertEqual(self.counts("tag-stats"), {"python": 1, "rust": 1})
+        post.tags.clear()
+        self.assertEqual(self.counts("tag-stats"), {})
+
+        post.tags.add(self.python)
+        post.status = PostStatus.DRAFT
+        post.save()
+        self.assertEqual((self.counts("category-stats"), self.counts("tag-stats")), ({}, {}))
+
+        post.status = PostStatus.PUBLISHED
+        post.save()
+        self.assertEqual(self.counts("tag-stats"), {"python": 1})
+        post.delete()
+        self.assertEqual((self.counts("category-stats"), self.counts("tag-stats")), ({}, {}))
+
+    def test_refresh_command_repairs_drift(self):
+        post = Post.objects.create(
+            author=self.author, title="A", body="body", category=self.news,
+            status=PostStatus.PUBLISHED,
+        )
+        post.tags.add(self.python)
+        Category.objects.update(post_count=7)
+        Tag.objects.update(post_count=0, last_published_at=None)
+        call_command("refresh_taxonomy_stats", chunk_size=1, stdout=io.StringIO())
+        self.assertEqual(self.counts("category-stats"), {"news": 1})
+        self.assertEqual(self.counts("tag-stats"), {"python": 1})
+        self.python.refresh_from_db()
+        self.assertEqual(self.python.last_published_at, post.published_at)
+
+
+class ConditionalGetTests(TestCase):
+    """ETag / Last-Modified come from the version counters; matches are 304s."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = get_user_model().objects.create_user("etagger")
+        cls.post = Post.objects.create(
+            author=cls.author, title="Tagged", body="body", status=PostStatus.PUBLISHED
+        )
+        cls.other = Post.objects.create(
+            author=cls.author, title="Other", body="body", status=PostStatus.PUBLISHED
+        )
+
+    def setUp(self):
+        for alias in caches:
+            caches[alias].clear()
+        self.detail = reverse("post-detail", kwargs={"pk": self.post.pk})
+
+    def test_if_none_match_is_answered_without_queries(self):
+        first = self.client.get(self.detail)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("Cookie", first["Vary"])
+        with self.assertNumQueries(0):
+            again = self.client.get(self.detail, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], first["ETag"])
+
+        # another post's write leaves this detail's validators alone
+        self.other.title = "Renamed"
+        self.other.save()
+        unchanged = self.client.get(self.detail, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(unchanged.status_code, 304)
+
+        self.post.title = "Retitled"
+        self.post.save()
+        changed = self.client.get(self.detail, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual((changed.status_code, changed.data["title"]), (200, "Retitled"))
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+
+    def test_if_modified_since(self):
+        for name in ("post-list", "comment-list", "category-stats", "tag-stats"):
+            first = self.client.get(reverse(name))
+            since = first["Last-Modified"]
+            again = self.client.get(reverse(name), HTTP_IF_MODIFIED_SINCE=since)
+            self.assertEqual(again.status_code, 304, name)
+            stale = self.client.get(
+                reverse(name), HTTP_IF_MODIFIED_SINCE="Mon, 01 Jan 2001 00:00:00 GMT"
+            )
+            self.assertEqual(stale.status_code, 200, name)
+
+    def test_etags_are_per_viewer(self):
+        anonymous = self.client.get(self.detail)["ETag"]
+        client = APIClient()
+        client.force_authenticate(self.author)
+        mine = client.get(self.detail, HTTP_IF_NONE_MATCH=anonymous)
+        self.assertEqual(mine.status_code, 200)
+        self.assertNotEqual(mine["ETag"], anonymous)
+        again = client.get(self.detail, HTTP_IF_NONE_MATCH=mine["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+
+class ExportTests(TestCase):
+    """GET /posts/export/ and `manage.py export_posts` stream rows in id order."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.staff = User.objects.create_user("exporter", is_staff=True)
+        cls.reader = User.objects.create_user("reader")
+        tag = Tag.objects.create(name="Python", slug="python")
+        cls.posts = [
+            Post.objects.create(
+                author=cls.staff, title=f"Post {i}", body=f"body, {i}", status=status
+            )
+            for i, status in enumerate(
+                (PostStatus.PUBLISHED, PostStatus.DRAFT, PostStatus.PUBLISHED)
+            )
+        ]
+        cls.posts[0].tags.add(tag)
+        cls.comment = Comment.objects.create(post=cls.posts[2], author=cls.reader, body="nice")
+
+    def export(self, user=None, **params):
+        client = APIClient()
+        client.force_authenticate(user or self.staff)
+        return client.get(reverse("post-export"), params)
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_staff_only(self):
+        self.assertEqual(self.export(self.reader).status_code, 403)
+        self.assertIn(APIClient().get(reverse("post-export")).status_code, (401, 403))
+
+    def test_ndjson_rows_in_id_order_with_resume_and_filters(self):
+        response = self.export()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual([row["id"] for row in rows], [post.pk for post in self.posts])
+        self.assertEqual((rows[0]["author"], rows[0]["tags"]), ("exporter", ["python"]))
+
+        rows = self.content(self.export(after_id=self.posts[0].pk, status=PostStatus.PUBLISHED))
+        self.assertEqual([json.loads(line)["id"] for line in rows.splitlines()], [self.posts[2].pk])
+
+        rows = self.content(self.export(kind="comments")).splitlines()
+        self.assertEqual(
+            [(row["id"], row["post"], row["author"]) for row in map(json.loads, rows)],
+            [(self.comment.pk, self.posts[2].pk, "reader")],
+        )
+
+    def test_csv(self):
+        response = self.export(output="csv")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="posts.csv"')
+        rows = list(csv.DictReader(io.StringIO(self.content(response))))
+        self.assertEqual([row["title"] for row in rows], ["Post 0", "Post 1", "Post 2"])
+        self.assertEqual((rows[0]["body"], rows[0]["tags"]), ("body, 0", "python"))
+
+    def test_bad_parameters_are_400s(self):
+        for params in (
+            {"output": "xml"}, {"kind": "users"}, {"after_id": "x"}, {"published_from": "soon"}
+        ):
+            self.assertEqual(self.export(**params).status_code, 400, params)
+
+    def test_export_posts_command(self):
+        out = io.StringIO()
+        call_command("export_posts", status=PostStatus.DRAFT, stdout=out)
+        titles = [json.loads(line)["title"] for line in out.getvalue().splitlines()]
+        self.assertEqual(titles, ["Post 1"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "comments.csv")
+            call_command("export_posts", output="csv", kind="comments", file=path)
+            with open(path, encoding="utf-8", newline="") as fh:
+                rows = list(csv.DictReader(fh))
+        self.assertEqual([row["body"] for row in rows], ["nice"])
+
+
+class AvatarTests(TestCase):
+    """Avatar uploads are checked by header, stored by content hash and thumbnailed off-request."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user("avatar")
+        cls.twin = User.objects.create_user("twin")
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings = override_settings(MEDIA_ROOT=media.name, BLOG_AVATAR_SYNC=True)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def image(self, fmt="PNG", size=(300, 200), name="me.png"):
+        buf = io.BytesIO()
+        Image.new("RGB", size, (200, 40, 40)).save(buf, fmt)
+        return SimpleUploadedFile(name, buf.getvalue())
+
+    def upload(self, user, file):
+        client = APIClient()
+        client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            return client.patch(reverse("me-profile"), {"avatar": file}, format="multipart")
+
+    def test_uploads_are_validated_by_header(self):
+        for file in (
+            SimpleUploadedFile("me.png", b"not an image at all"),
+            self.image("GIF", name="me.gif"),
+        ):
+            response = self.upload(self.user, file)
+            self.assertEqual(response.status_code, 400, file.name)
+            self.assertIn("avatar", response.data)
+        with mock.patch("blog.utility.avatars.MAX_PIXELS", 100):
+            response = self.upload(self.user, self.image())
+        self.assertIn("too large", response.data["avatar"][0])
+
+    def test_thumbnails_are_ready_after_a_synchronous_render(self):
+        response = self.upload(self.user, self.image("JPEG", name="me.jpg"))
+        self.assertEqual(response.status_code, 200)
+        # the response is built before the on-commit render runs
+        self.assertIsNone(response.data["avatar_thumbnails"])
+
+        client = APIClient()
+        # a fresh user: self.user still holds the profile loaded for the upload
+        client.force_authenticate(get_user_model().objects.get(pk=self.user.pk))
+        thumbnails = client.get(reverse("me-profile")).data["avatar_thumbnails"]
+        self.assertEqual(set(thumbnails), {"small", "medium"})
+        self.assertEqual(set(thumbnails["small"]), {"webp", "jpeg"})
+
+        profile = Profile.objects.get(user=self.user)
+        storage = profile.avatar.storage
+        self.assertTrue(profile.avatar.name.endswith("/original.jpg"))
+        with storage.open(thumbnail_path(profile.avatar_hash, "small", "webp")) as fh:
+            self.assertEqual(Image.open(fh).size, (64, 64))
+
+    def test_identical_uploads_reuse_the_stored_files(self):
+        with mock.patch("blog.utility.avatars._submit") as submit:
+            self.upload(self.user, self.image())
+        self.assertEqual(submit.call_count, 1)
+        self.assertFalse(Profile.objects.get(user=self.user).avatar_ready)
+        render_thumbnails(*submit.call_args.args)
+
+        with mock.patch("blog.utility.avatars._submit") as submit:
+            response = self.upload(self.twin, self.image())
+        submit.assert_not_called()
+        self.assertIsNotNone(response.data["avatar_thumbnails"])
+        mine, theirs = Profile.objects.order_by("user_id")
+        self.assertEqual((mine.avatar.name, mine.avatar_ready), (theirs.avatar.name, True))
+
+
+class AsyncReadTests(TestCase):
+    """The async read views answer exactly like the sync viewsets they wrap."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.viewer = User.objects.create_user("async-viewer")
+        author = User.objects.create_user("async-author")
+        category = Category.objects.create(name="Async", slug="async")
+        tag = Tag.objects.create(name="Loops", slug="loops")
+        cls.posts = []
+        for i in range(3):
+            post = Post.objects.create(
+                author=author, title=f"Post {i}", body="body", category=category,
+                status=PostStatus.PUBLISHED,
+            )
+            post.tags.add(tag)
+            cls.posts.append(post)
+        root = Comment.objects.create(post=cls.posts[0], author=author, body="root")
+        reply = Comment.objects.create(
+            post=cls.posts[0], author=author, body="reply", parent=root
+        )
+        PostLike.objects.create(post=cls.posts[0], user=cls.viewer)
+        Bookmark.objects.create(post=cls.posts[1], user=cls.viewer)
+        CommentLike.objects.create(comment=reply, user=cls.viewer)
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.sync_views = {pattern.name: pattern.callback for pattern in router.urls}
+
+    def both(self, name, params=None, user=None, **kwargs):
+        """(sync, async) responses to the same GET, each built from scratch."""
+        responses = []
+        for callback in (
+            self.sync_views[name],
+            async_to_sync(
+                AsyncReadView.as_view(sync_view=self.sync_views[name], fetch=ASYNC_READS[name])
+            ),
+        ):
+            for alias in caches:
+                caches[alias].clear()
+            request = self.factory.get("/", params or {})
+            if user:
+                force_authenticate(request, user)
+            response = callback(request, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+            responses.append(response)
+        return responses
+
+    def assertSameResponse(self, name, params=None, user=None, **kwargs):
+        sync, async_ = self.both(name, params, user, **kwargs)
+        self.assertEqual(async_.status_code, sync.status_code, name)
+        self.assertEqual(json.loads(async_.content), json.loads(sync.content), name)
+        return json.loads(async_.content)
+
+    def test_bodies_match_the_sync_viewsets(self):
+        for user in (None, self.viewer):
+            self.assertSameResponse("post-list", {"page_size": 2}, user)
+            self.assertSameResponse("comment-list", {"post": self.posts[0].pk}, user)
+            self.assertSameResponse("category-list", user=user)
+            self.assertSameResponse("tag-list", user=user)
+            detail = self.assertSameResponse("post-detail", user=user, pk=self.posts[0].pk)
+        self.assertTrue(detail["is_liked_by_me"])
+        self.assertTrue(detail["comments"][0]["replies"][0]["is_liked_by_me"])
+
+    def test_errors_and_sync_only_params_match(self):
+        self.assertSameResponse("post-detail", pk=10**6)
+        self.assertSameResponse("post-detail", pk="abc")
+        self.assertSameResponse("post-list", {"page": 99})
+        self.assertSameResponse("post-list", {"fields": "id,title", "search": "post"})
+
+
+class MetricsTests(TestCase):
+    """Per-route request metrics and the staff-only /metrics/ endpoint."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.staff = User.objects.create_user("ops", is_staff=True)
+        cls.reader = User.objects.create_user("reader")
+        Post.objects.create(
+            author=cls.reader, title="Measured", body="body", status=PostStatus.PUBLISHED
+        )
+
+    def setUp(self):
+        for alias in caches:
+            caches[alias].clear()
+        for metric in METRICS:
+            metric.clear()
+
+    def scrape(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+        response = client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        return response.content.decode()
+
+    def test_staff_only(self):
+        client = APIClient()
+        self.assertIn(client.get(reverse("metrics")).status_code, (401, 403))
+        client.force_authenticate(self.reader)
+        response = client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(response.content.startswith(b"detail: "))
+
+    def test_requests_are_recorded_per_route(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse("post-list"))
+        # counted now: the next request resets the connection's query log
+        queries = len(captured)
+        self.assertGreater(queries, 0)
+        self.client.get(reverse("post-detail", kwargs={"pk": 10**6}))
+        text = self.scrape()
+
+        labels = 'route="post-list",method="GET"'
+        self.assertIn(f'blog_http_requests_total{{{labels},status="200"}} 1', text)
+        self.assertIn(
+            'blog_http_requests_total{route="post-detail",method="GET",status="404"} 1', text
+        )
+        self.assertIn(f"blog_db_queries_per_request_sum{{{labels}}} {queries}", text)
+        self.assertIn(f"blog_http_response_size_bytes_sum{{{labels}}} {len(response.content)}", text)
+        self.assertIn(f"blog_serializer_time_seconds_count{{{labels}}} 1", text)
+        self.assertIn(f'blog_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1', text)
+        self.assertIn("# TYPE blog_http_request_duration_seconds histogram", text)
+
+    def test_histogram_buckets_are_cumulative_and_series_are_bounded(self):
+        histogram = Histogram("h", "help", (1, 5))
+        for value in (0.5, 3, 3, 9):
+            histogram.observe((), value)
+        self.assertEqual(
+            list(histogram.lines()),
+            [
+                'h_bucket{le="1"} 1', 'h_bucket{le="5"} 3', 'h_bucket{le="+Inf"} 4',
+                "h_sum 15.5", "h_count 4",
+            ],
+        )
+
+        with mock.patch("blog.utility.metrics.MAX_SERIES", 2):
+            counter = Counter("c", "help")
+            for route in ("a", "b", "c", "d"):
+                counter.inc((("route", route),))
+        self.assertEqual(
+            list(counter.lines()), ['c{route="a"} 1', 'c{route="b"} 1', 'c{route="other"} 2']
+        )
+
+
+class SeedBlogTests(TestCase):
+    """A small `manage.py seed_blog` run leaves a consistent, queryable blog."""
+
+    SIZES = {
+        "users": 30, "posts": 80, "categories": 4, "tags": 12, "likes": 400, "bookmarks": 100,
+        "comments": 200, "author_follows": 100, "tag_follows": 40, "batch_size": 50,
+    }
+
+    def seed(self, **options):
+        out = io.StringIO()
+        call_command("seed_blog", stdout=out, **{**self.SIZES, **options})
+        return out.getvalue()
+
+    def test_smoke_run(self):
+        started = timezone.now()
+        self.assertIn("Seeded in", self.seed(seed=7))
+
+        self.assertEqual(get_user_model().objects.count(), 30)
+        self.assertEqual(Profile.objects.count(), 30)
+        self.assertEqual(Post.objects.count(), 80)
+        self.assertEqual(Comment.objects.count(), 200)
+        self.assertTrue(Comment.objects.filter(parent__isnull=False).exists())
+        self.assertTrue(PostLike.objects.exists() and TimelineEntry.objects.exists())
+        self.assertFalse(Post.objects.filter(created_at__gt=started).exists())
+        self.assertFalse(AuthorFollow.objects.filter(user_id=F("author_id")).exists())
+
+        # counters, taxonomy stats and hot scores were all brought up to date
+        out = io.StringIO()
+        call_command("reconcile_counters", stdout=out)
+        self.assertIn("Reconciled 0 post(s) and 0 comment(s).", out.getvalue())
+        published = Post.objects.filter(status=PostStatus.PUBLISHED)
+        self.assertEqual(
+            sum(Category.objects.values_list("post_count", flat=True)),
+            published.filter(category__isnull=False).count(),
+        )
+        self.assertFalse(published.filter(hot_score=0).exists())
+
+        word = published.first().body.split()[0]
+        response = self.client.get(reverse("post-list"), {"search": word})
+        self.assertGreater(len(response.data["results"]), 0)
+
+        with self.assertRaisesMessage(CommandError, "already been seeded"):
+            self.seed()
+
+    def test_bad_sizes_are_rejected(self):
+        with self.assertRaises(CommandError):
+            self.seed(tags=0)
+
+
+class BenchApiTests(TestCase):
+    """`manage.py bench_api` runs its scenarios, reports them and compares against a baseline."""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            "seed_blog", users=10, posts=20, categories=2, tags=4, likes=40, bookmarks=10,
+            comments=30, author_follows=10, tag_follows=5, stdout=io.StringIO(),
+        )
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.baseline = os.path.join(tmp.name, "baseline.json")
+
+    def bench(self, *args, **options):
+        out = io.StringIO()
+        call_command(
+            "bench_api", *args, iterations=2, warmup=1, stdout=out, stderr=io.StringIO(), **options
+        )
+        return out.getvalue()
+
+    def test_smoke_run_and_compare(self):
+        likes = PostLike.objects.count()
+        only = ["post-detail:anon", "post-like:toggle"]
+        out = self.bench(only=only, output=self.baseline)
+        self.assertIn(f"Results written to {self.baseline}.", out)
+        self.assertEqual(PostLike.objects.count(), likes)  # writes are rolled back
+
+        with open(self.baseline) as fh:
+            report = json.load(fh)
+        scenarios = report["scenarios"]
+        self.assertEqual(set(scenarios), set(only))
+        self.assertEqual(scenarios["post-detail:anon"]["status"], [200])
+        self.assertEqual(scenarios["post-like:toggle"]["status"], [201, 204])
+        self.assertGreater(scenarios["post-like:toggle"]["queries"], 0)
+
+        out = self.bench(only=only, compare=self.baseline, threshold=1000)
+        self.assertIn("No regressions", out)
+
+        scenarios["post-like:toggle"]["queries"] -= 1
+        with open(self.baseline, "w") as fh:
+            json.dump(report, fh)
+        with self.assertRaisesMessage(CommandError, "1 regression(s)"):
+            self.bench(only=only, compare=self.baseline, threshold=1000)
+
+    def test_unknown_scenarios_are_rejected(self):
+        with self.assertRaisesMessage(CommandError, "No scenario matches"):
+            self.bench(only=["nope"])
@@ -0,0 +1,103 @@
+import math
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework import throttling
+
+# read-modify-write of a key happens under one of these, picked by its hash
+_LOCKS = [threading.Lock() for _ in range(64)]
+
+# how long a shared-cache lock may be held, and how long to wait for one
+LOCK_TIMEOUT = 2
+LOCK_WAIT = 0.05
+# Retry-After, in seconds, for a request denied because the lock was busy
+LOCK_RETRY = 1.0
+
+
+def _stripe(key: str) -> threading.Lock:
+    return _LOCKS[zlib.crc32(key.encode()) % len(_LOCKS)]
+
+
+@contextmanager
+def _cache_lock(cache, key: str):
+    """
+    Serialize updates of ``key`` across processes sharing ``cache``, via
+    ``add()``; yields whether the lock was taken. ``add()`` is atomic on the
+    database, Memcached and Redis backends, but not on FileBasedCache (it
+    checks, then writes), where two processes can both get the lock. Gives
+    up after LOCK_WAIT rather than stalling the request.
+    """
+    if isinstance(cache, LocMemCache):
+        # process-local: the striped lock already covers every writer
+        yield True
+        return
+    lock = f"{key}:lock"
+    deadline = time.monotonic() + LOCK_WAIT
+    acquired = cache.add(lock, 1, LOCK_TIMEOUT)
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(0.002)
+        acquired = cache.add(lock, 1, LOCK_TIMEOUT)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            cache.delete(lock)
+
+
+class GCRARateThrottle(throttling.SimpleRateThrottle):
+    """
+    SimpleRateThrottle on the generic cell rate algorithm: the cache holds
+    one float per key, the theoretical arrival time (TAT) of the next
+    request, instead of a list of every timestamp in the window. Requests
+    are spaced ``duration / num_requests`` apart, with bursts of up to
+    ``num_requests``; the same rate strings apply.
+    """
+
+    # the old throttles kept lists under the DRF key format
+    cache_format = "throttle_gcra_%(scope)s_%(ident)s"
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        self.retry_after = self.consume(self.key, self.now)
+        return self.retry_after <= 0
+
+    def consume(self, key: str, now: float) -> float:
+        """
+        Take one request from ``key``; seconds until it would be allowed, <=
+        0 if it is. Without the lock the request is denied for LOCK_RETRY:
+        updating the TAT unlocked would let contended bursts past the limit.
+        """
+        interval = self.duration / self.num_requests
+        with _stripe(key), _cache_lock(self.cache, key) as locked:
+            if not locked:
+                return LOCK_RETRY
+            tat = max(self.cache.get(key, now), now) + interval
+            retry_after = tat - self.duration - now
+            if retry_after <= 0:
+                self.cache.set(key, tat, math.ceil(tat - now))
+        return retry_after
+
+    def wait(self):
+        return self.retry_after
+
+
+class AnonRateThrottle(throttling.AnonRateThrottle, GCRARateThrottle):
+    pass
+
+
+class UserRateThrottle(throttling.UserRateThrottle, GCRARateThrottle):
+    pass
+
+
+class ScopedRateThrottle(throttling.ScopedRateThrottle, GCRARateThrottle):
+    pass
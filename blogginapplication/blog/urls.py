@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from .views.post import PostViewSet
@@ -5,6 +6,10 @@ from .views.comment import CommentViewSet
 from .views.taxomony import CategoryViewSet, TagViewSet
 from .views.profile import MeProfileView
 from .views.auth import RegisterView, MeView, ChangePasswordView
+from .views.reactions import BulkReactionView
+from .views.follows import AuthorFollowView
+from .views.metrics import MetricsView
+from .views.async_reads import async_read_urls
 
 router = DefaultRouter()
 router.register("posts", PostViewSet, basename="post")
@@ -12,9 +17,16 @@ router.register("comments", CommentViewSet, basename="comment")
 router.register("categories", CategoryViewSet, basename="category")
 router.register("tags", TagViewSet, basename="tag")
 
+router_urls = router.urls
+if settings.BLOG_ASYNC_READS:
+    router_urls = async_read_urls(router_urls)
+
 urlpatterns = [
-    path("", include(router.urls)),
+    path("", include(router_urls)),
     path("me/profile/", MeProfileView.as_view(), name="me-profile"),
+    path("reactions/bulk/", BulkReactionView.as_view(), name="reactions-bulk"),
+    path("authors/<str:username>/follow/", AuthorFollowView.as_view(), name="author-follow"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
 
     path("register/", RegisterView.as_view(), name="register"),
     path("auth/me/", MeView.as_view(), name="me"),
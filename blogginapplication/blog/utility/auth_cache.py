@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+
+def auth_cache():
+    return caches[getattr(settings, "BLOG_AUTH_CACHE", "default")]
+
+
+def user_key(user_id) -> str:
+    return f"blog:auth:user:{user_id}"
+
+
+def load_user(user_id):
+    """
+    The user with ``user_id`` and their profile, from the auth cache or one
+    query that fills it. None if there is no such user. Entries live for
+    the cache's TIMEOUT unless invalidate_user() drops them first.
+    """
+    User = get_user_model()
+    try:
+        user_id = User._meta.pk.to_python(user_id)
+    except ValidationError:
+        return None
+    cache = auth_cache()
+    user = cache.get(user_key(user_id))
+    if user is None:
+        user = User.objects.select_related("profile").filter(pk=user_id).first()
+        if user is not None:
+            cache.set(user_key(user_id), user)
+    return user
+
+
+def _drop(keys) -> None:
+    auth_cache().delete_many(keys)
+
+
+def invalidate_user(*user_ids) -> None:
+    """
+    Forget the cached users (and their profiles). Drops now and again after
+    the surrounding transaction commits, so a request that read the old row
+    meanwhile can't leave it cached.
+    """
+    keys = [user_key(get_user_model()._meta.pk.to_python(pk)) for pk in user_ids]
+    _drop(keys)
+    transaction.on_commit(lambda: _drop(keys))
@@ -0,0 +1,153 @@
+import hashlib
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .auth_cache import invalidate_user
+
+logger = logging.getLogger(__name__)
+
+# Pillow format -> stored extension
+SOURCE_FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+MAX_PIXELS = 40_000_000
+
+# square thumbnails, edge in px
+THUMBNAIL_SIZES = {"small": 64, "medium": 256}
+THUMBNAIL_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+}
+
+_executor = None
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def inspect_image(file) -> str:
+    """
+    Check an upload by its header alone (Image.open doesn't decode pixels)
+    and return the Pillow format. Raises InvalidImage.
+    """
+    try:
+        with Image.open(file) as image:
+            fmt, (width, height) = image.format, image.size
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise InvalidImage("Upload a valid JPEG, PNG or WebP image.")
+    finally:
+        file.seek(0)
+    if fmt not in SOURCE_FORMATS:
+        raise InvalidImage("Only JPEG/PNG/WEBP allowed.")
+    if width * height > MAX_PIXELS:
+        raise InvalidImage(f"Image is too large ({width}x{height}).")
+    return fmt
+
+
+def content_hash(file) -> str:
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def _path(digest: str, name: str) -> str:
+    return f"avatars/{digest[:2]}/{digest}/{name}"
+
+
+def thumbnail_path(digest: str, size: str, fmt: str) -> str:
+    return _path(digest, f"{size}.{fmt}")
+
+
+def _thumbnail_paths(digest: str):
+    return [
+        thumbnail_path(digest, size, fmt)
+        for size in THUMBNAIL_SIZES
+        for fmt in THUMBNAIL_FORMATS
+    ]
+
+
+def thumbnail_urls(profile) -> Optional[dict]:
+    """{size: {format: url}} once the profile's thumbnails exist, else None."""
+    if not (profile.avatar_hash and profile.avatar_ready):
+        return None
+    storage = profile.avatar.storage
+    return {
+        size: {
+            fmt: storage.url(thumbnail_path(profile.avatar_hash, size, fmt))
+            for fmt in THUMBNAIL_FORMATS
+        }
+        for size in THUMBNAIL_SIZES
+    }
+
+
+def store_avatar(profile, upload, fmt: str) -> None:
+    """
+    Save ``upload`` under its content hash (identical files are stored once)
+    and queue its thumbnails unless a previous upload already made them.
+    """
+    digest = content_hash(upload)
+    storage = profile.avatar.storage
+    name = _path(digest, f"original.{SOURCE_FORMATS[fmt]}")
+    if not storage.exists(name):
+        name = storage.save(name, upload)
+
+    profile.avatar.name = name
+    profile.avatar_hash = digest
+    profile.avatar_ready = all(storage.exists(path) for path in _thumbnail_paths(digest))
+    profile.save(update_fields=["avatar", "avatar_hash", "avatar_ready", "updated_at"])
+    if not profile.avatar_ready:
+        transaction.on_commit(partial(_submit, digest, name))
+
+
+def _submit(digest: str, name: str) -> None:
+    global _executor
+    if settings.BLOG_AVATAR_SYNC:
+        render_thumbnails(digest, name)
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BLOG_AVATAR_WORKERS, thread_name_prefix="avatars"
+        )
+    _executor.submit(_render_in_worker, digest, name)
+
+
+def _render_in_worker(digest: str, name: str) -> None:
+    try:
+        render_thumbnails(digest, name)
+    except Exception:
+        logger.exception("avatar thumbnails failed for %s", digest)
+    finally:
+        close_old_connections()
+
+
+def render_thumbnails(digest: str, name: str) -> None:
+    """Write every size/format of the avatar stored at ``name``; mark profiles using it ready."""
+    from ..models import Profile
+
+    storage = Profile._meta.get_field("avatar").storage
+    with storage.open(name) as fh, Image.open(fh) as source:
+        source.draft("RGB", (max(THUMBNAIL_SIZES.values()),) * 2)  # JPEG: decode at reduced scale
+        source = ImageOps.exif_transpose(source)
+        for size, edge in THUMBNAIL_SIZES.items():
+            thumb = ImageOps.fit(source, (edge, edge), Image.Resampling.LANCZOS)
+            for fmt, (pil_format, options) in THUMBNAIL_FORMATS.items():
+                path = thumbnail_path(digest, size, fmt)
+                if storage.exists(path):
+                    continue
+                image = thumb.convert("RGB") if pil_format == "JPEG" else thumb.convert("RGBA")
+                buf = io.BytesIO()
+                image.save(buf, pil_format, **options)
+                storage.save(path, ContentFile(buf.getvalue()))
+    profiles = Profile.objects.filter(avatar_hash=digest)
+    user_ids = list(profiles.values_list("user_id", flat=True))
+    profiles.update(avatar_ready=True)
+    invalidate_user(*user_ids)
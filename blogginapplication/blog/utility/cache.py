@@ -0,0 +1,155 @@
+import hashlib
+import threading
+import time
+from typing import Iterable, List, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .replicas import use_primary
+
+# Every write bumps GLOBAL_VERSION (lists) and the touched post's version
+# (details). REFS_VERSION covers what details embed from other rows:
+# authors, categories and tags. Versions are write times in nanoseconds, so
+# they double as Last-Modified.
+GLOBAL_VERSION = "blog:v:global"
+REFS_VERSION = "blog:v:refs"
+
+
+def post_version(post_id) -> str:
+    return f"blog:v:post:{post_id}"
+
+
+def response_cache():
+    return caches[getattr(settings, "BLOG_RESPONSE_CACHE", "default")]
+
+
+_clock_lock = threading.Lock()
+_last_version = 0
+
+
+def _next_version() -> int:
+    """time.time_ns(), but strictly increasing within this process."""
+    global _last_version
+    with _clock_lock:
+        _last_version = max(time.time_ns(), _last_version + 1)
+        return _last_version
+
+
+def _bump(keys: List[str]) -> None:
+    # a blind write of a value never used before: reading the old version
+    # first could interleave with another worker's bump and write back one
+    # that responses were already cached under
+    version = _next_version()
+    response_cache().set_many({key: version for key in keys}, timeout=None)
+
+
+def bump_versions(*keys: str) -> None:
+    """
+    Invalidate every cached response depending on ``keys``. Bumps now and
+    again after the surrounding transaction commits, so a reader that raced
+    the write can't cache pre-commit data under the new version.
+    """
+    keys = list(keys)
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def invalidate_post(post_id) -> None:
+    bump_versions(GLOBAL_VERSION, post_version(post_id))
+
+
+def get_versions(keys: Iterable[str]) -> List[int]:
+    keys = list(keys)
+    cache = response_cache()
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def _response_key(request, name: str, versions: List[int]) -> str:
+    params = sorted((k, sorted(v)) for k, v in request.query_params.lists())
+    raw = repr((request.get_host(), request.path, params))
+    digest = hashlib.sha1(raw.encode()).hexdigest()
+    return f"blog:resp:{name}:{'.'.join(map(str, versions))}:{digest}"
+
+
+def _etag(request, key: str) -> str:
+    # per viewer and representation: authenticated payloads carry is_liked_by_me etc.
+    raw = repr((key, request.user.pk, request.META.get("HTTP_ACCEPT", "")))
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+
+def read_validators(request, name: str, version_keys: Iterable[str]) -> Tuple[str, str, int]:
+    """(response cache key, ETag, Last-Modified) for the current ``version_keys``."""
+    versions = get_versions(version_keys)
+    key = _response_key(request, name, versions)
+    # whole seconds, so If-Modified-Since alone can miss a second write in
+    # the same second; the ETag is exact and takes precedence when sent
+    return key, _etag(request, key), max(versions) // 10**9
+
+
+def _stamp(response, validators) -> None:
+    _, etag, last_modified = validators
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_vary_headers(response, ("Accept", "Authorization", "Cookie"))
+
+
+def cached_response(request, validators):
+    """A 304 or the cached anonymous response for ``validators``; None when it must be built."""
+    key, etag, last_modified = validators
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None and not request.user.is_authenticated:
+        hit = response_cache().get(key)
+        if hit is not None:
+            response = Response(hit)
+    if response is not None:
+        _stamp(response, validators)
+    return response
+
+
+def prepare_build(request) -> None:
+    """
+    Before building a response store_response() will cache: read it from
+    the primary. A lagging replica would otherwise cache pre-write rows
+    under the version the write bumped.
+    """
+    if not request.user.is_authenticated:
+        use_primary()
+
+
+def store_response(request, validators, response):
+    """Cache a freshly built 200 for anonymous viewers and stamp its validators."""
+    if response.status_code != 200:
+        return response
+    if not request.user.is_authenticated:
+        response_cache().set(validators[0], response.data)
+    _stamp(response, validators)
+    return response
+
+
+def cached_read(request, name: str, version_keys: Iterable[str], build):
+    """
+    Versioned read for GET list/detail actions:
+
+    * ETag / Last-Modified come from the current ``version_keys``, so a
+      matching If-None-Match / If-Modified-Since gets a 304 before any
+      queryset or serializer runs.
+    * Anonymous responses are cached on the normalized query string and the
+      versions; authenticated ones carry per-viewer fields and always go to
+      ``build()``. Anonymous misses are built from the primary.
+    """
+    validators = read_validators(request, name, version_keys)
+    response = cached_response(request, validators)
+    if response is None:
+        prepare_build(request)
+        response = store_response(request, validators, build())
+    return response
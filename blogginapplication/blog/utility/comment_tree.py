@@ -0,0 +1,63 @@
+from collections import defaultdict
+from typing import Iterable, List
+
+
+def _visible_comments():
+    from ..models import Comment, CommentStatus
+
+    return (
+        Comment.objects.filter(status=CommentStatus.VISIBLE)
+        .select_related("author")
+        .order_by("created_at", "id")
+    )
+
+
+def load_comment_tree(post_id: int) -> List:
+    """
+    Fetch every visible comment of a post in one query and return the
+    top-level ones, each carrying its replies in ``loaded_replies``.
+    Replies of hidden parents are dropped, same as the nested endpoint.
+    """
+    return _build_tree(_visible_comments().filter(post_id=post_id))
+
+
+async def aload_comment_tree(post_id: int) -> List:
+    """load_comment_tree() for the async read views."""
+    return _build_tree([c async for c in _visible_comments().filter(post_id=post_id)])
+
+
+def _build_tree(comments) -> List:
+    roots, replies = [], defaultdict(list)
+    for comment in comments:
+        if comment.parent_id is None:
+            roots.append(comment)
+        else:
+            replies[comment.parent_id].append(comment)
+
+    for comment in roots:
+        comment.loaded_replies = replies.get(comment.id, [])
+    return roots
+
+
+def attach_replies(comments: Iterable) -> None:
+    """Load visible replies for a page of comments with a single query."""
+    pending = [c for c in comments if not hasattr(c, "loaded_replies")]
+    if pending:
+        _attach(pending, _visible_comments().filter(parent_id__in=[c.id for c in pending]))
+
+
+async def aattach_replies(comments: Iterable) -> None:
+    """attach_replies() for the async read views."""
+    pending = [c for c in comments if not hasattr(c, "loaded_replies")]
+    if pending:
+        qs = _visible_comments().filter(parent_id__in=[c.id for c in pending])
+        _attach(pending, [reply async for reply in qs])
+
+
+def _attach(pending, found) -> None:
+    replies = defaultdict(list)
+    for reply in found:
+        replies[reply.parent_id].append(reply)
+
+    for comment in pending:
+        comment.loaded_replies = replies.get(comment.id, [])
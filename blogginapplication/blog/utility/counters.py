@@ -0,0 +1,87 @@
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Max, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def bump(model, pk: int, **deltas: int) -> None:
+    """Atomically add ``deltas`` to counter columns of one row (UPDATE ... SET x = x + n)."""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if deltas:
+        model.objects.filter(pk=pk).update(
+            **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+
+
+def _row_count(queryset, fk: str, outer: str = "pk"):
+    """Rows of ``queryset`` whose ``fk`` is the outer row's ``outer``, as a correlated subquery."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{fk: OuterRef(outer)})
+            .order_by()
+            .values(fk)
+            .annotate(n=Count("pk"))
+            .values("n"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def post_count_expressions() -> dict:
+    """Post counter field -> expression recounting it from the rows."""
+    from ..models import Bookmark, Comment, CommentStatus, PostLike
+
+    return {
+        "like_count": _row_count(PostLike.objects.all(), "post"),
+        "bookmark_count": _row_count(Bookmark.objects.all(), "post"),
+        "comment_count": _row_count(
+            Comment.objects.filter(status=CommentStatus.VISIBLE), "post"
+        ),
+    }
+
+
+def comment_count_expressions() -> dict:
+    """Comment counter field -> expression recounting it from the rows."""
+    from ..models import CommentLike
+
+    return {"like_count": _row_count(CommentLike.objects.all(), "comment")}
+
+
+def profile_count_expressions() -> dict:
+    """Profile counter field -> expression recounting it from the rows."""
+    from ..models import AuthorFollow
+
+    return {"follower_count": _row_count(AuthorFollow.objects.all(), "author", "user")}
+
+
+def tag_count_expressions() -> dict:
+    """Tag follower counter field -> expression recounting it from the rows."""
+    from ..models import TagFollow
+
+    return {"follower_count": _row_count(TagFollow.objects.all(), "tag")}
+
+
+def recount(model, expressions: dict, chunk: int) -> int:
+    """
+    Set the counters in ``expressions`` on every row of ``model`` from the
+    rows they count, one pk range of ``chunk`` at a time. Each range is
+    corrected by ``UPDATE ... SET x = (SELECT COUNT(*) ...)``, so a reaction
+    written meanwhile is counted once, by the statement itself. Returns how
+    many rows had drifted.
+    """
+    bounds = model.objects.aggregate(low=Min("pk"), high=Max("pk"))
+    if bounds["low"] is None:
+        return 0
+    fixed = 0
+    for low in range(bounds["low"], bounds["high"] + 1, chunk):
+        rows = model.objects.filter(pk__gte=low, pk__lt=low + chunk)
+        with transaction.atomic():
+            drifted = list(
+                rows.alias(**{f"recount_{f}": e for f, e in expressions.items()})
+                .exclude(**{f: F(f"recount_{f}") for f in expressions})
+                .values_list("pk", flat=True)
+            )
+            if drifted:
+                model.objects.filter(pk__in=drifted).update(**expressions)
+        fixed += len(drifted)
+    return fixed
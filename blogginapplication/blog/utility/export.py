@@ -0,0 +1,139 @@
+import csv
+import json
+from datetime import datetime
+from typing import Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+DEFAULT_CHUNK_SIZE = 1000
+
+POST_FIELDS = (
+    "id",
+    "slug",
+    "title",
+    "body",
+    "status",
+    "author",
+    "category",
+    "tags",
+    "published_at",
+    "created_at",
+    "updated_at",
+    "excerpt",
+    "word_count",
+    "reading_time",
+    "like_count",
+    "comment_count",
+    "bookmark_count",
+)
+COMMENT_FIELDS = (
+    "id",
+    "post",
+    "parent",
+    "author",
+    "body",
+    "status",
+    "created_at",
+    "updated_at",
+    "like_count",
+)
+
+OUTPUTS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def post_rows(posts, after_id: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Posts with id > ``after_id`` in id order, as flat dicts. Rows come from
+    ``iterator(chunk_size)``, with tags prefetched per chunk, so memory stays
+    flat however many posts match.
+    """
+    qs = (
+        posts.filter(pk__gt=after_id)
+        .select_related("author", "category")
+        .prefetch_related("tags")
+        .order_by("pk")
+    )
+    for post in qs.iterator(chunk_size=chunk_size):
+        yield {
+            "id": post.pk,
+            "slug": post.slug,
+            "title": post.title,
+            "body": post.body,
+            "status": post.status,
+            "author": post.author.username,
+            "category": post.category.slug if post.category else None,
+            "tags": [tag.slug for tag in post.tags.all()],
+            "published_at": post.published_at,
+            "created_at": post.created_at,
+            "updated_at": post.updated_at,
+            "excerpt": post.excerpt,
+            "word_count": post.word_count,
+            "reading_time": post.reading_time,
+            "like_count": post.like_count,
+            "comment_count": post.comment_count,
+            "bookmark_count": post.bookmark_count,
+        }
+
+
+def comment_rows(posts, after_id: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+    """Comments on ``posts`` with id > ``after_id`` in id order, as flat dicts."""
+    from ..models import Comment
+
+    qs = (
+        Comment.objects.filter(post__in=posts.values("pk"), pk__gt=after_id)
+        .order_by("pk")
+        .values_list(
+            "pk",
+            "post_id",
+            "parent_id",
+            "author__username",
+            "body",
+            "status",
+            "created_at",
+            "updated_at",
+            "like_count",
+        )
+    )
+    for values in qs.iterator(chunk_size=chunk_size):
+        yield dict(zip(COMMENT_FIELDS, values))
+
+
+EXPORTS = {"posts": (post_rows, POST_FIELDS), "comments": (comment_rows, COMMENT_FIELDS)}
+
+
+def ndjson_lines(rows: Iterable[dict]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+class _Line:
+    """File-like target for csv.writer that hands back what was written."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return ",".join(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def csv_lines(rows: Iterable[dict], fields) -> Iterator[str]:
+    writer = csv.writer(_Line())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_csv_value(row[field]) for field in fields])
+
+
+def export_lines(
+    kind: str, output: str, posts, after_id: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[str]:
+    """Lazily render the ``kind`` export of ``posts`` as ``output`` (ndjson or csv)."""
+    make_rows, fields = EXPORTS[kind]
+    rows = make_rows(posts, after_id=after_id, chunk_size=chunk_size)
+    if output == "csv":
+        return csv_lines(rows, fields)
+    return ndjson_lines(rows)
@@ -0,0 +1,150 @@
+import json
+from functools import partial
+from typing import Iterable, List, Tuple
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .cache import GLOBAL_VERSION, bump_versions
+from .search import get_search_backend
+from .taxonomy import refresh_taxonomy_stats
+from .timeline import fan_out
+from .utils import unique_slugify_many
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def import_posts(lines: Iterable, author, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Create posts for ``author`` from NDJSON ``lines`` (str or bytes), one
+    transaction per batch. Bad rows don't stop the import: they are reported
+    as ``{"line": n, "errors": {...}}`` and the rest of their batch goes in.
+    """
+    report = {"created": 0, "errors": []}
+    batch: List[Tuple[int, dict]] = []
+    for lineno, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            report["errors"].append(_row_error(lineno, f"Invalid JSON: {exc}"))
+            continue
+        if not isinstance(row, dict):
+            report["errors"].append(_row_error(lineno, "Expected a JSON object."))
+            continue
+        batch.append((lineno, row))
+        if len(batch) >= batch_size:
+            _import_batch(batch, author, report)
+            batch = []
+    if batch:
+        _import_batch(batch, author, report)
+    report["errors"].sort(key=lambda error: error["line"])
+    return report
+
+
+def _row_error(lineno: int, message: str) -> dict:
+    return {"line": lineno, "errors": {"non_field_errors": [message]}}
+
+
+def _import_batch(batch, author, report) -> None:
+    from ..models import Category, Post, Tag
+    from ..serializers import PostImportRowSerializer
+
+    rows = []
+    for lineno, data in batch:
+        serializer = PostImportRowSerializer(data=data)
+        if serializer.is_valid():
+            rows.append((lineno, serializer.validated_data))
+        else:
+            report["errors"].append({"line": lineno, "errors": serializer.errors})
+
+    # one lookup each for every category/tag slug the batch mentions
+    category_slugs = {row["category"] for _, row in rows if row.get("category")}
+    tag_slugs = {slug for _, row in rows for slug in row["tags"]}
+    categories = {c.slug: c for c in Category.objects.filter(slug__in=category_slugs)}
+    tags = {t.slug: t for t in Tag.objects.filter(slug__in=tag_slugs)}
+    explicit = [r["slug"] for _, r in rows if r.get("slug")]
+    taken = set(Post.objects.filter(slug__in=explicit).values_list("slug", flat=True))
+
+    valid, seen = [], set()
+    for lineno, row in rows:
+        errors = {}
+        if row.get("category") and row["category"] not in categories:
+            errors["category"] = [f"Unknown category '{row['category']}'."]
+        missing = [s for s in row["tags"] if s not in tags]
+        if missing:
+            errors["tags"] = [f"Unknown tag(s): {', '.join(missing)}."]
+        if row.get("slug") and (row["slug"] in taken or row["slug"] in seen):
+            errors["slug"] = ["post with this slug already exists."]
+        if errors:
+            report["errors"].append({"line": lineno, "errors": errors})
+            continue
+        if row.get("slug"):
+            seen.add(row["slug"])
+        valid.append((lineno, row))
+
+    if not valid:
+        return
+
+    # a concurrent writer can still take one of our slugs: re-allocate once
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                posts = _insert(valid, author, categories, tags, seen)
+            break
+        except IntegrityError as exc:
+            if attempt:
+                report["errors"].extend(_row_error(lineno, str(exc)) for lineno, _ in valid)
+                return
+
+    report["created"] += len(posts)
+
+
+def _insert(valid, author, categories, tags, reserved):
+    from ..models import Post, PostStatus
+
+    generated = iter(
+        unique_slugify_many(
+            Post, [row["title"] for _, row in valid if not row.get("slug")], reserved=reserved
+        )
+    )
+    now = timezone.now()
+    posts = []
+    for _, row in valid:
+        post = Post(
+            author=author,
+            title=row["title"],
+            body=row["body"],
+            status=row["status"],
+            slug=row.get("slug") or next(generated),
+            category=categories.get(row.get("category")),
+            published_at=row.get("published_at"),
+        )
+        # bulk_create skips Post.save, so derive what it would have
+        post.refresh_text_stats()
+        if post.status == PostStatus.PUBLISHED and not post.published_at:
+            post.published_at = now
+        posts.append(post)
+
+    Post.objects.bulk_create(posts)
+    Through = Post.tags.through
+    Through.objects.bulk_create(
+        [
+            Through(post_id=post.pk, tag_id=tags[slug].pk)
+            for post, (_, row) in zip(posts, valid)
+            for slug in dict.fromkeys(row["tags"])
+        ]
+    )
+    # no post_save or m2m_changed signals fire for bulk_create
+    get_search_backend().index(posts)
+    refresh_taxonomy_stats(
+        {post.category_id for post in posts}, {tag.pk for tag in tags.values()}
+    )
+    bump_versions(GLOBAL_VERSION)
+    for post in posts:
+        if post.status == PostStatus.PUBLISHED:
+            transaction.on_commit(partial(fan_out, post.pk))
+    return posts
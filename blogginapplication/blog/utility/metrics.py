@@ -0,0 +1,243 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+# Histogram upper bounds (a +Inf bucket is implied)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# label sets kept per metric; any further ones are folded into "other"
+MAX_SERIES = 500
+OVERFLOW = "other"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._series: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def _new(self) -> list:
+        raise NotImplementedError
+
+    def _get(self, labels: Labels) -> list:
+        # caller holds the lock
+        series = self._series.get(labels)
+        if series is None:
+            if len(self._series) >= MAX_SERIES:
+                labels = tuple((key, OVERFLOW) for key, _ in labels)
+                series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = self._new()
+        return series
+
+    def snapshot(self) -> Dict[Labels, list]:
+        with self._lock:
+            return {labels: list(values) for labels, values in self._series.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new(self) -> list:
+        return [0]
+
+    def inc(self, labels: Labels, amount: float = 1) -> None:
+        with self._lock:
+            self._get(labels)[0] += amount
+
+    def lines(self):
+        for labels, (value,) in sorted(self.snapshot().items()):
+            yield f"{self.name}{_format_labels(labels)} {_number(value)}"
+
+
+class Histogram(_Metric):
+    """Fixed buckets: one counter per bound plus +Inf, then the sum."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets)
+
+    def _new(self) -> list:
+        return [0] * (len(self.buckets) + 2)
+
+    def observe(self, labels: Labels, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._get(labels)
+            series[index] += 1
+            series[-1] += value
+
+    def lines(self):
+        bounds = [_number(b) for b in self.buckets] + ["+Inf"]
+        for labels, series in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_number(series[-1])}"
+            yield f"{self.name}_count{_format_labels(labels)} {cumulative}"
+
+
+def _number(value) -> str:
+    if isinstance(value, float) and not math.isfinite(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels) + "}"
+
+
+REQUESTS = Counter("blog_http_requests_total", "Requests by route, method and status.")
+LATENCY = Histogram(
+    "blog_http_request_duration_seconds", "Time spent handling the request.", LATENCY_BUCKETS
+)
+QUERIES = Histogram(
+    "blog_db_queries_per_request", "SQL statements executed per request.", QUERY_BUCKETS
+)
+SQL_TIME = Histogram(
+    "blog_db_time_seconds", "Time spent in SQL per request.", LATENCY_BUCKETS
+)
+SERIALIZER_TIME = Histogram(
+    "blog_serializer_time_seconds",
+    "Time spent producing .data of the blog viewsets' serializers (includes SQL it triggers).",
+    LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "blog_http_response_size_bytes", "Response body size (streaming bodies excluded).", SIZE_BUCKETS
+)
+METRICS = (REQUESTS, LATENCY, QUERIES, SQL_TIME, SERIALIZER_TIME, RESPONSE_SIZE)
+
+
+class RequestSample:
+    """What one request has accumulated so far."""
+
+    __slots__ = ("started", "queries", "sql_time", "serializer_time", "serializing")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+
+
+# carried into sync_to_async threads along with the rest of the context
+_current: ContextVar[Optional[RequestSample]] = ContextVar("blog_request_sample", default=None)
+
+
+def start_sample():
+    """Begin collecting for the current request; returns the token for finish_sample()."""
+    sample = RequestSample()
+    return sample, _current.set(sample)
+
+
+def finish_sample(token, sample: RequestSample, route: str, method: str, status: int, size=None):
+    _current.reset(token)
+    labels = (("route", route), ("method", method))
+    REQUESTS.inc(labels + (("status", str(status)),))
+    LATENCY.observe(labels, time.perf_counter() - sample.started)
+    QUERIES.observe(labels, sample.queries)
+    SQL_TIME.observe(labels, sample.sql_time)
+    if sample.serializer_time:
+        SERIALIZER_TIME.observe(labels, sample.serializer_time)
+    if size is not None:
+        RESPONSE_SIZE.observe(labels, size)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper counting and timing SQL for the request in progress."""
+    sample = _current.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.queries += 1
+        sample.sql_time += time.perf_counter() - started
+
+
+def _add_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def _timed_data(data):
+    def timed(self):
+        sample = _current.get()
+        if sample is None or sample.serializing:
+            return data.fget(self)
+        sample.serializing = True
+        started = time.perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            sample.serializing = False
+            sample.serializer_time += time.perf_counter() - started
+
+    return property(timed)
+
+
+@lru_cache(maxsize=None)
+def _timed_class(cls):
+    attrs = {"__module__": cls.__module__, "__qualname__": cls.__qualname__, "blog_timed": True}
+    return type(cls.__name__, (cls,), {**attrs, "data": _timed_data(cls.data)})
+
+
+def timed(serializer):
+    """
+    ``serializer`` with its ``.data`` timed into the current request's
+    sample: the instance is moved to a subclass overriding only ``data``.
+    Left as it is outside a sampled request.
+    """
+    if _current.get() is not None and not getattr(serializer, "blog_timed", False):
+        serializer.__class__ = _timed_class(type(serializer))
+    return serializer
+
+
+def install() -> None:
+    """
+    Hook SQL timing in: an execute wrapper on every new database connection,
+    a no-op outside a request sampled by the middleware. Serializers are
+    timed by the views (SerializerTimingMixin), not here.
+    """
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(_add_query_recorder, dispatch_uid="blog_metrics_sql")
+    for conn in connections.all(initialized_only=True):
+        _add_query_recorder(None, conn)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format (0.0.4)."""
+    out = []
+    for metric in METRICS:
+        out.append(f"# HELP {metric.name} {metric.help}")
+        out.append(f"# TYPE {metric.name} {metric.kind}")
+        out.extend(metric.lines())
+    return "\n".join(out) + "\n"
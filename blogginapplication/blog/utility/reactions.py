@@ -0,0 +1,119 @@
+from django.apps import apps
+from django.db import connection
+from django.db.models import F
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+from .cache import invalidate_post
+from .counters import bump
+
+# kind -> (reaction model, target model, target fk column, counter on the target)
+REACTIONS = {
+    "post_like": ("PostLike", "Post", "post_id", "like_count"),
+    "bookmark": ("Bookmark", "Post", "post_id", "bookmark_count"),
+    "comment_like": ("CommentLike", "Comment", "comment_id", "like_count"),
+}
+
+
+class TargetNotFound(Exception):
+    pass
+
+
+def _models(kind):
+    model, target, fk, counter = REACTIONS[kind]
+    return apps.get_model("blog", model), apps.get_model("blog", target), fk, counter
+
+
+def _touched(target, target_id) -> None:
+    # raw statements skip the post_save/post_delete signals, so invalidate here
+    if target._meta.model_name == "comment":
+        post_id = target.objects.filter(pk=target_id).values_list("post_id", flat=True).first()
+    else:
+        post_id = target_id
+    if post_id is not None:
+        invalidate_post(post_id)
+
+
+def _source(targets, target_id):
+    """SQL and params selecting ``target_id`` as ``link_target`` if it is in ``targets``."""
+    source = targets.filter(pk=target_id).order_by().values(link_target=F("pk"))
+    return source.query.sql_with_params()
+
+
+def insert_link(model, fk: str, target, user_id: int, target_id: int, targets=None) -> bool:
+    """
+    Insert a (user, target) row of ``model`` in one ``INSERT ... SELECT ...
+    ON CONFLICT DO NOTHING``; selecting the target from ``targets`` (all of
+    ``target``'s rows by default) doubles as its existence and visibility
+    check. True if a row was added.
+    """
+    qn = connection.ops.quote_name
+    now = timezone.now()
+    if targets is None:
+        targets = target._default_manager.all()
+    source, params = _source(targets, target_id)
+    sql = (
+        f"{connection.ops.insert_statement(on_conflict=OnConflict.IGNORE)} "
+        f"{qn(model._meta.db_table)} (created_at, updated_at, user_id, {qn(fk)}) "
+        f"SELECT %s, %s, %s, link_target FROM ({source}) source "
+        f"WHERE true "
+        f"{connection.ops.on_conflict_suffix_sql([], OnConflict.IGNORE, None, None)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, (now, now, user_id, *params))
+        return cursor.rowcount == 1
+
+
+def delete_link(model, fk: str, user_id: int, target_id: int, targets=None) -> int:
+    """
+    Delete the (user, target) row of ``model`` in one statement; returns the
+    rowcount. With ``targets``, only if the target is among them.
+    """
+    qn = connection.ops.quote_name
+    sql = f"DELETE FROM {qn(model._meta.db_table)} WHERE user_id = %s AND {qn(fk)} = %s"
+    params = (user_id, target_id)
+    if targets is not None:
+        source, source_params = _source(targets, target_id)
+        sql += f" AND {qn(fk)} IN ({source})"
+        params += tuple(source_params)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def _missing(target, target_id, targets) -> bool:
+    if targets is None:
+        targets = target._default_manager.all()
+    return not targets.filter(pk=target_id).exists()
+
+
+def add_reaction(kind: str, user_id: int, target_id: int, targets=None) -> bool:
+    """
+    Add the reaction with insert_link. True if a row was added, False if it
+    was already there; raises TargetNotFound when the post/comment doesn't
+    exist, or isn't in ``targets`` (e.g. the posts the user may read).
+    """
+    model, target, fk, counter = _models(kind)
+    if not insert_link(model, fk, target, user_id, target_id, targets):
+        if _missing(target, target_id, targets):
+            raise TargetNotFound(target_id)
+        return False
+    bump(target, target_id, **{counter: 1})
+    _touched(target, target_id)
+    return True
+
+
+def remove_reaction(kind: str, user_id: int, target_id: int, targets=None) -> bool:
+    """
+    Delete the reaction in one statement. True if a row was removed, False
+    if there was none; TargetNotFound as for add_reaction.
+    """
+    model, target, fk, counter = _models(kind)
+    deleted = delete_link(model, fk, user_id, target_id, targets)
+    if not deleted:
+        if _missing(target, target_id, targets):
+            raise TargetNotFound(target_id)
+        return False
+    bump(target, target_id, **{counter: -deleted})
+    _touched(target, target_id)
+    return True
@@ -0,0 +1,95 @@
+import random
+from contextvars import ContextVar
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def pin_key(user_id) -> str:
+    return f"blog:primary-pin:{user_id}"
+
+
+def replica_aliases() -> List[str]:
+    return list(getattr(settings, "BLOG_READ_REPLICAS", ()))
+
+
+class RoutingState:
+    """Where the current request's reads go; None means the primary."""
+
+    __slots__ = ("alias",)
+
+    def __init__(self):
+        self.alias: Optional[str] = None
+
+
+# a mutable holder, so choices made in sync_to_async threads are seen by the caller
+_current: ContextVar[Optional[RoutingState]] = ContextVar("blog_routing_state", default=None)
+
+
+def start_routing():
+    """Begin routing for the current request; returns the token for finish_routing()."""
+    state = RoutingState()
+    return state, _current.set(state)
+
+
+def finish_routing(token) -> None:
+    _current.reset(token)
+
+
+def pin_to_primary(user_id) -> None:
+    """Keep ``user_id``'s reads on the primary until replicas have caught up with their write."""
+    cache.set(pin_key(user_id), True, timeout=getattr(settings, "BLOG_REPLICA_PIN_SECONDS", 10))
+
+
+def is_pinned(user_id) -> bool:
+    return cache.get(pin_key(user_id)) is not None
+
+
+def use_replica(user) -> Optional[str]:
+    """
+    Send the rest of the current request's reads to a replica, unless
+    ``user`` wrote recently. Returns the alias chosen, or None.
+    """
+    state, aliases = _current.get(), replica_aliases()
+    if state is None or not aliases:
+        return None
+    if user is not None and user.is_authenticated and is_pinned(user.pk):
+        return None
+    state.alias = random.choice(aliases)
+    return state.alias
+
+
+def use_primary() -> None:
+    """Send the rest of the current request's reads back to the primary."""
+    state = _current.get()
+    if state is not None:
+        state.alias = None
+
+
+class ReplicaRouter:
+    """
+    Reads go to the replica picked by use_replica() for this request, all
+    writes to the primary. Reads inside a transaction stay on the primary:
+    they must see its uncommitted writes (this also keeps TestCase, which
+    wraps every test in one, on a single database).
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if state is None or state.alias is None:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the primary's rows
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
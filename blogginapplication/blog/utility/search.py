@@ -0,0 +1,124 @@
+import re
+from functools import lru_cache
+from typing import Iterable
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import CharField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+
+class BaseSearchBackend:
+    """
+    Interface for the posts full-text index. ``search`` narrows a Post
+    queryset to the matches and annotates ``search_rank`` (lower is better)
+    and ``search_snippet``.
+    """
+
+    def index(self, posts: Iterable) -> None:
+        pass
+
+    def remove(self, post_ids: Iterable[int]) -> None:
+        pass
+
+    def rebuild(self) -> int:
+        return 0
+
+    def search(self, queryset, query: str):
+        raise NotImplementedError
+
+
+def _unranked(queryset):
+    return queryset.annotate(
+        search_rank=Value(0.0), search_snippet=Value(None, output_field=CharField())
+    )
+
+
+class LikeSearchBackend(BaseSearchBackend):
+    """Index-less fallback: ``icontains`` over title and body, unranked."""
+
+    def search(self, queryset, query):
+        cond = Q()
+        for term in query.split():
+            cond &= Q(title__icontains=term) | Q(body__icontains=term)
+        return _unranked(queryset.filter(cond))
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """
+    SQLite FTS5 index in ``blog_post_fts`` (rowid = post id), ranked with
+    bm25 where title matches weigh more than body matches.
+    """
+
+    table = "blog_post_fts"
+    title_weight = 10.0
+    body_weight = 1.0
+    snippet_start = "<mark>"
+    snippet_end = "</mark>"
+    snippet_tokens = 24
+
+    def index(self, posts):
+        rows = [(p.pk, p.title, p.body) for p in posts]
+        if not rows:
+            return
+        self.remove([row[0] for row in rows])
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, title, body) VALUES (%s, %s, %s)", rows
+            )
+
+    def remove(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table} WHERE rowid = %s", [(pk,) for pk in post_ids]
+            )
+
+    def rebuild(self):
+        from ..models import Post
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, body) "
+                f"SELECT id, title, body FROM {Post._meta.db_table}"
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def match_expression(query: str) -> str:
+        # quote every term so user input can't inject FTS5 syntax; each is a prefix match
+        return " ".join(f'"{term}"*' for term in re.findall(r"\w+", query))
+
+    def search(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            # still annotated: callers order by search_rank
+            return _unranked(queryset.none())
+
+        post_id = f"{connection.ops.quote_name(queryset.model._meta.db_table)}.id"
+        matches = f"FROM {self.table} WHERE {self.table} MATCH %s"
+        rank = RawSQL(
+            f"SELECT bm25({self.table}, {self.title_weight}, {self.body_weight}) "
+            f"{matches} AND rowid = {post_id}",
+            (match,),
+            output_field=FloatField(),
+        )
+        snippet = RawSQL(
+            f"SELECT snippet({self.table}, 1, %s, %s, %s, {self.snippet_tokens}) "
+            f"{matches} AND rowid = {post_id}",
+            (self.snippet_start, self.snippet_end, "...", match),
+            output_field=CharField(),
+        )
+        hits = RawSQL(f"SELECT rowid {matches}", (match,))
+        return queryset.filter(id__in=hits).annotate(search_rank=rank, search_snippet=snippet)
+
+
+@lru_cache(maxsize=None)
+def get_search_backend() -> BaseSearchBackend:
+    path = getattr(settings, "BLOG_SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+    if connection.vendor == "sqlite":
+        return SQLiteFTS5Backend()
+    return LikeSearchBackend()
@@ -0,0 +1,45 @@
+from typing import Iterable
+
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .cache import bump_versions
+
+# cached /categories/stats/ and /tags/stats/ responses
+TAXONOMY_VERSION = "blog:v:taxonomy"
+
+
+def _stats(qs, fk: str, published_at: str) -> dict:
+    grouped = qs.filter(**{fk: OuterRef("pk")}).values(fk)
+    return {
+        "post_count": Coalesce(
+            Subquery(grouped.annotate(n=Count("pk")).values("n"), output_field=IntegerField()), 0
+        ),
+        "last_published_at": Subquery(grouped.annotate(last=Max(published_at)).values("last")),
+    }
+
+
+def refresh_taxonomy_stats(category_ids: Iterable = (), tag_ids: Iterable = ()) -> None:
+    """
+    Recount published posts and the latest publish time for just these
+    categories and tags, one UPDATE per model. Called from the post
+    save/delete and tag-change signals and from bulk paths that skip them.
+    """
+    from ..models import Category, Post, PostStatus, Tag
+
+    category_ids = {pk for pk in category_ids if pk is not None}
+    tag_ids = {pk for pk in tag_ids if pk is not None}
+    if category_ids:
+        Category.objects.filter(pk__in=category_ids).update(
+            **_stats(Post.objects.filter(status=PostStatus.PUBLISHED), "category", "published_at")
+        )
+    if tag_ids:
+        Tag.objects.filter(pk__in=tag_ids).update(
+            **_stats(
+                Post.tags.through.objects.filter(post__status=PostStatus.PUBLISHED),
+                "tag",
+                "post__published_at",
+            )
+        )
+    if category_ids or tag_ids:
+        bump_versions(TAXONOMY_VERSION)
@@ -0,0 +1,185 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import F, Q
+
+from .auth_cache import invalidate_user
+from .reactions import delete_link, insert_link
+
+FANOUT_BATCH_SIZE = 1000
+# how many recent posts a new follow copies into the follower's timeline
+BACKFILL_POSTS = 50
+
+
+def fanout_limit() -> int:
+    """Authors/tags with more followers than this are merged in at read time."""
+    return getattr(settings, "BLOG_FANOUT_MAX_FOLLOWERS", 5000)
+
+
+def _write_entries(user_ids, posts) -> None:
+    from ..models import TimelineEntry
+
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post_id=post_id, published_at=published_at)
+            for user_id in user_ids
+            for post_id, published_at in posts
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def _in_batches(follows, batch_size):
+    """Follower ids of ``follows`` in keyset batches of ``batch_size``."""
+    last = 0
+    while True:
+        ids = list(
+            follows.filter(user_id__gt=last)
+            .order_by("user_id")
+            .values_list("user_id", flat=True)
+            .distinct()[:batch_size]
+        )
+        if not ids:
+            return
+        yield ids
+        last = ids[-1]
+
+
+def fan_out(post_id: int, batch_size: int = FANOUT_BATCH_SIZE) -> int:
+    """
+    Copy a published post into the timelines of its author's and tags'
+    followers, one bulk insert per batch. Authors and tags over
+    fanout_limit() are skipped; feed_queryset() reads their posts directly.
+    """
+    from ..models import AuthorFollow, Post, PostStatus, Profile, Tag, TagFollow
+
+    post = (
+        Post.objects.filter(pk=post_id, status=PostStatus.PUBLISHED)
+        .values("author_id", "published_at")
+        .first()
+    )
+    if post is None:
+        return 0
+
+    limit = fanout_limit()
+    follows = []
+    if Profile.objects.filter(user_id=post["author_id"], follower_count__lte=limit).exists():
+        follows.append(AuthorFollow.objects.filter(author_id=post["author_id"]))
+    quiet_tags = Tag.objects.filter(posts=post_id, follower_count__lte=limit).values("pk")
+    follows.append(TagFollow.objects.filter(tag__in=quiet_tags))
+
+    sent = 0
+    for qs in follows:
+        for user_ids in _in_batches(qs, batch_size):
+            _write_entries(user_ids, [(post_id, post["published_at"])])
+            sent += len(user_ids)
+    return sent
+
+
+def remove_post(post_id: int) -> None:
+    """Take an unpublished post out of every timeline."""
+    from ..models import TimelineEntry
+
+    TimelineEntry.objects.filter(post_id=post_id).delete()
+
+
+POST_ORDERING = ("-published_at", "-created_at", "-id")
+
+# feed order when every post comes from the timeline: the entry's own
+# columns, so a page is a range scan of the (user, -published_at, -post) index
+TIMELINE_ORDERING = ("-feed_published_at", "-feed_post")
+
+
+def feed_queryset(user, queryset):
+    """
+    ``queryset`` narrowed to ``user``'s home feed and the keyset ordering to
+    page it by: their timeline entries, plus posts by followed authors and
+    tags too popular to fan out (which have no entries, so that mix is
+    ordered by the posts' own columns).
+    """
+    from ..models import AuthorFollow, Post, PostStatus, TagFollow
+
+    limit = fanout_limit()
+    popular_authors = list(
+        AuthorFollow.objects.filter(user=user, author__profile__follower_count__gt=limit)
+        .values_list("author_id", flat=True)
+    )
+    popular_tags = list(
+        TagFollow.objects.filter(user=user, tag__follower_count__gt=limit)
+        .values_list("tag_id", flat=True)
+    )
+    queryset = queryset.filter(status=PostStatus.PUBLISHED)
+    if not popular_authors and not popular_tags:
+        queryset = queryset.filter(timeline_entries__user=user).annotate(
+            feed_published_at=F("timeline_entries__published_at"),
+            feed_post=F("timeline_entries__post"),
+        )
+        return queryset, TIMELINE_ORDERING
+
+    cond = Q(pk__in=user.timeline.values("post_id")) | Q(author_id__in=popular_authors)
+    if popular_tags:
+        tagged = Post.tags.through.objects.filter(tag_id__in=popular_tags).values("post_id")
+        cond |= Q(pk__in=tagged)
+    return queryset.filter(cond), POST_ORDERING
+
+
+def _recent_posts(posts):
+    from ..models import PostStatus
+
+    return list(
+        posts.filter(status=PostStatus.PUBLISHED)
+        .order_by("-published_at")
+        .values_list("pk", "published_at")[:BACKFILL_POSTS]
+    )
+
+
+def follow_author(user, author_id: int) -> bool:
+    """Follow ``author_id``; True if newly followed. Backfills their recent posts."""
+    from ..models import AuthorFollow, Post, Profile
+
+    if not insert_link(AuthorFollow, "author_id", get_user_model(), user.pk, author_id):
+        return False
+    Profile.objects.filter(user_id=author_id).update(follower_count=F("follower_count") + 1)
+    invalidate_user(author_id)
+    if not Profile.objects.filter(user_id=author_id, follower_count__gt=fanout_limit()).exists():
+        _write_entries([user.pk], _recent_posts(Post.objects.filter(author_id=author_id)))
+    return True
+
+
+def unfollow_author(user, author_id: int) -> bool:
+    """Unfollow ``author_id``; their posts leave the timeline unless a followed tag keeps them."""
+    from ..models import AuthorFollow, Profile
+
+    if not delete_link(AuthorFollow, "author_id", user.pk, author_id):
+        return False
+    Profile.objects.filter(user_id=author_id).update(follower_count=F("follower_count") - 1)
+    invalidate_user(author_id)
+    user.timeline.filter(post__author_id=author_id).exclude(
+        post__tags__in=user.following_tags.values("tag_id")
+    ).delete()
+    return True
+
+
+def follow_tag(user, tag_id: int) -> bool:
+    """Follow ``tag_id``; True if newly followed. Backfills its recent posts."""
+    from ..models import Post, Tag, TagFollow
+
+    if not insert_link(TagFollow, "tag_id", Tag, user.pk, tag_id):
+        return False
+    Tag.objects.filter(pk=tag_id).update(follower_count=F("follower_count") + 1)
+    if not Tag.objects.filter(pk=tag_id, follower_count__gt=fanout_limit()).exists():
+        _write_entries([user.pk], _recent_posts(Post.objects.filter(tags=tag_id)))
+    return True
+
+
+def unfollow_tag(user, tag_id: int) -> bool:
+    """Unfollow ``tag_id``; its posts leave the timeline unless another follow keeps them."""
+    from ..models import Tag, TagFollow
+
+    if not delete_link(TagFollow, "tag_id", user.pk, tag_id):
+        return False
+    Tag.objects.filter(pk=tag_id).update(follower_count=F("follower_count") - 1)
+    user.timeline.filter(post__tags=tag_id).exclude(
+        Q(post__author_id__in=user.following_authors.values("author_id"))
+        | Q(post__tags__in=user.following_tags.values("tag_id"))
+    ).delete()
+    return True
@@ -0,0 +1,75 @@
+import math
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+
+# Each event contributes weight * exp((t - EPOCH) / TAU). Measuring from a
+# fixed epoch instead of "now" means a stored score never goes stale: decay
+# scales every post by the same factor, so only posts with new activity need
+# recomputing. Scores are kept as logs so the exponent can't overflow.
+# Events before EPOCH (imported or backfilled posts) count as if at EPOCH.
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc).timestamp()
+HALF_LIFE_HOURS = 24
+TAU = HALF_LIFE_HOURS * 3600 / math.log(2)
+
+# publishing counts as an event, so new posts get a head start
+WEIGHTS = {"publish": 1.0, "like": 1.0, "comment": 2.0, "bookmark": 3.0}
+
+WATERMARK = "hot_scores"
+
+
+def post_events(post_ids):
+    """(post_id, weight, unix time) triples for all scoring activity on ``post_ids``."""
+    from ..models import Bookmark, Comment, CommentStatus, Post, PostLike
+
+    sources = (
+        ("publish", Post.objects.filter(pk__in=post_ids, published_at__isnull=False)
+            .values_list("pk", "published_at")),
+        ("like", PostLike.objects.filter(post_id__in=post_ids)
+            .values_list("post_id", "created_at")),
+        ("comment", Comment.objects.filter(post_id__in=post_ids, status=CommentStatus.VISIBLE)
+            .values_list("post_id", "created_at")),
+        ("bookmark", Bookmark.objects.filter(post_id__in=post_ids)
+            .values_list("post_id", "created_at")),
+    )
+    for kind, rows in sources:
+        weight = WEIGHTS[kind]
+        for post_id, at in rows.iterator(chunk_size=2000):
+            yield post_id, weight, at.timestamp()
+
+
+def hot_scores(post_ids) -> dict:
+    """
+    {post_id: log(1 + sum(weight * exp((max(t, EPOCH) - EPOCH) / TAU)))} for
+    ``post_ids``, computed as one grouped log-sum-exp over all their events.
+    Any activity scores above 0.0, what posts without events get.
+    """
+    scores = dict.fromkeys(post_ids, 0.0)
+    events = np.array(list(post_events(post_ids)), dtype=np.float64).reshape(-1, 3)
+    if not len(events):
+        return scores
+
+    events = events[np.argsort(events[:, 0], kind="stable")]
+    ids, starts = np.unique(events[:, 0], return_index=True)
+    terms = np.log(events[:, 1]) + np.maximum(events[:, 2] - EPOCH, 0.0) / TAU
+    peak = np.maximum.reduceat(terms, starts)
+    group_peak = np.repeat(peak, np.diff(np.append(starts, len(terms))))
+    totals = peak + np.log(np.add.reduceat(np.exp(terms - group_peak), starts))
+    # log(1 + x): keeps the order, and keeps any activity above no activity
+    totals = np.logaddexp(0.0, totals)
+
+    scores.update(zip(ids.astype(np.int64).tolist(), totals.tolist()))
+    return scores
+
+
+def touched_posts(since):
+    """
+    Ids of posts with new likes, comments or bookmarks, or saved, after
+    ``since``. Removals leave no trace here; a ``--full`` run picks them up.
+    """
+    from ..models import Bookmark, Comment, Post, PostLike
+
+    ids = set(Post.objects.filter(updated_at__gt=since).values_list("pk", flat=True))
+    for model in (PostLike, Comment, Bookmark):
+        ids.update(model.objects.filter(created_at__gt=since).values_list("post_id", flat=True))
+    return sorted(ids)
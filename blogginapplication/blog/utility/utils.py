@@ -1,20 +1,101 @@
 from typing import Optional
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.utils.text import slugify
 from rest_framework.exceptions import ValidationError
 
+def _suffixed(base: str, n: int, max_length: int) -> str:
+    suffix = f"-{n}"
+    return base[: max_length - len(suffix)] + suffix
+
+
+def _first_free(base: str, taken, max_length: int, start: int = 2) -> int:
+    """The smallest N >= ``start`` with ``base-N`` not in ``taken``."""
+    n = start
+    while _suffixed(base, n, max_length) in taken:
+        n += 1
+    return n
+
 
 def unique_slugify(
     model, base_text: str, slug_field: str = "slug", max_length: int = 201
 ) -> str:
+    """
+    Return ``base`` or the first free ``base-N``, found with a single query
+    over slugs sharing the base's prefix. Only slugs of exactly that form
+    count as taken, so a title ending in a number ("weekly update 2024")
+    isn't mistaken for a suffix.
+    """
     base = slugify(base_text)[:max_length] or "item"
-    slug = base
-    i = 2
-
-    while model.objects.filter(**{slug_field: slug}).exists():
-        suffix = f"-{i}"
-        slug = (base[: max_length - len(suffix)]) + suffix
-        i += 1
-    return slug
+    # room for "-" plus 10 digits, so truncated "base-N" slugs match too
+    stem = base[: max_length - 11]
+    existing = set(
+        model.objects.filter(**{f"{slug_field}__startswith": stem})
+        .filter(Q(**{slug_field: base}) | Q(**{f"{slug_field}__regex": r"-[0-9]+$"}))
+        .values_list(slug_field, flat=True)
+    )
+    if base not in existing:
+        return base
+    return _suffixed(base, _first_free(base, existing, max_length), max_length)
+
+
+def unique_slugify_many(
+    model, base_texts, reserved=(), slug_field: str = "slug", max_length: int = 201
+) -> list:
+    """
+    Bulk version of unique_slugify: one slug per text, unique against the
+    table, ``reserved`` and each other. Existing slugs are read with one
+    query per 100 distinct bases.
+    """
+    bases = [slugify(text)[:max_length] or "item" for text in base_texts]
+    distinct = sorted(set(bases))
+    existing = set(reserved)
+    for i in range(0, len(distinct), 100):
+        prefixes = Q()
+        for base in distinct[i : i + 100]:
+            prefixes |= Q(**{f"{slug_field}__startswith": base[: max_length - 11]})
+        existing.update(
+            model.objects.filter(prefixes)
+            .filter(**{f"{slug_field}__regex": r"-[0-9]+$"})
+            .values_list(slug_field, flat=True)
+        )
+        existing.update(
+            model.objects.filter(**{f"{slug_field}__in": distinct[i : i + 100]})
+            .values_list(slug_field, flat=True)
+        )
+
+    # where to resume the search for each base, so repeats don't rescan
+    next_suffix = {}
+    slugs = []
+    for base in bases:
+        if base not in existing:
+            slug = base
+        else:
+            n = _first_free(base, existing, max_length, next_suffix.get(base, 2))
+            slug = _suffixed(base, n, max_length)
+            next_suffix[base] = n + 1
+        existing.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def save_with_unique_slug(instance, base_text: str, save, attempts: int = 5):
+    """
+    Allocate ``instance.slug`` from ``base_text`` and call ``save()``. A
+    concurrent writer can claim the same slug between allocation and insert,
+    so on an IntegrityError caused by the slug we allocate again and retry.
+    """
+    model = type(instance)
+    max_length = model._meta.get_field("slug").max_length
+    for attempt in range(attempts):
+        instance.slug = unique_slugify(model, base_text, max_length=max_length)
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            clash = model.objects.filter(slug=instance.slug).exists()
+            if not clash or attempt == attempts - 1:
+                raise
 
 
 def auth_user(request, message: str = "Authentication required."):
@@ -56,6 +137,19 @@ def make_excerpt(text: str, length: int = 160) -> str:
     text = (text or "").strip()
     return (text[:length] + "...") if len(text) > length else text
 
+
+WORDS_PER_MINUTE = 200
+
+
+def text_stats(body: str) -> dict:
+    """Excerpt, word count and reading time stored alongside a post body."""
+    words = len((body or "").split())
+    return {
+        "excerpt": make_excerpt(body),
+        "word_count": words,
+        "reading_time": -(-words // WORDS_PER_MINUTE),
+    }
+
 def _slug_ok(slug: str) -> str:
     slug = (slug or "").strip().lower()
     if not slug:
@@ -0,0 +1,66 @@
+from typing import Dict, Iterable, Set
+
+
+# relation name -> (model name, foreign key column holding the target id)
+RELATIONS = {
+    "post_like": ("PostLike", "post_id"),
+    "bookmark": ("Bookmark", "post_id"),
+    "comment_like": ("CommentLike", "comment_id"),
+}
+
+
+class ViewerState:
+    """
+    Per-request record of which posts/comments the current user has liked or
+    bookmarked. Ids are resolved in batches (one ``IN (...)`` query per
+    relation), so serializing a page costs the same as serializing one row.
+    """
+
+    def __init__(self, user):
+        self.user = user if user is not None and user.is_authenticated else None
+        self._hits: Dict[str, Set[int]] = {name: set() for name in RELATIONS}
+        self._seen: Dict[str, Set[int]] = {name: set() for name in RELATIONS}
+
+    def _claim(self, relation: str, ids: Iterable[int]):
+        """Mark ``ids`` seen; the queryset resolving the new ones, or None."""
+        missing = {pk for pk in ids if pk is not None} - self._seen[relation]
+        if not missing:
+            return None
+        self._seen[relation] |= missing
+        if self.user is None:
+            return None
+
+        from .. import models
+
+        model_name, column = RELATIONS[relation]
+        model = getattr(models, model_name)
+        return model.objects.filter(user=self.user, **{f"{column}__in": missing}).values_list(
+            column, flat=True
+        )
+
+    def prime(self, relation: str, ids: Iterable[int]) -> None:
+        qs = self._claim(relation, ids)
+        if qs is not None:
+            self._hits[relation].update(qs)
+
+    async def aprime(self, relation: str, ids: Iterable[int]) -> None:
+        """prime() for the async read views."""
+        qs = self._claim(relation, ids)
+        if qs is not None:
+            self._hits[relation].update([pk async for pk in qs])
+
+    def has(self, relation: str, pk: int) -> bool:
+        if self.user is None:
+            return False
+        self.prime(relation, [pk])
+        return pk in self._hits[relation]
+
+
+def viewer_state(context: dict) -> ViewerState:
+    """Return the ViewerState shared by every serializer using ``context``."""
+    state = context.get("viewer_state")
+    if state is None:
+        request = context.get("request")
+        state = ViewerState(getattr(request, "user", None))
+        context["viewer_state"] = state
+    return state
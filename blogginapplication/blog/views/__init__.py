@@ -3,6 +3,9 @@ from .post import PostViewSet
 from .taxomony import CategoryViewSet, TagViewSet
 from .profile import MeProfileView
 from .auth import RegisterView, MeView, ChangePasswordView
+from .reactions import BulkReactionView
+from .follows import AuthorFollowView
+from .metrics import MetricsView
 
 __all__ = [
     "CategoryViewSet",
@@ -13,4 +16,7 @@ __all__ = [
     "RegisterView",
     "MeView",
     "ChangePasswordView",
+    "BulkReactionView",
+    "AuthorFollowView",
+    "MetricsView",
 ]
@@ -0,0 +1,187 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.http import Http404
+from django.urls import URLPattern
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.response import Response
+
+from ..utility.cache import cached_response, prepare_build, read_validators, store_response
+from ..utility.comment_tree import aattach_replies, aload_comment_tree
+from ..utility.viewer_state import ViewerState
+
+# handled only by the sync viewsets; requests using them are passed through
+SYNC_ONLY_PARAMS = frozenset(
+    ("search", "cursor", "pagination", "count", "fields", "omit", "view", "format")
+)
+
+
+def _relations(view):
+    return getattr(view.get_serializer_class(), "viewer_relations", {})
+
+
+async def fetch_list(view, queryset, state):
+    """A page of ``queryset`` plus the viewer's likes/bookmarks on it."""
+    rows = await view.paginator.apaginate_queryset(queryset, view.request, view)
+    ids = [obj.pk for obj in rows]
+    await asyncio.gather(*(state.aprime(relation, ids) for relation in _relations(view)))
+    return rows
+
+
+async def fetch_comment_list(view, queryset, state):
+    """A page of comments, their replies and the viewer's comment likes."""
+    rows = await view.paginator.apaginate_queryset(queryset, view.request, view)
+    await asyncio.gather(
+        aattach_replies(rows), state.aprime("comment_like", [c.pk for c in rows])
+    )
+    await state.aprime("comment_like", [r.pk for c in rows for r in c.loaded_replies])
+    return rows
+
+
+async def fetch_post_detail(view, queryset, state):
+    """One post with its comment tree and the viewer's reactions on both."""
+    lookup = view.lookup_url_kwarg or view.lookup_field
+    try:
+        post = await queryset.aget(**{view.lookup_field: view.kwargs[lookup]})
+    except ObjectDoesNotExist:
+        raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+    except (TypeError, ValueError, ValidationError):
+        raise Http404
+
+    tree, *_ = await asyncio.gather(
+        aload_comment_tree(post.pk),
+        *(state.aprime(relation, [post.pk]) for relation in _relations(view)),
+    )
+    post.comment_tree = tree
+    await state.aprime(
+        "comment_like", [c.pk for root in tree for c in (root, *root.loaded_replies)]
+    )
+    return post
+
+
+# route name -> fetch coroutine
+ASYNC_READS = {
+    "post-list": fetch_list,
+    "post-detail": fetch_post_detail,
+    "comment-list": fetch_comment_list,
+    "category-list": fetch_list,
+    "tag-list": fetch_list,
+}
+
+
+class AsyncReadView(View):
+    """
+    Async GET for one router route. ``sync_view`` is the route's viewset
+    callback: authentication, permissions, throttling, filtering and
+    serialization run on the viewset in two sync hops, and only the database
+    reads in between (``fetch``) use the async ORM. Other methods, and GETs
+    with SYNC_ONLY_PARAMS, are handed to ``sync_view`` as they are.
+    """
+
+    sync_view = None
+    fetch = None
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = csrf_exempt(super().as_view(**initkwargs))
+        # schema generation and the API root look for the viewset here
+        sync_view = initkwargs["sync_view"]
+        view.cls, view.initkwargs, view.actions = (
+            sync_view.cls, sync_view.initkwargs, sync_view.actions
+        )
+        return view
+
+    async def get(self, request, *args, **kwargs):
+        if "format" in kwargs or not SYNC_ONLY_PARAMS.isdisjoint(request.GET):
+            return await self.passthrough(request, *args, **kwargs)
+
+        view, queryset, response = await sync_to_async(self.begin)(request, args, kwargs)
+        if response is not None:
+            return response
+        try:
+            result = await self.fetch(view, queryset, view.viewer_state)
+        except Exception as exc:
+            return await sync_to_async(self.fail)(view, exc)
+        return await sync_to_async(self.finish)(view, result)
+
+    async def passthrough(self, request, *args, **kwargs):
+        return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+    post = put = patch = delete = options = passthrough
+
+    def begin(self, request, args, kwargs):
+        """
+        What the viewset's dispatch() does before calling the handler, then
+        the conditional/cached response check. Returns (view, queryset, None),
+        or (view, None, response) when there is nothing left to read.
+        """
+        actions = dict(self.sync_view.actions)
+        if "get" in actions and "head" not in actions:
+            actions["head"] = actions["get"]
+        view = self.sync_view.cls(**self.sync_view.initkwargs)
+        view.action_map = actions
+        for method, action in actions.items():
+            setattr(view, method, getattr(view, action))
+        view.args, view.kwargs = args, kwargs
+        view.request = view.initialize_request(request, *args, **kwargs)
+        view.headers = view.default_response_headers
+
+        try:
+            view.initial(view.request, *args, **kwargs)
+            view.read_validators = read_validators(
+                view.request, view.get_read_name(), view.get_read_versions()
+            )
+            response = cached_response(view.request, view.read_validators)
+            if response is None:
+                prepare_build(view.request)
+                view.viewer_state = ViewerState(view.request.user)
+                return view, view.filter_queryset(view.get_queryset()), None
+        except Exception as exc:
+            response = view.handle_exception(exc)
+        return view, None, self.finalize(view, response)
+
+    def finish(self, view, result):
+        """Serialize what fetch() read, exactly as list()/retrieve() would."""
+        request = view.request
+        try:
+            if isinstance(result, list):
+                serializer = view.get_serializer(result, many=True)
+                serializer.context["viewer_state"] = view.viewer_state
+                response = view.get_paginated_response(serializer.data)
+            else:
+                view.check_object_permissions(request, result)
+                serializer = view.get_serializer(result)
+                serializer.context["viewer_state"] = view.viewer_state
+                response = Response(serializer.data)
+            store_response(request, view.read_validators, response)
+        except Exception as exc:
+            response = view.handle_exception(exc)
+        return self.finalize(view, response)
+
+    def fail(self, view, exc):
+        return self.finalize(view, view.handle_exception(exc))
+
+    def finalize(self, view, response):
+        response = view.finalize_response(view.request, response, *view.args, **view.kwargs)
+        # render here rather than in another thread hop from the handler
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+
+def async_read_urls(patterns):
+    """``patterns`` (a router's urls) with the ASYNC_READS routes served by AsyncReadView."""
+    return [
+        URLPattern(
+            pattern.pattern,
+            AsyncReadView.as_view(sync_view=pattern.callback, fetch=ASYNC_READS[pattern.name]),
+            pattern.default_args,
+            pattern.name,
+        )
+        if getattr(pattern, "name", None) in ASYNC_READS
+        else pattern
+        for pattern in patterns
+    ]
@@ -1,27 +1,45 @@
-from django.db.models import Count
+from django.db import transaction
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 
-from ..models import Comment
+from ..models import Comment, CommentStatus, Post
 from ..serializers import CommentReadSerializer, CommentWriteSerializer
 from ..permissions import IsAuthOrReadOnly
 
 from rest_framework.decorators import action
-from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework import status, serializers
+from rest_framework import serializers
 from drf_spectacular.utils import extend_schema, inline_serializer
-from ..models import CommentLike
+from ..utility.counters import bump
+from ..utility.cache import GLOBAL_VERSION
+from .mixins import (
+    SPARSE_FIELDSET_PARAMETERS,
+    ReactionActionMixin,
+    ReplicaReadMixin,
+    SerializerTimingMixin,
+    SparseFieldsetMixin,
+    VersionedReadMixin,
+)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ReplicaReadMixin,
+    SerializerTimingMixin,
+    SparseFieldsetMixin,
+    ReactionActionMixin,
+    VersionedReadMixin,
+    viewsets.ModelViewSet,
+):
     throttle_scope = None
+    # any comment or comment-like write bumps the global version
+    read_versions = (GLOBAL_VERSION,)
     permission_classes = [IsAuthOrReadOnly, IsAuthenticatedOrReadOnly]
+    keyset_ordering = ("-created_at", "-id")
 
     def get_queryset(self):
-        qs = Comment.objects.select_related("author", "post", "parent").annotate(
-            like_count=Count("likes", distinct=True)
-        )
+        qs = Comment.objects.all()
+        if self.wants("author"):
+            qs = qs.select_related("author")
 
         post_id = self.request.query_params.get("post")
         if post_id:
@@ -32,11 +50,27 @@ class CommentViewSet(viewsets.ModelViewSet):
 
         return qs.order_by("-created_at")
 
+    @extend_schema(parameters=SPARSE_FIELDSET_PARAMETERS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(parameters=SPARSE_FIELDSET_PARAMETERS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
             return CommentWriteSerializer
         return CommentReadSerializer
-    
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # replies are deleted by cascade, so they leave the post's count too
+        visible = int(instance.status == CommentStatus.VISIBLE)
+        visible += instance.replies.filter(status=CommentStatus.VISIBLE).count()
+        instance.delete()
+        bump(Post, instance.post_id, comment_count=-visible)
+
     @extend_schema(
         request=None,
         responses=inline_serializer(
@@ -50,9 +84,4 @@ class CommentViewSet(viewsets.ModelViewSet):
         throttle_scope="write",
     )
     def like(self, request, pk=None):
-        comment = self.get_object()
-        if request.method.lower() == "post":
-            CommentLike.objects.get_or_create(user=request.user, comment=comment)
-            return Response({"liked": True}, status=status.HTTP_201_CREATED)
-        CommentLike.objects.filter(user=request.user, comment=comment).delete()
-        return Response({"liked": False}, status=status.HTTP_204_NO_CONTENT)
+        return self.react("comment_like", "liked")
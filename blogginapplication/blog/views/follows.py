@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from drf_spectacular.utils import extend_schema, inline_serializer
+from rest_framework import serializers, status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..utility.timeline import follow_author, unfollow_author
+
+FollowResponse = inline_serializer(
+    name="FollowResponse", fields={"following": serializers.BooleanField()}
+)
+
+
+class AuthorFollowView(APIView):
+    """POST follows the author, DELETE unfollows; their posts then show up in /posts/feed/."""
+
+    permission_classes = [IsAuthenticated]
+    throttle_scope = "write"
+
+    def _author_id(self, request, username):
+        author_id = (
+            get_user_model().objects.filter(username=username).values_list("pk", flat=True).first()
+        )
+        if author_id is None:
+            raise NotFound()
+        if author_id == request.user.pk:
+            raise ValidationError("You can't follow yourself.")
+        return author_id
+
+    @extend_schema(request=None, responses=FollowResponse)
+    def post(self, request, username):
+        author_id = self._author_id(request, username)
+        with transaction.atomic():
+            follow_author(request.user, author_id)
+        return Response({"following": True}, status=status.HTTP_201_CREATED)
+
+    @extend_schema(request=None, responses=None)
+    def delete(self, request, username):
+        author_id = self._author_id(request, username)
+        with transaction.atomic():
+            unfollow_author(request.user, author_id)
+        return Response({"following": False}, status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,20 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..renderers import PrometheusRenderer
+from ..utility.metrics import render_metrics
+
+
+class MetricsView(APIView):
+    """Request metrics of this process in Prometheus text format (staff only)."""
+
+    permission_classes = [IsAdminUser]
+    renderer_classes = [PrometheusRenderer]
+    throttle_classes = []
+
+    @extend_schema(responses={(200, "text/plain"): OpenApiTypes.STR})
+    def get(self, request):
+        return Response(render_metrics())
@@ -0,0 +1,149 @@
+from functools import partial
+
+from django.db import transaction
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from ..utility.cache import cached_read
+from ..utility.metrics import timed
+from ..utility.reactions import TargetNotFound, add_reaction, remove_reaction
+from ..utility.replicas import use_replica
+
+
+SPARSE_FIELDSET_PARAMETERS = [
+    OpenApiParameter("fields", OpenApiTypes.STR, description="Comma-separated fields to return."),
+    OpenApiParameter("omit", OpenApiTypes.STR, description="Comma-separated fields to drop."),
+    OpenApiParameter("view", OpenApiTypes.STR, description="Named field preset, e.g. `card`."),
+]
+
+
+def _csv(value):
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+class SparseFieldsetMixin:
+    """
+    ``?fields=a,b`` / ``?omit=c`` / ``?view=<preset>`` on read actions. The
+    selection is handed to serializers built on SparseFieldsMixin, and
+    ``wants()`` lets ``get_queryset`` skip joins and columns nobody reads.
+    ``default_omit`` (action -> fields) applies unless ``?fields=`` is given.
+    """
+
+    sparse_actions = ("list", "retrieve")
+    default_omit = {}
+
+    def get_field_selection(self):
+        if hasattr(self, "_field_selection"):
+            return self._field_selection
+
+        selection = {}
+        if self.action in self.sparse_actions:
+            params = self.request.query_params
+            preset = params.get("view")
+            if preset:
+                presets = getattr(self.get_serializer_class(), "field_presets", {})
+                if preset not in presets:
+                    raise ValidationError({"view": f"Unknown view '{preset}'."})
+                selection.update(fields=presets[preset], slim=True)
+            if params.get("fields"):
+                selection["fields"] = _csv(params["fields"])
+            omit = _csv(params.get("omit", ""))
+            if "fields" not in selection:
+                omit += self.default_omit.get(self.action, ())
+            if omit:
+                selection["omit"] = omit
+
+        self._field_selection = selection
+        return selection
+
+    def wants(self, *names):
+        """True if any of ``names`` will be serialized."""
+        selection = self.get_field_selection()
+        fields, omit = selection.get("fields"), selection.get("omit", ())
+        return any(
+            (fields is None or name in fields) and name not in omit for name in names
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(self.get_field_selection())
+        return super().get_serializer(*args, **kwargs)
+
+
+class ReactionActionMixin:
+    """
+    POST/DELETE toggles for the detail route's object, written with single
+    statements from blog.utility.reactions instead of get_object() plus
+    get_or_create, so concurrent double-taps can't race into a 500. Targets
+    outside ``get_queryset()`` (e.g. other authors' drafts) are a 404, as
+    on the detail route.
+    """
+
+    def react(self, kind, key):
+        try:
+            target_id = int(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+            targets = self.get_queryset()
+            with transaction.atomic():
+                if self.request.method == "POST":
+                    add_reaction(kind, self.request.user.pk, target_id, targets)
+                    return Response({key: True}, status=status.HTTP_201_CREATED)
+                remove_reaction(kind, self.request.user.pk, target_id, targets)
+        except (ValueError, TargetNotFound):
+            raise NotFound()
+        return Response({key: False}, status=status.HTTP_204_NO_CONTENT)
+
+
+class ReplicaReadMixin:
+    """
+    Safe-method requests read from a replica (blog.utility.replicas) once
+    authentication, permissions and throttling have run on the primary,
+    unless the user is pinned there after a recent write. Anonymous
+    responses that will be cached are still built from the primary
+    (blog.utility.cache.prepare_build).
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            use_replica(request.user)
+
+
+class SerializerTimingMixin:
+    """
+    Serializers from ``get_serializer()`` count the time their ``.data``
+    takes towards the request's serializer metric (blog.utility.metrics).
+    Skipped for the fake views schema generation builds.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if getattr(self, "swagger_fake_view", False):
+            return serializer
+        return timed(serializer)
+
+
+class VersionedReadMixin:
+    """
+    ``list``/``retrieve`` through cached_read: conditional GETs (ETag and
+    Last-Modified answered with 304) plus the anonymous response cache, both
+    keyed on the version counters from ``get_read_versions()``.
+    """
+
+    read_versions = ()
+
+    def get_read_versions(self):
+        return list(self.read_versions)
+
+    def get_read_name(self):
+        return f"{self.basename}:{'detail' if self.detail else 'list'}"
+
+    def list(self, request, *args, **kwargs):
+        build = partial(super().list, request, *args, **kwargs)
+        return cached_read(request, self.get_read_name(), self.get_read_versions(), build)
+
+    def retrieve(self, request, *args, **kwargs):
+        build = partial(super().retrieve, request, *args, **kwargs)
+        return cached_read(request, self.get_read_name(), self.get_read_versions(), build)
@@ -1,41 +1,69 @@
-from rest_framework import viewsets, status
+from functools import partial
+
+from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import (
+    IsAdminUser,
     IsAuthenticatedOrReadOnly,
     IsAuthenticated,
 )
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from django.db.models import Count, Q
 
-from ..models import Post, PostLike, PostStatus, Bookmark, CommentStatus
+from ..models import Post, PostStatus
 
 from ..serializers import PostDetailsSerializer, PostListSerializer, PostWriteSerializer
 
 from ..permissions import IsAuthOrReadOnly
-from drf_spectacular.utils import extend_schema, inline_serializer
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema, inline_serializer
 from rest_framework import serializers
-from ..filter import PostFilter
+from ..filter import PostFilter, PostSearchFilter
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.filters import OrderingFilter
+from ..utility.cache import GLOBAL_VERSION, REFS_VERSION, cached_read, post_version
+from ..utility.export import EXPORTS, OUTPUTS, export_lines
+from ..utility.importer import import_posts
+from ..utility.timeline import fan_out, feed_queryset, remove_post
+from ..parsers import NDJSONParser
+from .mixins import (
+    SPARSE_FIELDSET_PARAMETERS,
+    ReactionActionMixin,
+    ReplicaReadMixin,
+    SerializerTimingMixin,
+    SparseFieldsetMixin,
+    VersionedReadMixin,
+)
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(
+    ReplicaReadMixin,
+    SerializerTimingMixin,
+    SparseFieldsetMixin,
+    ReactionActionMixin,
+    VersionedReadMixin,
+    viewsets.ModelViewSet,
+):
     filterset_class = PostFilter
-    permission_classes = [IsAuthOrReadOnly, IsAuthenticatedOrReadOnly, IsAuthenticated]
+    # search goes last so it can keep relevance order when no ?ordering= is given
+    filter_backends = [DjangoFilterBackend, OrderingFilter, PostSearchFilter]
+    permission_classes = [IsAuthOrReadOnly, IsAuthenticatedOrReadOnly]
     throttle_scope = None
 
     def get_queryset(self):
-        qs = (
-            Post.objects.select_related("author", "category")
-            .prefetch_related("tags")
-            .annotate(
-                like_count=Count("likes", distinct=True),
-                comment_count=Count(
-                    "comments",
-                    filter=Q(comments__status=CommentStatus.VISIBLE),
-                    distinct=True,
-                ),
-            )
-        )
+        # drafts and archived posts are visible to their author only, which
+        # also keeps them out of the shared anonymous response cache
+        qs = Post.objects.filter(Post.visible_to(self.request.user))
+        related = [name for name in ("author", "category") if self.wants(name)]
+        if related:
+            qs = qs.select_related(*related)
+        if self.wants("tags"):
+            qs = qs.prefetch_related("tags")
+        if not self.wants("body"):
+            qs = qs.defer("body")
 
         params = self.request.query_params
         status_param = params.get("status")
@@ -66,12 +94,73 @@ class PostViewSet(viewsets.ModelViewSet):
 
         return qs
 
-    search_fields = ["title", "body"]
-    ordering_fields = ["published_at", "like_count", "comment_count", "created_at"]
+    ordering_fields = ["published_at", "like_count", "comment_count", "created_at", "hot_score"]
     ordering = ["-published_at", "-created_at"]
+    keyset_ordering = ("-published_at", "-created_at", "-id")
+    # list rows carry the stored excerpt; ?fields=...,body brings the body back
+    default_omit = {"list": ("body",), "trending": ("body",), "feed": ("body",)}
+    sparse_actions = ("list", "retrieve", "trending", "feed")
+
+    read_versions = (GLOBAL_VERSION,)
+
+    def get_read_versions(self):
+        if self.action == "retrieve":
+            return [post_version(self.kwargs.get(self.lookup_field)), REFS_VERSION]
+        return super().get_read_versions()
+
+    @extend_schema(parameters=SPARSE_FIELDSET_PARAMETERS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(parameters=SPARSE_FIELDSET_PARAMETERS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(parameters=SPARSE_FIELDSET_PARAMETERS)
+    @action(detail=False, methods=["get"])
+    def trending(self, request):
+        """Published posts by stored hot score (see `manage.py compute_hot_scores`)."""
+        self.keyset_ordering = ("-hot_score", "-id")
+
+        def build():
+            qs = self.filter_queryset(self.get_queryset()).filter(status=PostStatus.PUBLISHED)
+            page = self.paginate_queryset(qs.order_by("-hot_score", "-id"))
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+        return cached_read(request, "post:trending", [GLOBAL_VERSION], build)
+
+    @extend_schema(parameters=SPARSE_FIELDSET_PARAMETERS)
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated])
+    def feed(self, request):
+        """Home feed: posts from followed authors and tags, newest first."""
+        qs, self.keyset_ordering = feed_queryset(
+            request.user, self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(qs.order_by(*self.keyset_ordering))
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    def perform_create(self, serializer):
+        post = serializer.save()
+        if post.status == PostStatus.PUBLISHED:
+            transaction.on_commit(partial(fan_out, post.pk))
+
+    def perform_update(self, serializer):
+        was_published = serializer.instance.status == PostStatus.PUBLISHED
+        new_tags = serializer.validated_data.get("tags")
+        if was_published and new_tags:
+            # followers of a newly added tag haven't been sent the post yet
+            old_tags = set(serializer.instance.tags.values_list("pk", flat=True))
+            tags_added = bool({tag.pk for tag in new_tags} - old_tags)
+        else:
+            tags_added = False
+        post = serializer.save()
+        if post.status == PostStatus.PUBLISHED and (not was_published or tags_added):
+            transaction.on_commit(partial(fan_out, post.pk))
+        elif was_published and post.status != PostStatus.PUBLISHED:
+            remove_post(post.pk)
 
     def get_serializer_class(self):
-        if self.action == "list":
+        if self.action in ("list", "trending", "feed"):
             return PostListSerializer
         elif self.action == "retrieve":
             return PostDetailsSerializer
@@ -100,6 +189,7 @@ class PostViewSet(viewsets.ModelViewSet):
         if not post.published_at:
             post.published_at = timezone.now()
         post.save(update_fields=["status", "published_at", "updated_at"])
+        transaction.on_commit(partial(fan_out, post.pk))
 
         return Response({"status": "Published", "published_at": post.published_at})
 
@@ -114,6 +204,7 @@ class PostViewSet(viewsets.ModelViewSet):
         post = self.get_object()
         post.status = PostStatus.DRAFT
         post.save(update_fields=["status", "updated_at"])
+        remove_post(post.pk)
 
         return Response({"status": "draft"})
 
@@ -130,12 +221,7 @@ class PostViewSet(viewsets.ModelViewSet):
         throttle_scope="write",
     )
     def like(self, request, pk=None):
-        post = self.get_object()
-        if request.method.lower() == "post":
-            PostLike.objects.get_or_create(user=request.user, post=post)
-            return Response({"liked": True}, status=status.HTTP_201_CREATED)
-        PostLike.objects.filter(user=request.user, post=post).delete()
-        return Response({"liked": False}, status=status.HTTP_204_NO_CONTENT)
+        return self.react("post_like", "liked")
 
     @extend_schema(
         request=None,
@@ -150,9 +236,63 @@ class PostViewSet(viewsets.ModelViewSet):
         throttle_scope="write",
     )
     def bookmark(self, request, pk=None):
-        post = self.get_object()
-        if request.method.lower() == "post":
-            Bookmark.objects.get_or_create(user=request.user, post=post)
-            return Response({"bookmarked": True}, status=status.HTTP_201_CREATED)
-        Bookmark.objects.filter(user=request.user, post=post).delete()
-        return Response({"bookmarked": False}, status=status.HTTP_204_NO_CONTENT)
+        return self.react("bookmark", "bookmarked")
+
+    @extend_schema(
+        request={NDJSONParser.media_type: OpenApiTypes.STR},
+        responses=inline_serializer(
+            name="PostImportReport",
+            fields={
+                "created": serializers.IntegerField(),
+                "errors": serializers.ListField(child=serializers.DictField()),
+            },
+        ),
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[NDJSONParser],
+        permission_classes=[IsAuthenticated],
+        throttle_scope="write",
+    )
+    def bulk_import(self, request):
+        """One post per NDJSON line, authored by the caller; bad lines are reported, not fatal."""
+        return Response(import_posts(request.data, request.user))
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("output", OpenApiTypes.STR, enum=tuple(OUTPUTS), default="ndjson"),
+            OpenApiParameter("kind", OpenApiTypes.STR, enum=tuple(EXPORTS), default="posts"),
+            OpenApiParameter(
+                "after_id", OpenApiTypes.INT, description="Resume after this id (watermark)."
+            ),
+        ],
+        responses={(200, media): OpenApiTypes.STR for media in OUTPUTS.values()},
+    )
+    @action(detail=False, methods=["get"], permission_classes=[IsAdminUser], pagination_class=None)
+    def export(self, request):
+        """
+        Stream every matching post (or its comments with ``kind=comments``)
+        in id order. Takes the list filters; ``after_id`` resumes an export.
+        """
+        params = request.query_params
+        output, kind = params.get("output", "ndjson"), params.get("kind", "posts")
+        if output not in OUTPUTS:
+            raise ValidationError({"output": f"Choose one of: {', '.join(OUTPUTS)}."})
+        if kind not in EXPORTS:
+            raise ValidationError({"kind": f"Choose one of: {', '.join(EXPORTS)}."})
+        try:
+            after_id = int(params.get("after_id", 0))
+        except ValueError:
+            raise ValidationError({"after_id": "Must be an integer."})
+
+        filterset = PostFilter(params, queryset=Post.objects.all())
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        response = StreamingHttpResponse(
+            export_lines(kind, output, filterset.qs, after_id=after_id),
+            content_type=OUTPUTS[output],
+        )
+        response["Content-Disposition"] = f'attachment; filename="{kind}.{output}"'
+        return response
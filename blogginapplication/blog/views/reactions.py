@@ -0,0 +1,52 @@
+from django.db import transaction
+from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import Post
+from ..serializers import BulkReactionSerializer, ReactionResultSerializer
+from ..utility.reactions import TargetNotFound, add_reaction, remove_reaction
+
+# (op, target) -> (reaction kind, add?)
+OPERATIONS = {
+    ("like", "post"): ("post_like", True),
+    ("unlike", "post"): ("post_like", False),
+    ("bookmark", "post"): ("bookmark", True),
+    ("unbookmark", "post"): ("bookmark", False),
+    ("like", "comment"): ("comment_like", True),
+    ("unlike", "comment"): ("comment_like", False),
+}
+
+
+class BulkReactionView(APIView):
+    """
+    Apply a batch of like/unlike/bookmark/unbookmark operations in one
+    transaction, e.g. reactions queued while a client was offline. Ops are
+    applied in order; a missing post/comment, or another author's draft,
+    fails only its own op.
+    """
+
+    permission_classes = [IsAuthenticated]
+    throttle_scope = "write"
+
+    @extend_schema(request=BulkReactionSerializer, responses=ReactionResultSerializer(many=True))
+    def post(self, request):
+        ser = BulkReactionSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+
+        # what the post routes would 404 on; comments are all readable there too
+        targets = {"post": Post.objects.filter(Post.visible_to(request.user)), "comment": None}
+        results = []
+        with transaction.atomic():
+            for op in ser.validated_data["ops"]:
+                target = "post" if "post" in op else "comment"
+                kind, adding = OPERATIONS[op["op"], target]
+                result = {"op": op["op"], target: op[target]}
+                apply = add_reaction if adding else remove_reaction
+                try:
+                    result["changed"] = apply(kind, request.user.pk, op[target], targets[target])
+                except TargetNotFound:
+                    result.update(changed=False, error="not found")
+                results.append(result)
+        return Response(results)
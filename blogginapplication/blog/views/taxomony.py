@@ -1,19 +1,92 @@
-from rest_framework import viewsets
+from django.db import transaction
+from drf_spectacular.utils import extend_schema
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from ..models import Category, Tag
-from ..serializers import CategorySerializer, TagSerializer
+from ..serializers import (
+    CategorySerializer,
+    CategoryStatsSerializer,
+    TagSerializer,
+    TagStatsSerializer,
+)
 from ..permissions import IsAdminOrReadOnly
+from ..utility.cache import REFS_VERSION, cached_read
+from ..utility.taxonomy import TAXONOMY_VERSION
+from ..utility.timeline import follow_tag, unfollow_tag
+from .follows import FollowResponse
+from .mixins import ReplicaReadMixin, SerializerTimingMixin, VersionedReadMixin
 
-class CategoryViewSet(viewsets.ModelViewSet):
+
+class TaxonomyStatsMixin:
+    """
+    ``GET .../stats/``: rows with published posts, busiest first, read from
+    the stored ``post_count``/``last_published_at`` columns.
+    """
+
+    stats_serializer_class = None
+
+    def get_serializer_class(self):
+        if self.action == "stats":
+            return self.stats_serializer_class
+        return super().get_serializer_class()
+
+    @action(detail=False, methods=["get"])
+    def stats(self, request):
+        def build():
+            qs = self.get_queryset().filter(post_count__gt=0).order_by("-post_count", "name")
+            page = self.paginate_queryset(qs)
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+        versions = [TAXONOMY_VERSION, REFS_VERSION]
+        return cached_read(request, f"{self.basename}:stats", versions, build)
+
+
+class CategoryViewSet(
+    ReplicaReadMixin,
+    SerializerTimingMixin,
+    TaxonomyStatsMixin,
+    VersionedReadMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Category.objects.all().order_by("name")
+    read_versions = (REFS_VERSION,)
     serializer_class = CategorySerializer
+    stats_serializer_class = CategoryStatsSerializer
     permission_classes = [IsAdminOrReadOnly]
     lookup_field = "slug"  # better UX: /categories/python/
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(
+    ReplicaReadMixin,
+    SerializerTimingMixin,
+    TaxonomyStatsMixin,
+    VersionedReadMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Tag.objects.all().order_by("name")
+    read_versions = (REFS_VERSION,)
     serializer_class = TagSerializer
+    stats_serializer_class = TagStatsSerializer
     permission_classes = [IsAdminOrReadOnly]
     lookup_field = "slug"
+    throttle_scope = None
 
     def perform_create(self, serializer):
         obj = serializer.save() 
+
+    @extend_schema(request=None, responses=FollowResponse)
+    @action(
+        detail=True,
+        methods=["post", "delete"],
+        permission_classes=[IsAuthenticated],
+        throttle_scope="write",
+    )
+    def follow(self, request, slug=None):
+        tag = self.get_object()
+        with transaction.atomic():
+            if request.method == "POST":
+                follow_tag(request.user, tag.pk)
+                return Response({"following": True}, status=status.HTTP_201_CREATED)
+            unfollow_tag(request.user, tag.pk)
+        return Response({"following": False}, status=status.HTTP_204_NO_CONTENT)
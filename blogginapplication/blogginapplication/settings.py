@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -47,10 +48,11 @@ INSTALLED_APPS = [
 ]
 
 REST_FRAMEWORK = {
+    # users and profiles come from the "auth" cache (blog.authentication)
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.SessionAuthentication",
+        "blog.authentication.CachedSessionAuthentication",
         # optional JWT
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "blog.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
@@ -62,10 +64,11 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_PAGINATION_CLASS": "blog.pagination.StandardResultsSetPagination",
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # DRF's throttles on GCRA: one value per key instead of a timestamp list
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
-        "rest_framework.throttling.ScopedRateThrottle",
+        "blog.throttling.AnonRateThrottle",
+        "blog.throttling.UserRateThrottle",
+        "blog.throttling.ScopedRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "200/day",
@@ -84,11 +87,13 @@ SPECTACULAR_SETTINGS = {
 }
 
 MIDDLEWARE = [
+    "blog.middleware.MetricsMiddleware",  # first, so its latency covers the rest
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "blog.middleware.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -116,12 +121,72 @@ WSGI_APPLICATION = "blogginapplication.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connections are kept for CONN_MAX_AGE seconds and checked before reuse.
+# "replica" is a stand-in for a read replica: a second connection to the
+# same file here, and a separate SQLite file under test. Point it (or more
+# aliases listed in BLOG_READ_REPLICAS) at real replicas in production.
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
+    },
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
+        "TEST": {"NAME": BASE_DIR / "test_replica.sqlite3"},
+    },
+}
+DATABASE_ROUTERS = ["blog.utility.replicas.ReplicaRouter"]
+
+# Safe reads on the post, comment, category and tag viewsets go to one of
+# these aliases (blog.utility.replicas); a user stays on the primary for
+# BLOG_REPLICA_PIN_SECONDS after a successful write, to read their writes.
+# Anonymous reads that fill the response cache stay on the primary.
+BLOG_READ_REPLICAS = ["replica"]
+BLOG_REPLICA_PIN_SECONDS = 10
+
+# "responses" holds anonymous API responses and their version counters
+# (blog.utility.cache). LocMem is per process: with several workers, point
+# it at a shared backend (file-based, Redis...) so writes invalidate everywhere.
+# The blog.E001 system check enforces that for "responses" and "auth" when
+# BLOG_WORKER_PROCESSES is above 1.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "responses": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "blog-responses",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+    # authenticated users with their profiles (blog.utility.auth_cache),
+    # dropped on user/profile writes; the drop only reaches the worker that
+    # made the write unless this is a shared backend too
+    "auth": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "blog-auth",
+        "TIMEOUT": 60,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
 }
+BLOG_RESPONSE_CACHE = "responses"
+BLOG_AUTH_CACHE = "auth"
+
+# Worker processes serving the site (gunicorn/uvicorn read WEB_CONCURRENCY
+# too); above 1, the caches above must not be LocMem (blog.checks).
+BLOG_WORKER_PROCESSES = int(os.environ.get("WEB_CONCURRENCY", 1))
+
+# Sessions are read from the default cache, falling back to the database.
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+# Path prefixes that only accept JWT: session authentication isn't
+# attempted there, e.g. ["/api/"] when no browser client uses the API.
+BLOG_JWT_ONLY_PATHS = []
 
 
 # Password validation
@@ -172,7 +237,18 @@ MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB request body in-memory
-FILE_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5MB file in-memory threshold
+FILE_UPLOAD_MAX_MEMORY_SIZE = 256 * 1024  # larger uploads are streamed to a temp file
+
+# Avatar thumbnails (blog.utility.avatars) are rendered by a thread pool
+# after the upload commits; BLOG_AVATAR_SYNC renders inline instead (tests).
+BLOG_AVATAR_WORKERS = 2
+BLOG_AVATAR_SYNC = False
+
+# Serve post list/detail, comment list and category/tag lists from async
+# views (blog.views.async_reads). Only worth it under ASGI, e.g.
+# `uvicorn blogginapplication.asgi:application`; under WSGI every async view
+# gets its own event loop.
+BLOG_ASYNC_READS = False
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field